@@ -0,0 +1,53 @@
+"""Benchmark the overhead of accessing modules of Jim objects."""
+# Author(s): Pieter.Kempeneers@ec.europa.eu,
+#            Ondrej Pesek,
+#            Pierre.Soille@ec.europa.eu
+#
+# Copyright (C) 2018-2022 European Union (Joint Research Centre)
+#
+# This file is part of pyjeo.
+#
+# pyjeo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyjeo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
+
+# Usage: python benchmarks/bench_accessors.py [-n 100000]
+
+import argparse
+import timeit
+
+import pyjeo as pj
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-n", "--number", help="number of accesses to time",
+                    dest="number", required=False, type=int, default=100000)
+args = parser.parse_args()
+
+jim = pj.Jim(ncol=256, nrow=256, nband=3, otype='Byte')
+# Keep some garbage alive to make a full collection representative
+garbage = [pj.Jim(ncol=8, nrow=8, otype='Byte') for _ in range(1000)]
+
+
+def access():
+    return jim.properties.nrOfBand()
+
+
+for collect in [True, False]:
+    pj.memory.set_collect_on_access(collect)
+    # a full collection is much slower, do not wait for n of them
+    number = max(args.number // 1000, 10) if collect else args.number
+    elapsed = timeit.timeit(access, number=number)
+    print('collect_on_access={}: {:.3f} us per jim.properties.nrOfBand()'
+          .format(collect, 1e6 * elapsed / number))
+
+pj.memory.set_collect_on_access(False)
@@ -0,0 +1,58 @@
+"""Benchmark the construction cost of small Jim objects."""
+# Author(s): Pieter.Kempeneers@ec.europa.eu,
+#            Ondrej Pesek,
+#            Pierre.Soille@ec.europa.eu
+#
+# Copyright (C) 2018-2022 European Union (Joint Research Centre)
+#
+# This file is part of pyjeo.
+#
+# pyjeo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyjeo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
+
+# Usage: python benchmarks/bench_construction.py [-n 100000]
+
+import argparse
+import timeit
+
+import pyjeo as pj
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-n", "--number", help="number of Jim objects to create",
+                    dest="number", required=False, type=int, default=100000)
+args = parser.parse_args()
+
+
+def small_jim():
+    # size of a structuring element (e.g., Jim(graph=4))
+    return pj.Jim(ncol=3, nrow=3, otype='Byte')
+
+
+def small_jim_with_access():
+    # typical use of an intermediate Jim (e.g., a tile or a plane)
+    jim = pj.Jim(ncol=3, nrow=3, otype='Byte')
+    return jim.properties.nrOfBand()
+
+
+def graph_jim():
+    return pj.Jim(graph=4)
+
+
+for name, func in [('Jim(ncol=3, nrow=3)', small_jim),
+                   ('Jim(ncol=3, nrow=3) + properties access',
+                    small_jim_with_access),
+                   ('Jim(graph=4)', graph_jim)]:
+    elapsed = timeit.timeit(func, number=args.number)
+    print('{}: {:.3f} s for {} objects ({:.2f} us per object)'.format(
+        name, elapsed, args.number, 1e6 * elapsed / args.number))
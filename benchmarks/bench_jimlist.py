@@ -0,0 +1,81 @@
+"""Benchmark building and modifying JimLists with many scenes."""
+# Author(s): Pieter.Kempeneers@ec.europa.eu,
+#            Ondrej Pesek,
+#            Pierre.Soille@ec.europa.eu
+#
+# Copyright (C) 2018-2022 European Union (Joint Research Centre)
+#
+# This file is part of pyjeo.
+#
+# pyjeo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyjeo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
+
+# Usage: python benchmarks/bench_jimlist.py [-n 10000]
+
+import argparse
+import time
+
+import pyjeo as pj
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-n", "--number", help="number of scenes in the JimList",
+                    dest="number", required=False, type=int, default=10000)
+args = parser.parse_args()
+
+# small scenes: the benchmark measures the list bookkeeping, not the pixels
+scenes = [pj.Jim(ncol=3, nrow=3, otype='Byte') for _ in range(args.number)]
+
+
+def build_append():
+    jiml = pj.JimList([])
+    for jim in scenes:
+        jiml.append(jim)
+    return jiml
+
+
+def build_extend():
+    jiml = pj.JimList([])
+    for i in range(0, len(scenes), 100):
+        jiml.extend(pj.JimList(scenes[i:i + 100]))
+    return jiml
+
+
+def pop_last(jiml):
+    while jiml:
+        jiml.pop()
+
+
+def modify(jiml):
+    # a mix of edits at the end, the middle and the start of the list
+    for i in range(100):
+        jiml.insert(len(jiml) // 2, scenes[i])
+        jiml.pop(len(jiml) // 2)
+        jiml.insert(0, scenes[i])
+        jiml.pop(0)
+    jiml.reverse()
+
+
+def timed(name, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    print('{}: {:.3f} s'.format(name, time.perf_counter() - start))
+    return result
+
+
+jiml = timed('append {} scenes'.format(args.number), build_append)
+assert len(jiml) == jiml._jipjimlist.getSize()
+timed('extend {} scenes (by 100)'.format(args.number), build_extend)
+timed('insert/pop 100 scenes at start and middle + reverse', modify, jiml)
+assert len(jiml) == jiml._jipjimlist.getSize()
+timed('pop {} scenes from the end'.format(args.number), pop_last, jiml)
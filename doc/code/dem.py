@@ -46,10 +46,17 @@ parser.add_argument("-lry","--lry",help="lower right Y coordinate in dec deg",
                     dest="lry",required=False,type=float, default = None)
 parser.add_argument("-tileindex","--tileindex",help="tileindex to split input",
                     dest="tileindex",required=False,type=int,default=0)
-parser.add_argument("-tiletotal","--tiletotal",help="total to split input",
-                    dest="tiletotal",required=False,type=int,default=1)
-parser.add_argument("-overlap","--overlap",help="overlap to split input",
-                    dest="overlap",required=False,type=float,default=0)
+parser.add_argument("-tile_size","--tile_size",
+                    help="tile size in pixels to split input",
+                    dest="tile_size",required=False,type=int,default=None)
+parser.add_argument("-max_memory","--max_memory",
+                    help="maximum memory per tile to split input (e.g., 2GB)",
+                    dest="max_memory",required=False,type=str,default=None)
+parser.add_argument("-halo","--halo",help="overlap in pixels to split input",
+                    dest="halo",required=False,type=int,default=0)
+parser.add_argument("-count","--count",
+                    help="print the number of tiles (jobs) and exit",
+                    dest="count",required=False,action="store_true")
 parser.add_argument("-attribute","--attribute",
                     help="attribute to calculate [slope_riserun, \
                     slope_percentage, slope_degrees, slope_radians, \
@@ -62,16 +69,20 @@ args = parser.parse_args()
 
 demfn = args.input
 
+bbox = None
 if (args.ulx is not None and
     args.uly is not None and
     args.lrx is not None and
     args.lry is not None):
     bbox = [args.ulx, args.uly, args.lrx, args.lry]
-    jimdem = pj.Jim(Path(demfn), bbox = bbox, tileindex = args.tileindex,
-                    tiletotal = args.tiletotal, overlap = args.overlap)
-else:
-    jimdem = pj.Jim(Path(demfn), tileindex = args.tileindex,
-                    tiletotal = args.tiletotal, overlap = args.overlap)
+
+grid = pj.TileGrid(Path(demfn), bbox = bbox, tile_size = args.tile_size,
+                   max_memory = args.max_memory, halo = args.halo)
+if args.count:
+    print(len(grid))
+    exit(0)
+
+jimdem = grid[args.tileindex].read()
 
 if args.t_srs is not None:
     jimdem.geometry.warp(args.t_srs)
@@ -42,6 +42,89 @@ def _check_graph(graph, allowed_values):
             'allowed.'.format(graph, allowed_values))
 
 
+def _otype_from_dtype(dtype):
+    """Return the Jim data type corresponding to a numpy data type.
+
+    :param dtype: numpy data type (or anything accepted by numpy.dtype)
+    :return: Jim data type as a string (e.g. 'Float32')
+    """
+    import numpy as _np
+
+    dtype = _np.dtype(dtype)
+    if dtype == _np.bool_:
+        return 'Byte'
+    # Byte is unsigned, int8 needs Int16 to keep negative values
+    otypes = {'int8': 'Int16', 'uint8': 'Byte', 'uint16': 'UInt16',
+              'int16': 'Int16', 'uint32': 'UInt32', 'int32': 'Int32',
+              'float32': 'Float32', 'float64': 'Float64', 'int64': 'Int64',
+              'uint64': 'UInt64'}
+    try:
+        return otypes[dtype.name]
+    except KeyError:
+        raise exceptions.JimTypeError(
+            'Data type {} not supported'.format(dtype.name))
+
+
+def _dtype_from_otype(otype):
+    """Return the numpy data type corresponding to a Jim data type.
+
+    :param otype: Jim data type (e.g. 'Float32', 'GDT_Float32' or 'float32')
+    :return: numpy data type
+    """
+    import numpy as _np
+
+    dtypes = {'byte': _np.uint8, 'uint16': _np.uint16, 'int16': _np.int16,
+              'uint32': _np.uint32, 'int32': _np.int32,
+              'float32': _np.float32, 'float64': _np.float64,
+              'int64': _np.int64, 'uint64': _np.uint64, 'uint8': _np.uint8}
+    name = str(otype).lower()
+    if name.startswith('gdt_'):
+        name = name[4:]
+    try:
+        return _np.dtype(dtypes[name])
+    except KeyError:
+        raise exceptions.JimTypeError(
+            'Data type {} not supported'.format(otype))
+
+
+def _index_type(nplane: int):
+    """Return the Jim data type and the no data value of plane indices.
+
+    The largest value of the data type is never a plane index, it marks the
+    pixels without any selected plane.
+
+    :param nplane: number of planes
+    :return: tuple with the Jim data type and the no data value
+    """
+    import numpy as _np
+
+    if nplane <= _np.iinfo(_np.uint16).max:
+        return 'UInt16', int(_np.iinfo(_np.uint16).max)
+    return 'UInt32', int(_np.iinfo(_np.uint32).max)
+
+
+def _parse_memory(size):
+    """Return a memory size in bytes.
+
+    :param size: number of bytes or a string with a unit (e.g., '512MB',
+        '8GB', '1.5GiB')
+    :return: number of bytes as an integer
+    """
+    if isinstance(size, str):
+        units = {'': 1, 'b': 1, 'kb': 1e3, 'mb': 1e6, 'gb': 1e9, 'tb': 1e12,
+                 'kib': 2 ** 10, 'mib': 2 ** 20, 'gib': 2 ** 30,
+                 'tib': 2 ** 40}
+        value = size.strip().lower()
+        unit = value.lstrip('0123456789. ')
+        try:
+            return int(float(value[:len(value) - len(unit)]) * units[unit])
+        except (KeyError, ValueError):
+            raise exceptions.JimIllegalArgumentError(
+                'Memory size {} not understood (e.g., use 512MB or '
+                '8GB)'.format(size))
+    return int(size)
+
+
 def _get_random_path():
     """Return path of non-existing file in the temp directory.
 
@@ -0,0 +1,220 @@
+"""Best-pixel compositing of multi-plane Jim objects and JimLists."""
+# Author(s): Pieter.Kempeneers@ec.europa.eu,
+#            Ondrej Pesek,
+#            Pierre.Soille@ec.europa.eu
+#
+# Copyright (C) 2018-2022 European Union (Joint Research Centre)
+#
+# This file is part of pyjeo.
+#
+# pyjeo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyjeo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
+
+import math as _math
+import os as _os
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+
+import numpy as _np
+
+import pyjeo as _pj
+
+# maximum number of bytes of the scores of a block of rows
+_BLOCK_SIZE = 16 * 1024 ** 2
+
+
+def _bestPlanes(scores, rule: str, nodata):
+    """Select the plane with the best score for each pixel of a block.
+
+    Ties are won by the first plane. NaN scores and scores equal to nodata
+    are not valid.
+
+    :param scores: numpy array [plane][row][col]
+    :param rule: 'max' or 'min'
+    :param nodata: score value to ignore (or None)
+    :return: tuple with the plane indices, the best scores and a mask of
+        the pixels with a valid score ([row][col])
+    """
+    values = scores.astype(_np.float64)
+    invalid = _np.isnan(values)
+    if nodata is not None:
+        invalid |= scores == nodata
+    if rule == 'max':
+        values[invalid] = -_np.inf
+        planes = _np.argmax(values, axis=0)
+    else:
+        values[invalid] = _np.inf
+        planes = _np.argmin(values, axis=0)
+    best = _np.take_along_axis(values, planes[None], axis=0)[0]
+    return planes, best, ~invalid.all(axis=0)
+
+
+class Compositor:
+    """Best-pixel compositing engine.
+
+    For each pixel, the plane with the maximum (or minimum) value in a
+    score band (e.g., NDVI or the distance to clouds) is selected and all
+    bands of that plane are copied to the composite. Jim objects are added
+    one by one, so that the planes of a JimList are never stacked: the
+    memory used is the composite plus the Jim object being added. Each
+    Jim object is processed in a single pass over blocks of rows in a pool
+    of threads.
+
+    Create a composite with the highest NDVI (band 4) of a time series::
+
+        compositor = pj.Compositor(score_band=4, rule='max', nodata=0)
+        for path in paths:
+            compositor.add(pj.Jim(path))
+        composite, index = compositor.result(index=True)
+    """
+
+    __slots__ = ('score_band', 'rule', 'nodata', 'workers', '_composite',
+                 '_outputs', '_best', '_planes', '_nplane')
+
+    def __init__(self,
+                 score_band: int = 0,
+                 rule: str = 'max',
+                 nodata: float = None,
+                 workers: int = None):
+        """Initialize an empty composite.
+
+        :param score_band: band with the scores
+        :param rule: 'max' or 'min' to select the plane with the maximum or
+            minimum score
+        :param nodata: score value to ignore, also set in all bands of the
+            pixels without any valid score
+        :param workers: number of threads (default is the number of CPUs)
+        """
+        if rule not in ('max', 'min'):
+            raise _pj.exceptions.JimIllegalArgumentError(
+                "rule must be 'max' or 'min'")
+        self.score_band = score_band
+        self.rule = rule
+        self.nodata = nodata
+        self.workers = workers or _os.cpu_count() or 1
+        self._composite = None
+        self._outputs = None
+        self._best = None
+        self._planes = None
+        self._nplane = 0
+
+    def _allocate(self, jim):
+        """Allocate the composite with the dimensions of a Jim object."""
+        nrow = jim.properties.nrOfRow()
+        ncol = jim.properties.nrOfCol()
+        nband = jim.properties.nrOfBand()
+        if self.score_band >= nband:
+            raise _pj.exceptions.JimBandsError(
+                'Score band out of bounds for a Jim object with {} '
+                'bands'.format(nband))
+        composite = _pj.Jim(ncol=ncol, nrow=nrow, nband=nband,
+                            otype=jim.properties.getDataType())
+        composite.properties.setGeoTransform(
+            jim.properties.getGeoTransform())
+        composite.properties.setProjection(jim.properties.getProjection())
+        nodata = jim.properties.getNoDataVals()
+        if nodata:
+            composite.properties.setNoDataVals(nodata)
+        self._composite = composite
+        self._outputs = [composite.np(band).reshape(nrow, ncol)
+                         for band in range(nband)]
+        self._best = _np.zeros((nrow, ncol))
+        # index of the selected plane, -1 if none
+        self._planes = _np.full((nrow, ncol), -1, dtype=_np.int64)
+
+    def add(self, jim):
+        """Add the planes of a Jim object to the composite.
+
+        Planes are numbered in the order they are added. Ties are won by
+        the first plane.
+
+        :param jim: Jim object with the rows, columns and bands of the
+            composite
+        """
+        if self._composite is None:
+            self._allocate(jim)
+        nrow, ncol = self._best.shape
+        if jim.properties.nrOfRow() != nrow or \
+                jim.properties.nrOfCol() != ncol or \
+                jim.properties.nrOfBand() != len(self._outputs):
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'All Jim objects must have the same number of rows, columns '
+                'and bands to be composited')
+
+        nplane = jim.properties.nrOfPlane()
+        offset = self._nplane
+        sources = [jim.np(band).reshape(nplane, nrow, ncol)
+                   for band in range(len(self._outputs))]
+        rows = max(1, _BLOCK_SIZE // (nplane * ncol * 8))
+        rows = min(rows, int(_math.ceil(nrow / self.workers)))
+
+        def fold(start):
+            stop = min(start + rows, nrow)
+            planes, best, found = _bestPlanes(
+                sources[self.score_band][:, start:stop], self.rule,
+                self.nodata)
+            previous = self._planes[start:stop]
+            if self.rule == 'max':
+                better = best > self._best[start:stop]
+            else:
+                better = best < self._best[start:stop]
+            better = found & ((previous < 0) | better)
+            self._best[start:stop][better] = best[better]
+            previous[better] = planes[better] + offset
+            for source, output in zip(sources, self._outputs):
+                selected = _np.take_along_axis(source[:, start:stop],
+                                               planes[None], axis=0)[0]
+                _np.copyto(output[start:stop], selected, where=better)
+
+        with _ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(fold, range(0, nrow, rows)))
+        self._nplane += nplane
+
+    def result(self, index: bool = False):
+        """Return a copy of the composite.
+
+        Pixels without any valid score are set to nodata (0 if not set) in
+        all bands. More Jim objects can be added afterwards without changing
+        the returned Jim objects.
+
+        :param index: set True to return the index of the selected planes
+            as well
+        :return: composite Jim object, and the index of the selected planes
+            (UInt16 Jim object, UInt32 beyond 65535 planes) if index is True.
+            Pixels without any valid score are set to the largest value of
+            the data type in the index, which is its no data value
+        """
+        if self._composite is None:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'No Jim object was added to the composite')
+        empty = self._planes < 0
+        nodata = self.nodata if self.nodata is not None else 0
+        composite = _pj.Jim(self._composite)
+        if empty.any():
+            nrow, ncol = self._best.shape
+            for band in range(len(self._outputs)):
+                composite.np(band).reshape(nrow, ncol)[empty] = nodata
+        if not index:
+            return composite
+
+        nrow, ncol = self._best.shape
+        otype, index_nodata = _pj._index_type(self._nplane)
+        jim_index = _pj.Jim(ncol=ncol, nrow=nrow, otype=otype)
+        jim_index.properties.setGeoTransform(
+            self._composite.properties.getGeoTransform())
+        jim_index.properties.setProjection(
+            self._composite.properties.getProjection())
+        jim_index.properties.setNoDataVals(index_nodata)
+        planes = jim_index.np().reshape(nrow, ncol)
+        _np.copyto(planes, self._planes, casting='unsafe')
+        planes[empty] = index_nodata
+        return composite, jim_index
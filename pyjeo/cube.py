@@ -0,0 +1,152 @@
+"""Build multi-plane Jim objects (cubes) from lists of Jim objects."""
+# Author(s): Pieter.Kempeneers@ec.europa.eu,
+#            Ondrej Pesek,
+#            Pierre.Soille@ec.europa.eu
+#
+# Copyright (C) 2018-2022 European Union (Joint Research Centre)
+#
+# This file is part of pyjeo.
+#
+# pyjeo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyjeo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
+
+import itertools as _itertools
+import os as _os
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+
+import numpy as _np
+
+import pyjeo as _pj
+
+
+class Cube:
+    """Builder of multi-plane Jim objects from lists of Jim objects.
+
+    The shape of the cube is calculated from the metadata of the members
+    first, the cube is allocated once and each member is copied (once) in
+    its planes. The cost is linear in the number of members and the peak
+    memory is the size of the cube (plus the members being copied).
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def from_list(jimlist,
+                  bands: list = None,
+                  planes: list = None,
+                  dtype=None,
+                  workers: int = None):
+        """Stack the planes of Jim objects in a new multi-plane Jim object.
+
+        The planes of the members are stacked in the order of the list.
+        All members must have the same number of rows and columns. The
+        georeference and no data values are taken from the first member.
+        Members of a lazy JimList (see :py:meth:`JimList.from_paths`) are
+        read when they are copied.
+
+        :param jimlist: JimList or list of Jim objects
+        :param bands: list of band indices to copy from each member (default
+            is all bands of the first member)
+        :param planes: list of plane indices to copy from each member
+            (default is all planes)
+        :param dtype: data type of the cube as a Jim data type (e.g.,
+            'Float32') or a numpy data type. Default is the data type of the
+            first member. Values are cast on the fly
+        :param workers: number of threads copying the members (default is
+            the number of CPUs)
+        :return: multi-plane Jim object
+
+        Stack the first band of 365 daily images in a Float32 cube::
+
+            jiml = pj.JimList.from_paths(paths, max_memory='4GB')
+            cube = pj.Cube.from_list(jiml, bands=[0], dtype='Float32')
+        """
+        if isinstance(jimlist, _pj.JimList):
+            members = jimlist._members()
+            read = jimlist.__getitem__
+        else:
+            members = list(jimlist)
+
+            def read(index):
+                return _pj.pyjeo._read_source(members[index])
+
+        if not members:
+            raise _pj.exceptions.JimListIllegalArgumentError(
+                'Cannot build a cube from an empty list')
+
+        first = members[0]
+        ncol = first.properties.nrOfCol()
+        nrow = first.properties.nrOfRow()
+        if bands is None:
+            bands = list(range(first.properties.nrOfBand()))
+        elif not isinstance(bands, list):
+            bands = [bands]
+        if planes is not None and not isinstance(planes, list):
+            planes = [planes]
+
+        nplanes = []
+        for member in members:
+            if member.properties.nrOfCol() != ncol or \
+                    member.properties.nrOfRow() != nrow:
+                raise _pj.exceptions.JimIllegalArgumentError(
+                    'All members must have the same number of rows and '
+                    'columns to stack their planes')
+            if max(bands) >= member.properties.nrOfBand():
+                raise _pj.exceptions.JimBandsError(
+                    'Band out of bounds for a member with {} '
+                    'bands'.format(member.properties.nrOfBand()))
+            nplane = member.properties.nrOfPlane()
+            if planes is not None:
+                if max(planes) >= nplane:
+                    raise _pj.exceptions.JimIllegalArgumentError(
+                        'Plane out of bounds for a member with {} '
+                        'planes'.format(nplane))
+                nplane = len(planes)
+            nplanes.append(nplane)
+
+        if dtype is None:
+            otype = first.properties.getDataType()
+        elif isinstance(dtype, str):
+            otype = _pj._otype_from_dtype(_pj._dtype_from_otype(dtype))
+        else:
+            otype = _pj._otype_from_dtype(dtype)
+
+        cube = _pj.Jim(ncol=ncol, nrow=nrow, nplane=sum(nplanes),
+                       nband=len(bands), otype=otype)
+        cube.properties.setGeoTransform(first.properties.getGeoTransform())
+        cube.properties.setProjection(first.properties.getProjection())
+        nodata = first.properties.getNoDataVals()
+        if nodata:
+            cube.properties.setNoDataVals(nodata)
+
+        outputs = [cube.np(band).reshape(-1, nrow, ncol)
+                   for band in range(len(bands))]
+        offsets = list(_itertools.accumulate([0] + nplanes[:-1]))
+
+        def copy(index):
+            jim = read(index)
+            nplane = jim.properties.nrOfPlane()
+            for output, band in zip(outputs, bands):
+                source = jim.np(band).reshape(nplane, nrow, ncol)
+                if planes is not None:
+                    source = source[planes]
+                _np.copyto(output[offsets[index]:
+                                  offsets[index] + nplanes[index]],
+                           source, casting='unsafe')
+
+        if workers is None:
+            workers = _os.cpu_count() or 1
+        with _ThreadPoolExecutor(
+                max_workers=max(1, min(workers, len(members)))) as executor:
+            list(executor.map(copy, range(len(members))))
+        return cube
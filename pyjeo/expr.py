@@ -0,0 +1,304 @@
+"""Deferred (lazy) evaluation of pixel wise expressions on Jim objects."""
+# Author(s): Pieter.Kempeneers@ec.europa.eu,
+#            Ondrej Pesek,
+#            Pierre.Soille@ec.europa.eu
+#
+# Copyright (C) 2018-2022 European Union (Joint Research Centre)
+#
+# This file is part of pyjeo.
+#
+# pyjeo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyjeo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
+
+import os as _os
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+
+import numpy as _np
+
+import pyjeo as _pj
+
+
+class JimExpr:
+    """Node of a deferred expression on Jim objects.
+
+    A JimExpr is created with :py:meth:`Jim.lazy`. Operators applied to it
+    do not allocate any Jim object, but build an expression graph. The graph
+    is evaluated in a single, blocked and multi-threaded pass over each band
+    with :py:meth:`compute`, which only allocates the resulting Jim object::
+
+        ndvi = ((nir.lazy() - red) / (nir.lazy() + red)).compute()
+        mask = ((nir.lazy() - red) / (nir.lazy() + red) > 0.3).compute()
+
+    Operands can be Jim objects, other JimExpr objects or scalars. Jim
+    objects with a single band are applied to all bands of the other ones.
+    """
+
+    __slots__ = ('_func', '_args')
+
+    # do not let numpy handle binary operations with a JimExpr operand
+    __array_ufunc__ = None
+    __hash__ = None
+
+    def __init__(self, func, *args):
+        """Initialize the node.
+
+        :param func: numpy ufunc to be applied on the arguments or None for
+            a leaf node
+        :param args: JimExpr objects, Jim objects or scalars (a single Jim
+            object for a leaf node)
+        """
+        self._func = func
+        self._args = tuple(self._wrap(arg) for arg in args) \
+            if func is not None else args
+
+    @staticmethod
+    def _wrap(operand):
+        """Turn an operand into a JimExpr node or check it is a scalar."""
+        if isinstance(operand, JimExpr):
+            return operand
+        elif isinstance(operand, _pj.Jim):
+            return JimExpr(None, operand)
+        elif _np.isscalar(operand) or isinstance(operand, _np.generic):
+            return operand
+        else:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'unsupported operand type for a lazy expression: {}'.format(
+                    type(operand)))
+
+    def _leaves(self):
+        """Return the unique Jim objects used in the expression."""
+        if self._func is None:
+            return list(self._args)
+        leaves = []
+        for arg in self._args:
+            if isinstance(arg, JimExpr):
+                for jim in arg._leaves():
+                    if not any(jim is leaf for leaf in leaves):
+                        leaves.append(jim)
+        return leaves
+
+    def _evaluate(self, arrays, index):
+        """Evaluate the expression on a block of the leaf arrays.
+
+        :param arrays: dictionary with id(Jim) as key and numpy array of the
+            current band as value
+        :param index: index of the block within the numpy arrays
+        :return: numpy array of the evaluated block
+        """
+        if self._func is None:
+            return arrays[id(self._args[0])][index]
+        return self._func(*[arg._evaluate(arrays, index)
+                             if isinstance(arg, JimExpr) else arg
+                             for arg in self._args])
+
+    def compute(self,
+                otype=None,
+                nthreads: int = None,
+                block_size: int = 262144):
+        """Evaluate the expression and return the result as a new Jim object.
+
+        :param otype: data type of the result. Default is the numpy data type
+            of the evaluated expression (Byte for comparisons and boolean
+            operations)
+        :param nthreads: number of threads used for the evaluation (default
+            is the number of CPUs)
+        :param block_size: approximate number of pixels per block
+        :return: a Jim object
+        """
+        leaves = self._leaves()
+        template = leaves[0]
+        nrow = template.properties.nrOfRow()
+        ncol = template.properties.nrOfCol()
+        nplane = template.properties.nrOfPlane()
+        nband = 1
+        for jim in leaves:
+            if jim.properties.nrOfRow() != nrow or \
+                    jim.properties.nrOfCol() != ncol or \
+                    jim.properties.nrOfPlane() != nplane:
+                raise _pj.exceptions.JimIllegalArgumentError(
+                    'All Jim objects in a lazy expression must have the '
+                    'same dimensions')
+            nband_jim = jim.properties.nrOfBand()
+            if nband_jim > 1:
+                if 1 < nband != nband_jim:
+                    raise _pj.exceptions.JimBandsError(
+                        'Jims used in a lazy expression must have either the '
+                        'same number of bands or number of bands == 1')
+                nband = nband_jim
+
+        if otype is None:
+            probe = self._evaluate({id(jim): jim.np(0) for jim in leaves},
+                                   (Ellipsis, slice(0, 1), slice(0, 1)))
+            otype = _pj._otype_from_dtype(_np.asarray(probe).dtype)
+
+        result = _pj.Jim(ncol=ncol, nrow=nrow, nband=nband, nplane=nplane,
+                         otype=otype)
+        result.properties.copyGeoReference(template)
+
+        rows_per_block = max(1, block_size // (ncol * nplane))
+        blocks = [(Ellipsis, slice(row, min(row + rows_per_block, nrow)),
+                   slice(None)) for row in range(0, nrow, rows_per_block)]
+        if nthreads is None:
+            nthreads = _os.cpu_count() or 1
+
+        with _ThreadPoolExecutor(max_workers=nthreads) as executor:
+            for band in range(nband):
+                arrays = {id(jim): jim.np(band if
+                                          jim.properties.nrOfBand() > 1
+                                          else 0)
+                          for jim in leaves}
+                output = result.np(band)
+
+                def evaluate_block(index):
+                    _np.copyto(output[index], self._evaluate(arrays, index),
+                               casting='unsafe')
+
+                list(executor.map(evaluate_block, blocks))
+
+        return result
+
+    # *** unary operators *** #
+
+    def __abs__(self):
+        """Deferred absolute value."""
+        return JimExpr(_np.absolute, self)
+
+    def __neg__(self):
+        """Deferred negation."""
+        return JimExpr(_np.negative, self)
+
+    def __invert__(self):
+        """Deferred complement."""
+        return JimExpr(_np.invert, self)
+
+    # *** binary operators *** #
+
+    def __eq__(self, right):
+        """Deferred pixel wise check for equality."""
+        return JimExpr(_np.equal, self, right)
+
+    def __ne__(self, right):
+        """Deferred pixel wise check for non-equality."""
+        return JimExpr(_np.not_equal, self, right)
+
+    def __lt__(self, right):
+        """Deferred pixel wise check for lesser than."""
+        return JimExpr(_np.less, self, right)
+
+    def __le__(self, right):
+        """Deferred pixel wise check for lesser or equal."""
+        return JimExpr(_np.less_equal, self, right)
+
+    def __gt__(self, right):
+        """Deferred pixel wise check for greater than."""
+        return JimExpr(_np.greater, self, right)
+
+    def __ge__(self, right):
+        """Deferred pixel wise check for greater or equal."""
+        return JimExpr(_np.greater_equal, self, right)
+
+    def __add__(self, right):
+        """Deferred pixel wise operation +."""
+        return JimExpr(_np.add, self, right)
+
+    def __radd__(self, left):
+        """Deferred pixel wise operation + where self is the added value."""
+        return JimExpr(_np.add, left, self)
+
+    def __sub__(self, right):
+        """Deferred pixel wise operation -."""
+        return JimExpr(_np.subtract, self, right)
+
+    def __rsub__(self, left):
+        """Deferred pixel wise operation - where self is subtracted."""
+        return JimExpr(_np.subtract, left, self)
+
+    def __mul__(self, right):
+        """Deferred pixel wise operation *."""
+        return JimExpr(_np.multiply, self, right)
+
+    def __rmul__(self, left):
+        """Deferred pixel wise operation * where self is the multiplier."""
+        return JimExpr(_np.multiply, left, self)
+
+    def __truediv__(self, right):
+        """Deferred pixel wise operation for true division."""
+        return JimExpr(_np.true_divide, self, right)
+
+    def __rtruediv__(self, left):
+        """Deferred pixel wise operation for true division of a value."""
+        return JimExpr(_np.true_divide, left, self)
+
+    def __floordiv__(self, right):
+        """Deferred pixel wise operation for floor division."""
+        return JimExpr(_np.floor_divide, self, right)
+
+    def __rfloordiv__(self, left):
+        """Deferred pixel wise operation for floor division of a value."""
+        return JimExpr(_np.floor_divide, left, self)
+
+    def __mod__(self, right):
+        """Deferred pixel wise operation modulo."""
+        return JimExpr(_np.remainder, self, right)
+
+    def __rmod__(self, left):
+        """Deferred pixel wise operation modulo of a value."""
+        return JimExpr(_np.remainder, left, self)
+
+    def __pow__(self, right):
+        """Deferred pixel wise operation **."""
+        return JimExpr(_np.power, self, right)
+
+    def __rpow__(self, left):
+        """Deferred pixel wise operation ** where self is the exponent."""
+        return JimExpr(_np.power, left, self)
+
+    def __lshift__(self, right):
+        """Deferred pixel wise operation <<."""
+        return JimExpr(_np.left_shift, self, right)
+
+    def __rlshift__(self, left):
+        """Deferred pixel wise operation << where self is the shift."""
+        return JimExpr(_np.left_shift, left, self)
+
+    def __rshift__(self, right):
+        """Deferred pixel wise operation >>."""
+        return JimExpr(_np.right_shift, self, right)
+
+    def __rrshift__(self, left):
+        """Deferred pixel wise operation >> where self is the shift."""
+        return JimExpr(_np.right_shift, left, self)
+
+    def __or__(self, right):
+        """Deferred pixel wise operation |."""
+        return JimExpr(_np.bitwise_or, self, right)
+
+    def __ror__(self, left):
+        """Deferred pixel wise operation | where self is the right object."""
+        return JimExpr(_np.bitwise_or, left, self)
+
+    def __xor__(self, right):
+        """Deferred pixel wise operation ^."""
+        return JimExpr(_np.bitwise_xor, self, right)
+
+    def __rxor__(self, left):
+        """Deferred pixel wise operation ^ where self is the right object."""
+        return JimExpr(_np.bitwise_xor, left, self)
+
+    def __and__(self, right):
+        """Deferred pixel wise operation &."""
+        return JimExpr(_np.bitwise_and, self, right)
+
+    def __rand__(self, left):
+        """Deferred pixel wise operation & where self is the right object."""
+        return JimExpr(_np.bitwise_and, left, self)
@@ -0,0 +1,181 @@
+"""Cache of structuring elements (neighbourhoods) for Jim objects."""
+# Author(s): Pieter.Kempeneers@ec.europa.eu,
+#            Ondrej Pesek,
+#            Pierre.Soille@ec.europa.eu
+#
+# Copyright (C) 2018-2022 European Union (Joint Research Centre)
+#
+# This file is part of pyjeo.
+#
+# pyjeo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyjeo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
+
+import numbers as _numbers
+import threading as _threading
+
+import numpy as _np
+
+import pyjeo as _pj
+
+
+def _graph_2d(corners: bool):
+    """Return a 3x3 neighbourhood array without the central pixel."""
+    kernel = _np.ones((3, 3), dtype=_np.uint8)
+    if not corners:
+        kernel[0::2, 0::2] = 0
+    kernel[1, 1] = 0
+    return kernel
+
+
+def _graph_3d(corners: bool):
+    """Return a 3x3x3 neighbourhood array without the central pixel."""
+    if corners:
+        kernel = _np.ones((3, 3, 3), dtype=_np.uint8)
+    else:
+        kernel = _np.zeros((3, 3, 3), dtype=_np.uint8)
+        kernel[1, 1, :] = 1
+        kernel[1, :, 1] = 1
+        kernel[:, 1, 1] = 1
+    kernel[1, 1, 1] = 0
+    return kernel
+
+
+# numpy arrays of the registered structuring elements ([planes][rows][cols]
+# or [rows][cols])
+_kernels = {4: _graph_2d(False), 8: _graph_2d(True), 6: _graph_3d(False),
+            26: _graph_3d(True)}
+for _kernel in _kernels.values():
+    _kernel.flags.writeable = False
+del _kernel
+
+_predefined = frozenset(_kernels)
+
+# interned Jim objects with (name, otype) as key
+_cache = {}
+_lock = _threading.Lock()
+
+
+def _check_name(name):
+    """Check a structuring element is registered.
+
+    :param name: graph (4, 6, 8, 26) or name of a registered structuring
+        element
+    """
+    if name not in _kernels:
+        raise _pj.exceptions.JimIllegalArgumentError(
+            'Value {} not allow as a graph parameter. Only values {} are '
+            'allowed.'.format(name, names()))
+
+
+def names():
+    """Return the names of the registered structuring elements.
+
+    :return: list with the predefined graphs (4, 6, 8, 26) followed by the
+        names of user defined structuring elements
+    """
+    return sorted(_predefined) + sorted(name for name in list(_kernels)
+                                        if name not in _predefined)
+
+
+def register(name: str,
+             kernel,
+             overwrite: bool = False):
+    """Register a user defined structuring element.
+
+    The structuring element can then be created with Jim(graph=name) or
+    obtained (without a copy) with :py:func:`get`, from any thread.
+
+    :param name: name of the structuring element
+    :param kernel: numpy array or Jim object (a single band) with the
+        structuring element, organized as [rows][cols] or
+        [planes][rows][cols]
+    :param overwrite: set True to replace a registered structuring element
+        with the same name
+
+    Example::
+
+        pj.kernels.register('cross5', np.array([[0, 0, 1, 0, 0],
+                                                [0, 0, 1, 0, 0],
+                                                [1, 1, 1, 1, 1],
+                                                [0, 0, 1, 0, 0],
+                                                [0, 0, 1, 0, 0]]))
+        jim.ngbops.morphoErode(pj.Jim(graph='cross5'))
+    """
+    if isinstance(name, _numbers.Integral) or name in _predefined:
+        raise _pj.exceptions.JimIllegalArgumentError(
+            'Predefined graphs {} can not be registered'.format(
+                sorted(_predefined)))
+    if isinstance(kernel, _pj.Jim):
+        kernel = kernel.np(0)
+    array = _np.array(kernel)
+    if array.ndim not in (2, 3):
+        raise _pj.exceptions.JimIllegalArgumentError(
+            'A structuring element must be a 2D or 3D array')
+    array.flags.writeable = False
+
+    with _lock:
+        if name in _kernels and not overwrite:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'A structuring element {} is already registered, use '
+                'overwrite=True to replace it'.format(name))
+        _kernels[name] = array
+        for key in [key for key in _cache if key[0] == name]:
+            del _cache[key]
+
+
+def get(name, otype: str = 'Byte'):
+    """Return the interned Jim object of a structuring element.
+
+    The Jim object is created once per structuring element and data type and
+    shared by all callers (in all threads). It is read-only: its numpy arrays
+    are not writable and in place methods raise a JimNotSupportedError. Use
+    Jim(graph=name) to get a copy that can be modified.
+
+    :param name: graph (4, 6, 8, 26) or name of a registered structuring
+        element
+    :param otype: data type of the Jim object
+    :return: a Jim object
+
+    Label the connected components of many tiles with the same
+    neighbourhood::
+
+        ngb = pj.kernels.get(4)
+        for tile in tiles:
+            labels = pj.ccops.label(tile, ngb)
+    """
+    key = (name, otype)
+    jim = _cache.get(key)
+    if jim is not None:
+        return jim
+
+    _check_name(name)
+    with _lock:
+        jim = _cache.get(key)
+        if jim is None:
+            array = _kernels[name]
+            jim = _pj.Jim(ncol=array.shape[-1], nrow=array.shape[-2],
+                          nplane=array.shape[0] if array.ndim == 3 else 1,
+                          otype=otype)
+            # the interned object must outlive any active memory scope
+            _pj.memory._unregister(jim)
+            _np.copyto(jim.np(0), array.reshape(jim.np(0).shape),
+                       casting='unsafe')
+            jim._jipjim._readonly = True
+            _cache[key] = jim
+    return jim
+
+
+def clear():
+    """Release the interned Jim objects (registrations are kept)."""
+    with _lock:
+        _cache.clear()
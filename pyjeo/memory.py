@@ -0,0 +1,249 @@
+"""Memory lifecycle management for Jim objects."""
+# Author(s): Pieter.Kempeneers@ec.europa.eu,
+#            Ondrej Pesek,
+#            Pierre.Soille@ec.europa.eu
+#
+# Copyright (C) 2018-2022 European Union (Joint Research Centre)
+#
+# This file is part of pyjeo.
+#
+# pyjeo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyjeo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
+
+import collections as _collections
+import gc as _gc
+import threading as _threading
+import weakref as _weakref
+
+
+# Jim objects do not hold references to their module objects, so their
+# jiplib buffers are freed by reference counting as soon as the last
+# reference is dropped. A full garbage collection on every module access is
+# therefore not needed anymore and is only done when explicitly requested.
+collect_on_access = False
+
+_local = _threading.local()
+
+
+def collect():
+    """Run a full garbage collection.
+
+    :return: the number of unreachable objects found
+    """
+    return _gc.collect()
+
+
+def set_collect_on_access(enabled: bool = True):
+    """Run a full garbage collection on every module access of Jim objects.
+
+    This was the default behaviour of previous versions of pyjeo. It is
+    expensive (in the order of milliseconds per access) and should only be
+    enabled to debug memory issues.
+
+    :param enabled: set to True to collect on every access, False to disable
+    """
+    global collect_on_access
+    collect_on_access = bool(enabled)
+
+
+def _scopes():
+    """Return the stack of active memory scopes for the current thread."""
+    try:
+        return _local.scopes
+    except AttributeError:
+        _local.scopes = []
+        return _local.scopes
+
+
+def _register(jim):
+    """Track a newly created Jim object in the innermost active scope.
+
+    :param jim: Jim object to be tracked
+    """
+    scopes = _scopes()
+    if scopes:
+        scopes[-1]._track(jim)
+
+
+def _unregister(jim):
+    """Stop tracking a Jim object that must outlive the active scopes.
+
+    :param jim: Jim object tracked by the innermost active scope
+    """
+    scopes = _scopes()
+    if scopes:
+        scopes[-1]._untrack(jim)
+
+
+class MemoryScope:
+    """Release the jiplib buffers of temporary Jim objects on exit.
+
+    All Jim objects created within the scope (in the same thread) are closed
+    when the scope is left, except those marked with :py:meth:`keep`. Kept
+    objects are handed over to the enclosing scope, if any.
+
+    Example::
+
+        with pj.memory_scope() as scope:
+            ndvi = (nir - red) / (nir + red)
+            mask = scope.keep(ndvi > 0.3)
+
+    Numpy arrays obtained with :py:meth:`Jim.np` from a released Jim object
+    must not be used after the scope has been left.
+    """
+
+    def __init__(self, collect: bool = False):
+        """Initialize the scope.
+
+        :param collect: set to True to run a full garbage collection when
+            the scope is left
+        """
+        self._collect = collect
+        self._tracked = []
+        self._kept = set()
+
+    def __enter__(self):
+        """Activate the scope for the current thread."""
+        _scopes().append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Deactivate the scope and release the tracked Jim objects."""
+        scopes = _scopes()
+        if scopes and scopes[-1] is self:
+            scopes.pop()
+        else:
+            scopes.remove(self)
+
+        kept = [ref() for ref in self._tracked if id(ref) in self._kept]
+        self.release()
+        if scopes:
+            for jim in kept:
+                if jim is not None:
+                    scopes[-1]._track(jim)
+        if self._collect:
+            _gc.collect()
+        return False
+
+    def _track(self, jim):
+        """Add a Jim object to the objects released on exit.
+
+        :param jim: Jim object to be tracked
+        """
+        self._tracked.append(_weakref.ref(jim))
+
+    def _untrack(self, jim):
+        """Remove a Jim object from the objects released on exit.
+
+        :param jim: Jim object not to be released
+        """
+        self._tracked = [ref for ref in self._tracked if ref() is not jim]
+
+    def keep(self, *jims):
+        """Exclude Jim objects from being released when leaving the scope.
+
+        :param jims: Jim objects to keep
+        :return: the (first) kept Jim object, for convenience in assignments
+        """
+        for ref in self._tracked:
+            if any(ref() is jim for jim in jims):
+                self._kept.add(id(ref))
+        return jims[0] if jims else None
+
+    def release(self):
+        """Close the tracked Jim objects that are still alive and not kept."""
+        tracked = self._tracked
+        self._tracked = []
+        for ref in tracked:
+            if id(ref) in self._kept:
+                continue
+            jim = ref()
+            if jim is not None and jim._jipjim.isInit():
+                jim._jipjim.close()
+        self._kept = set()
+
+
+class _Residency:
+    """Keep the pixel data of lazily read Jim objects within a budget.
+
+    The Jim objects read for the members of a lazy JimList (see
+    :py:meth:`JimList.from_paths`) are cached and the least recently used
+    ones are dropped when the budget is exceeded. The last one read is
+    always kept, even if it exceeds the budget on its own.
+    """
+
+    def __init__(self, max_memory: int, read):
+        """Initialize an empty cache.
+
+        :param max_memory: memory budget in bytes
+        :param read: function returning a Jim object with the pixel data of
+            a member
+        """
+        self.max_memory = max_memory
+        self._read = read
+        # id(member) -> (member, Jim object, number of bytes)
+        self._entries = _collections.OrderedDict()
+        self._used = 0
+        self._lock = _threading.Lock()
+
+    @property
+    def used(self):
+        """Return the number of bytes of the cached Jim objects."""
+        return self._used
+
+    def get(self, member):
+        """Return the Jim object with the pixel data of a member.
+
+        :param member: Jim object opened without reading the data
+        :return: Jim object with the pixel data
+        """
+        key = id(member)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        jim = self._read(member)
+        # the cache decides when the data are released, not the scope
+        _unregister(jim)
+        nbytes = jim.np(0).nbytes * jim.properties.nrOfBand()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                # read concurrently by another thread
+                self._entries.move_to_end(key)
+                return entry[1]
+            self._entries[key] = (member, jim, nbytes)
+            self._used += nbytes
+            while self._used > self.max_memory and len(self._entries) > 1:
+                _, (_, _, size) = self._entries.popitem(last=False)
+                self._used -= size
+        return jim
+
+    def clear(self):
+        """Drop all cached Jim objects."""
+        with self._lock:
+            self._entries.clear()
+            self._used = 0
+
+
+def memory_scope(collect: bool = False):
+    """Create a scope releasing temporary Jim objects on exit.
+
+    :param collect: set to True to run a full garbage collection when the
+        scope is left
+    :return: a MemoryScope context manager
+    """
+    return MemoryScope(collect)
@@ -23,6 +23,8 @@
 class JimModuleBase:
     """Base class for Jim modules."""
 
+    __slots__ = ('_jim_object',)
+
     def __init__(self):
         """Initialize the object."""
         pass
@@ -35,6 +37,8 @@ class JimModuleBase:
 class JimListModuleBase:
     """Base class for JimList modules."""
 
+    __slots__ = ('_jim_list',)
+
     def __init__(self):
         """Initialize the object."""
         pass
@@ -47,6 +51,8 @@ class JimListModuleBase:
 class JimVectModuleBase:
     """Base class for JimVect modules."""
 
+    __slots__ = ('_jim_vect',)
+
     def __init__(self):
         """Initialize the object."""
         pass
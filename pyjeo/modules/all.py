@@ -42,6 +42,8 @@ class _All(_Properties, _IO, _PixOps, _NgbOps, _Geometry, _CCOps, _Classify,
            _DEMOps):
     """Inherit all methods."""
 
+    __slots__ = ()
+
     pass
 
 
@@ -49,6 +51,8 @@ class _AllList(_PropertiesList, _IOList, _PixOpsList, _NgbOpsList,
                _GeometryList, _CCOpsList, _ClassifyList, _DEMOpsList):
     """Inherit all methods for JimLists."""
 
+    __slots__ = ()
+
     pass
 
 
@@ -56,4 +60,6 @@ class _AllVect(_GeometryVect, _PropertiesVect, _ClassifyVect, _DEMOpsVect,
                _IOVect, _CCOpsVect, _PixOpsVect, _NgbOpsVect):
     """Inherit all methods for JimVects."""
 
+    __slots__ = ()
+
     pass
@@ -423,7 +423,8 @@ def labelConstrainedCCs(jim,
             return _pj.Jim(jim._jipjim.labelConstrainedCCsMultiband(
                 ngb._jipjim, 1, 1, 0, global_range, local_range))
     elif isinstance(jim, _pj.JimList):
-        return _pj.Jim(jim._jipjimlist.labelConstrainedCCsMultiband(
+        jiplist = jim._resident()._jipjimlist
+        return _pj.Jim(jiplist.labelConstrainedCCsMultiband(
             ngb._jipjim, 1, 1, 0, global_range, local_range))
     else:
         raise _pj.exceptions.JimIllegalArgumentError(
@@ -502,7 +503,8 @@ def labelConstrainedCCsDissim(jim,
                 diss[0]._jipjim, diss[1]._jipjim,
                 global_range, local_range))
     elif isinstance(jim, _pj.JimList):
-        return _pj.Jim(jim._jipjimlist.labelConstrainedCCsMultibandDissim(
+        jiplist = jim._resident()._jipjimlist
+        return _pj.Jim(jiplist.labelConstrainedCCsMultibandDissim(
             diss[0]._jipjim, diss[1]._jipjim, global_range, local_range))
     else:
         raise _pj.exceptions.JimIllegalArgumentError(
@@ -734,7 +736,8 @@ def labelStronglyCCs(jim,
             return _pj.Jim(jim._jipjim.labelStronglyCCsMultiband(
                 ngb._jipjim, 1, 1, 0, local_range))
     elif isinstance(jim, _pj.JimList):
-        return _pj.Jim(jim._jipjimlist.labelStronglyCCsMultiband(
+        jiplist = jim._resident()._jipjimlist
+        return _pj.Jim(jiplist.labelStronglyCCsMultiband(
             ngb._jipjim, 1, 1, 0, local_range))
     else:
         raise _pj.exceptions.JimIllegalArgumentError(
@@ -916,9 +919,9 @@ def seededRegionGrowing(jim,
     else:
         jim_object_list = jim
 
-    return _pj.Jim(
-        jim_object_list._jipjimlist.segmentationSeededRegionGrowingMultiband(
-            seeds._jipjim, ngb._jipjim, 1, 1, 0))
+    jiplist = jim_object_list._resident()._jipjimlist
+    return _pj.Jim(jiplist.segmentationSeededRegionGrowingMultiband(
+        seeds._jipjim, ngb._jipjim, 1, 1, 0))
 
 
 def segmentBinaryPatterns(jim_object,
@@ -994,7 +997,8 @@ def segmentImageMultiband(jimlist,
             graph, local_range, region_size, contrast, version,
             filename_prefix))
     elif isinstance(jimlist, _pj.JimList):
-        return _pj.Jim(jimlist._jipjimlist.segmentImageMultiband(
+        jiplist = jimlist._resident()._jipjimlist
+        return _pj.Jim(jiplist.segmentImageMultiband(
             graph, local_range, region_size, contrast, version,
             filename_prefix))
     else:
@@ -1064,6 +1068,8 @@ def watershed(jim_object,
 class _CCOps(_pj.modules.JimModuleBase):
     """Define all CCOps methods."""
 
+    __slots__ = ()
+
     def alphaTree(self,
                   attr0cc,
                   type: int):
@@ -1823,6 +1829,8 @@ class _CCOps(_pj.modules.JimModuleBase):
 class _CCOpsList(_pj.modules.JimListModuleBase):
     """Define all CCOps methods for JimLists."""
 
+    __slots__ = ()
+
     def labelConstrainedCCs(self,
                             local_range: int,
                             global_range: int,
@@ -1841,11 +1849,14 @@ class _CCOpsList(_pj.modules.JimListModuleBase):
             pj.Jim(graph=4)
         :return: labeled Jim object
         """
-        return _pj.Jim(self._jim_list._jipjimlist.labelConstrainedCCsMultiband(
+        jiplist = self._jim_list._resident()._jipjimlist
+        return _pj.Jim(jiplist.labelConstrainedCCsMultiband(
             ngb._jipjim, 1, 1, 0, global_range, local_range))
 
 
 class _CCOpsVect(_pj.modules.JimVectModuleBase):
     """Define all CCOps methods for JimVects."""
 
+    __slots__ = ()
+
     pass
@@ -89,6 +89,8 @@ def sml(jim_object,
 class _Classify(_pj.modules.JimModuleBase):
     """Define all classification methods for Jims."""
 
+    __slots__ = ()
+
     def reclass(self,
                 classes: list,
                 reclasses: list,
@@ -235,8 +237,12 @@ class _Classify(_pj.modules.JimModuleBase):
 class _ClassifyList(_pj.modules.JimListModuleBase):
     """Define all classification methods for JimLists."""
 
+    __slots__ = ()
+
     pass
 
 
 class _ClassifyVect(_pj.modules.JimVectModuleBase):
     """Define all classification methods for JimVects."""
+
+    __slots__ = ()
@@ -384,6 +384,8 @@ def strahler(jim_object):
 class _DEMOps(_pj.modules.JimModuleBase):
     """Define all DEMOps methods."""
 
+    __slots__ = ()
+
     def catchmentBasinConfluence(self,
                                  d8):
         """Compute the catchment basin confluence.
@@ -724,10 +726,14 @@ class _DEMOps(_pj.modules.JimModuleBase):
 class _DEMOpsList(_pj.modules.JimListModuleBase):
     """Define all DEMOps methods for JimLists."""
 
+    __slots__ = ()
+
     pass
 
 
 class _DEMOpsVect(_pj.modules.JimVectModuleBase):
     """Define all DEMOps methods for JimVects."""
 
+    __slots__ = ()
+
     pass
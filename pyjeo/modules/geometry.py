@@ -20,8 +20,10 @@
 # along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
 
 import os
+import math as _math
 import numpy as _np
 import warnings as _warnings
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
 
 import pyjeo as _pj
 
@@ -112,6 +114,49 @@ def band2plane(jim):
     return result
 
 
+def composite(jim_object,
+              score_band: int = 0,
+              rule: str = 'max',
+              nodata: float = None,
+              index: bool = False,
+              workers: int = None):
+    """Create a best-pixel composite of the planes of a Jim or JimList.
+
+    For each pixel, the plane with the maximum (or minimum) value in the
+    score band is selected and all bands of that plane are copied to the
+    composite (see :py:class:`Compositor`). The members of a JimList are
+    added one by one, without stacking their planes.
+
+    :param jim_object: a multi-plane Jim object or a JimList
+    :param score_band: band with the scores (e.g., NDVI)
+    :param rule: 'max' or 'min' to select the plane with the maximum or
+        minimum score
+    :param nodata: score value to ignore, also set in all bands of the
+        pixels without any valid score
+    :param index: set True to return the index of the selected planes as
+        well
+    :param workers: number of threads (default is the number of CPUs)
+    :return: single plane Jim object, and the index of the selected planes
+        (UInt16 Jim object) if index is True
+
+    Select the plane with the highest NDVI (band 4) of each pixel::
+
+        jiml = pj.JimList.from_paths(paths, max_memory='4GB')
+        best, index = pj.geometry.composite(jiml, score_band=4, nodata=0,
+                                            index=True)
+    """
+    compositor = _pj.Compositor(score_band, rule, nodata, workers)
+    if isinstance(jim_object, _pj.JimList):
+        for member in jim_object:
+            compositor.add(member)
+    elif isinstance(jim_object, _pj.Jim):
+        compositor.add(jim_object)
+    else:
+        raise _pj.exceptions.JimIllegalArgumentError(
+            'Expected a Jim or JimList object as the first argument')
+    return compositor.result(index)
+
+
 def convexHull(jim_vect,
                output: str,
                **kwargs):
@@ -170,6 +215,59 @@ def covers(jim_object,
         return jim_object._jipjim.covers(ulx, uly, lrx, lry)
 
 
+def _mapPlanes(jim_object, operation, workers: int = None):
+    """Apply a single plane jiplib operation on all planes of a Jim object.
+
+    The jiplib crop, cropOgr and warp operations process one plane at a
+    time. The result of the first plane defines the dimensions of the
+    output, which is allocated once; the result of each plane is written
+    directly in its plane of the output.
+
+    The planes are only processed in parallel with workers > 1 if jiplib
+    releases the GIL during the operation. The operation must be thread
+    safe: cropOgr is not (the OGR layer of the extent is shared).
+
+    :param jim_object: a Jim object
+    :param operation: function with a single plane jiplib image as
+        argument, returning the processed jiplib image
+    :param workers: number of threads processing the planes (default is 1)
+    :return: Jim object with the processed planes
+    """
+    nplane = jim_object.properties.nrOfPlane()
+    if nplane == 1:
+        return _pj.Jim(operation(jim_object._jipjim))
+
+    def apply(plane):
+        return _pj.Jim(operation(
+            jim_object._jipjim.cropPlane({'plane': [plane]})))
+
+    first = apply(0)
+    nrow = first.properties.nrOfRow()
+    ncol = first.properties.nrOfCol()
+    nband = first.properties.nrOfBand()
+    jim = _pj.Jim(ncol=ncol, nrow=nrow, nplane=nplane, nband=nband,
+                  otype=first.properties.getDataType())
+    jim.properties.setGeoTransform(first.properties.getGeoTransform())
+    jim.properties.setProjection(first.properties.getProjection())
+    nodata = first.properties.getNoDataVals()
+    if nodata:
+        jim.properties.setNoDataVals(nodata)
+    outputs = [jim.np(band).reshape(nplane, nrow, ncol)
+               for band in range(nband)]
+
+    def process(plane, result=None):
+        if result is None:
+            result = apply(plane)
+        for band, output in enumerate(outputs):
+            output[plane] = result.np(band).reshape(nrow, ncol)
+
+    process(0, first)
+    del first
+    with _ThreadPoolExecutor(max_workers=workers or 1) as executor:
+        list(executor.map(process, range(1, nplane)))
+    return jim
+
+
 def crop(jim_object,
          bbox: list = None,
          ulx: float = None,
@@ -197,10 +295,13 @@ def crop(jim_object,
     :param dy: spatial resolution in y to crop (stride if nogeo is True)
     :param nogeo: use image coordinates if True, default is spatial reference
         system coordinates
+    :param workers: number of threads cropping the planes of a multi-plane
+        Jim object (default is 1, faster only if jiplib releases the GIL)
     :return: Cropped image as Jim instance
 
     see :py:meth:`~_Geometry.crop` for an example how to use this function
     """
+    workers = kwargs.pop('workers', None)
     if bbox is not None:
         ulx = bbox[0]
         uly = bbox[1]
@@ -249,13 +350,8 @@ def crop(jim_object,
         kwargs.update({'dy': dy})
         kwargs.update({'nogeo': nogeo})
 
-        jim = _pj.Jim(_pj.geometry.cropPlane(jim_object, 0)._jipjim.crop(
-            kwargs))
-        for iplane in range(1, jim_object.properties.nrOfPlane()):
-            jimplane = _pj.Jim(_pj.geometry.cropPlane(
-                jim_object, iplane)._jipjim.crop(kwargs))
-            jim.geometry.stackPlane(jimplane)
-        return jim
+        return _mapPlanes(jim_object,
+                          lambda image: image.crop(kwargs), workers)
 
     else:
         if nogeo:
@@ -291,14 +387,8 @@ def crop(jim_object,
         kwargs.update({'lrx': lrx})
         kwargs.update({'lry': lry})
 
-        jim = _pj.Jim(_pj.geometry.cropPlane(jim_object, 0)._jipjim.crop(
-            kwargs))
-        for iplane in range(1, jim_object.properties.nrOfPlane()):
-            jimplane = _pj.Jim(_pj.geometry.cropPlane(
-                jim_object, iplane)._jipjim.crop(kwargs))
-            jim.geometry.stackPlane(jimplane)
-        return jim
-        # return _pj.Jim(jim_object._jipjim.crop(kwargs))
+        return _mapPlanes(jim_object,
+                          lambda image: image.crop(kwargs), workers)
 
 
 def cropBand(jim_object,
@@ -370,14 +460,12 @@ def cropOgr(jim_object,
 
        For instance you can use 'eo':'ATTRIBUTE=fieldname' to burn
            the (numeric) fieldname in the pixel value'
+
+    The planes of a multi-plane Jim object are cropped one by one (OGR
+    layers are not thread safe).
     """
-    jim = _pj.Jim(_pj.geometry.cropPlane(jim_object, 0)._jipjim.cropOgr(
-        extent._jipjimvect, kwargs))
-    for iplane in range(1, jim_object.properties.nrOfPlane()):
-        jimplane = _pj.Jim(_pj.geometry.cropPlane(
-            jim_object, iplane)._jipjim.cropOgr(extent._jipjimvect, kwargs))
-        jim.geometry.stackPlane(jimplane)
-    return jim
+    return _mapPlanes(jim_object,
+                      lambda image: image.cropOgr(extent._jipjimvect, kwargs))
 
 
 def cropPlane(jim_object,
@@ -520,6 +608,7 @@ def extract(jvec,
                     't'+str(ifile) for ifile in range(0, len(jim._jipjimlist))]
             kwargs.update({'bandname': bandname})
 
+            jim = jim._resident(_extractBBox(jim, jvec, kwargs))
             avect = jim._jipjimlist.extractOgr(jvec._jipjimvect,
                                                kwargs)
         else:
@@ -1073,20 +1162,257 @@ def rasterize(jim_object,
     return ajim
 
 
+# maximum number of bytes of a block of rows reduced by a thread
+_REDUCE_BLOCK_SIZE = 16 * 1024 ** 2
+
+
+# rules of reducePlane calculated by blocks of rows
+_BLOCK_RULES = ('mean', 'avg', 'median', 'percentile', 'stdev',
+                'count_valid', 'first_valid', 'last_valid', 'argmin',
+                'argmax')
+
+
+def _reduceBlock(block, valid, rule: str, nodata, q: float = None):
+    """Reduce a block of rows along the planes.
+
+    :param block: numpy array [plane][row][col]
+    :param valid: boolean array of the values to use (same shape as block)
+        or None to use all values
+    :param rule: one of _BLOCK_RULES, or min or max (only if valid is None)
+    :param nodata: value of the pixels without any valid value (the no
+        data value of the index type for argmin and argmax)
+    :param q: percentile (0 to 100) for the percentile rule
+    :return: numpy array [row][col]
+    """
+    nplane = block.shape[0]
+    if valid is None:
+        if rule == 'median':
+            return _np.median(block, axis=0)
+        if rule == 'percentile':
+            return _np.percentile(block, q, axis=0)
+        if rule == 'stdev':
+            return _np.std(block, axis=0, dtype=_np.float64)
+        if rule == 'count_valid':
+            return _np.full(block.shape[1:], nplane)
+        if rule == 'first_valid':
+            return block[0]
+        if rule == 'last_valid':
+            return block[-1]
+        if rule == 'argmin':
+            return _np.argmin(block, axis=0)
+        if rule == 'argmax':
+            return _np.argmax(block, axis=0)
+        if rule == 'min':
+            return _np.min(block, axis=0)
+        if rule == 'max':
+            return _np.max(block, axis=0)
+        return _np.mean(block, axis=0, dtype=_np.float64)
+
+    count = valid.sum(axis=0)
+    if rule == 'count_valid':
+        return count
+    empty = count == 0
+    if rule in ('median', 'percentile'):
+        values = block.astype(_np.float64)
+        values[~valid] = _np.nan
+        # avoid all-NaN slices, overwritten with nodata below
+        values[:, empty] = 0
+        if rule == 'median':
+            reduced = _np.nanmedian(values, axis=0)
+        else:
+            reduced = _np.nanpercentile(values, q, axis=0)
+    elif rule in ('first_valid', 'last_valid'):
+        if rule == 'first_valid':
+            index = _np.argmax(valid, axis=0)
+        else:
+            index = nplane - 1 - _np.argmax(valid[::-1], axis=0)
+        reduced = _np.take_along_axis(block, index[None], axis=0)[0]
+        reduced = reduced.astype(_np.float64)
+    elif rule in ('argmin', 'argmax'):
+        values = block.astype(_np.float64)
+        if rule == 'argmin':
+            values[~valid] = _np.inf
+            reduced = _np.argmin(values, axis=0).astype(_np.float64)
+        else:
+            values[~valid] = -_np.inf
+            reduced = _np.argmax(values, axis=0).astype(_np.float64)
+    else:
+        reduced = _np.sum(block, axis=0, where=valid, dtype=_np.float64)
+        reduced /= _np.maximum(count, 1)
+        if rule == 'stdev':
+            deviation = _np.sum((block - reduced) ** 2, axis=0,
+                                where=valid, dtype=_np.float64)
+            reduced = _np.sqrt(deviation / _np.maximum(count, 1))
+    reduced[empty] = nodata
+    return reduced
+
+
+def _reducedType(jim, rule: str):
+    """Return the data type of a plane reduction (None to keep the type).
+
+    :param jim: multi-plane Jim object
+    :param rule: one of _BLOCK_RULES
+    """
+    if rule == 'stdev':
+        if jim.properties.getDataType() in ('GDT_Float64', 'Float64'):
+            return 'Float64'
+        return 'Float32'
+    if rule in ('count_valid', 'argmin', 'argmax'):
+        return _pj._index_type(jim.properties.nrOfPlane())[0]
+    return None
+
+
+def _reducePlaneBlocks(jim,
+                       jimreduced,
+                       rule: str,
+                       ref_band: int = None,
+                       nodata: float = None,
+                       q: float = None):
+    """Reduce the planes of a Jim object by blocks of rows.
+
+    The input is neither modified nor converted: each thread reduces a
+    block of rows of all bands, so that the temporary arrays are limited to
+    the size of a block. Values equal to nodata (in ref_band if set) are
+    ignored, pixels without any valid value are set to nodata (to the
+    largest value of the data type for argmin and argmax, which is set as
+    the no data value of jimreduced).
+
+    :param jim: multi-plane Jim object
+    :param jimreduced: single plane Jim object with the bands of jim,
+        overwritten with the result (cast to its data type)
+    :param rule: one of _BLOCK_RULES
+    :param ref_band: band defining the values to ignore in all bands
+        (default is to check each band)
+    :param nodata: value to ignore
+    :param q: percentile (0 to 100) for the percentile rule
+    """
+    if rule == 'percentile' and q is None:
+        raise _pj.exceptions.JimIllegalArgumentError(
+            'q must be set for the percentile rule')
+    otype = _reducedType(jim, rule)
+    if otype is not None:
+        jimreduced.pixops.convert(otype=otype)
+    fill = nodata
+    if rule in ('argmin', 'argmax'):
+        # plane indices cannot hold nodata, use a dedicated value
+        fill = _pj._index_type(jim.properties.nrOfPlane())[1]
+        jimreduced.properties.clearNoData()
+        jimreduced.properties.setNoDataVals(fill)
+
+    nplane = jim.properties.nrOfPlane()
+    nrow = jim.properties.nrOfRow()
+    ncol = jim.properties.nrOfCol()
+    nband = jim.properties.nrOfBand()
+
+    sources = [jim.np(band).reshape(nplane, nrow, ncol)
+               for band in range(nband)]
+    targets = [jimreduced.np(band).reshape(nrow, ncol)
+               for band in range(nband)]
+
+    workers = os.cpu_count() or 1
+    rows = max(1, _REDUCE_BLOCK_SIZE // (nplane * ncol * 8))
+    rows = min(rows, int(_math.ceil(nrow / workers)))
+
+    def reduce(start):
+        stop = min(start + rows, nrow)
+        valid = None
+        if nodata is not None and ref_band is not None:
+            valid = sources[ref_band][:, start:stop] != nodata
+        for source, target in zip(sources, targets):
+            block = source[:, start:stop]
+            if nodata is not None and ref_band is None:
+                valid = block != nodata
+            _np.copyto(target[start:stop],
+                       _reduceBlock(block, valid, rule, fill, q),
+                       casting='unsafe')
+
+    with _ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(reduce, range(0, nrow, rows)))
+
+
+def _reducePlaneRule(jim,
+                     rule: str,
+                     ref_band: int = None,
+                     nodata: float = None,
+                     q: float = None):
+    """Reduce the planes of a Jim object with a named rule.
+
+    Rules min and max with a ref_band select the plane of each pixel with
+    a :py:class:`Compositor`, all other rules are reduced by blocks of rows.
+
+    :param jim: multi-plane Jim object
+    :param rule: min, max, overwrite or one of _BLOCK_RULES
+    :param ref_band: band on which to apply rule
+    :param nodata: value to ignore when applying rule
+    :param q: percentile (0 to 100) for the percentile rule
+    :return: reduced single plane Jim object
+    """
+    if rule in ('min', 'max', 'overwrite'):
+        if nodata is not None and ref_band is None:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'use ref_band option for nodata')
+        if rule == 'overwrite':
+            # the last plane (with a valid value in ref_band) wins
+            rule = 'last_valid'
+        elif ref_band is not None:
+            compositor = _pj.Compositor(ref_band, rule, nodata)
+            compositor.add(jim)
+            return compositor.result()
+    elif rule not in _BLOCK_RULES:
+        raise _pj.exceptions.JimIllegalArgumentError('rule not supported')
+
+    jimreduced = _pj.geometry.cropPlane(jim, 0)
+    _reducePlaneBlocks(jim, jimreduced, rule, ref_band, nodata, q)
+    return jimreduced
+
+
 def reducePlane(jim,
                 rule='overwrite',
                 ref_band: int = None,
-                nodata: float = None):
+                nodata: float = None,
+                q: float = None):
     """Reduce planes of Jim object.
 
+    The rules other than min, max and overwrite are calculated by blocks of
+    rows in a pool of threads, without modifying or converting jim.
+
+    +-------------+---------------------------------------------------------+
+    | rule        | result per pixel                                        |
+    +=============+=========================================================+
+    | mean, avg   | mean of the valid values                                |
+    +-------------+---------------------------------------------------------+
+    | median      | median of the valid values                              |
+    +-------------+---------------------------------------------------------+
+    | percentile  | q-th percentile of the valid values                     |
+    +-------------+---------------------------------------------------------+
+    | stdev       | standard deviation of the valid values (Float32)        |
+    +-------------+---------------------------------------------------------+
+    | count_valid | number of valid values (UInt16)                         |
+    +-------------+---------------------------------------------------------+
+    | first_valid | first valid value                                       |
+    +-------------+---------------------------------------------------------+
+    | last_valid  | last valid value                                        |
+    +-------------+---------------------------------------------------------+
+    | argmin      | plane index of the minimum valid value (UInt16)         |
+    +-------------+---------------------------------------------------------+
+    | argmax      | plane index of the maximum valid value (UInt16)         |
+    +-------------+---------------------------------------------------------+
+
+    Values equal to nodata (in ref_band if set) are not valid. Pixels
+    without valid values are set to nodata, except for count_valid and for
+    argmin and argmax, where they are set to the largest value of the data
+    type (65535 for UInt16), which is set as the no data value of the
+    result.
+
     :param jim: jim object on which to reduce planes
-    :param rule: rule to reduce (mean, median, min or max)
+    :param rule: rule to reduce (see table above, min, max or overwrite)
         or callback function
     :param ref_band: band on which to apply rule
         (default is to check all bands,
         not supported when rule is callback function)
     :param nodata: value to ignore when applying rule
         (not supported when rule is callback function)
+    :param q: percentile (0 to 100) for the percentile rule
     :return: reduced single plane jim object
     """
     nr_of_planes = jim.properties.nrOfPlane()
@@ -1096,134 +1422,8 @@ def reducePlane(jim,
         )
         return jim
 
-    jimreduced = _pj.geometry.cropPlane(jim, 0)
-
     if isinstance(rule, str):
-        nr_of_row = jim.properties.nrOfRow()
-        nr_of_col = jim.properties.nrOfCol()
-
-        if rule in ('mean', 'avg', 'median'):
-            if rule == 'median':
-                nan_func = _np.nanmedian
-                func = _np.median
-            else:
-                nan_func = _np.nanmean
-                func = _np.mean
-
-            d_type = jim.properties.getDataType()
-            nr_of_bands = jim.properties.nrOfBand()
-            if nodata is not None and d_type not in ('GDT_Float32',
-                                                     'GDT_Float64'):
-                jim = _pj.pixops.convert(jim, otype='GDT_Float32')
-            if ref_band is not None:
-                # create plane-wise mask for the ref_band
-                mask = _pj.geometry.cropBand(jim,
-                                             band=ref_band)
-
-                # create one-plane boolean mask containing True where
-                # nodata value is in all planes
-                planes = [mask.np()[i] for i in range(nr_of_planes)]
-                stacked_planes = _np.vstack(planes)
-
-                diffs = _np.abs(
-                    _np.diff(stacked_planes.reshape(len(planes), -1),
-                             axis=0)) == 0
-
-                same_values = diffs[0]
-                for i in range(1, len(diffs)):
-                    same_values = _np.logical_and(same_values, diffs[i])
-
-                same_values = _np.reshape(same_values,
-                                          (nr_of_row, nr_of_col))
-
-                nodata_mask = same_values & (mask.np()[0] == nodata)
-
-            for iband in range(0, nr_of_bands):
-                if nodata is not None:
-                    if ref_band is None:
-                        # create one-plane boolean mask containing True
-                        # where nodata value is in all planes
-                        planes = [jim.np(iband)[i] for i
-                                  in range(nr_of_planes)]
-                        stacked_planes = _np.vstack(planes)
-
-                        diffs = _np.abs(
-                            _np.diff(
-                                stacked_planes.reshape(len(planes), -1),
-                                axis=0)) == 0
-
-                        same_values = diffs[0]
-                        for i in range(1, len(diffs)):
-                            same_values = _np.logical_and(same_values,
-                                                          diffs[i])
-
-                        same_values = _np.reshape(same_values,
-                                                  (nr_of_row, nr_of_col))
-
-                        nodata_mask = same_values & (
-                            jim.np(iband)[0] == nodata)
-
-                        # compute the reduction function
-                        jim.np(iband)[jim.np(iband) == nodata] = _np.nan
-                        jimreduced.np(iband)[:] = nan_func(
-                            jim.np(iband), axis=0)
-                        jimreduced.np(iband)[nodata_mask] = nodata
-                    else:
-                        jim.np(iband)[
-                            mask.np() == nodata] = _np.nan
-                        jimreduced.np(iband)[:] = nan_func(
-                            jim.np(iband), axis=0)
-                        jimreduced.np(iband)[nodata_mask] = nodata
-                else:
-                    jimreduced.np(iband)[:] = func(
-                        jim.np(iband), axis=0)
-            if nodata is not None:
-                if d_type not in ('GDT_Float32', 'GDT_Float64'):
-                    jimreduced.pixops.convert(otype=d_type)
-                    jim.pixops.convert(otype=d_type)
-        else:
-            if nodata is not None and ref_band is None:
-                raise _pj.exceptions.JimIllegalArgumentError(
-                    'use ref_band option for nodata')
-
-            if rule == 'max':
-                def rule(reduced, plane):
-                    """Rule for max."""
-                    return reduced < plane
-            elif rule == 'min':
-                def rule(reduced, plane):
-                    """Rule for min."""
-                    return reduced > plane
-            elif rule == 'overwrite':
-                def rule(reduced, plane):
-                    """Rule for overwrite."""
-                    return _pj.pixops.setData(plane, 1)
-            else:
-                raise _pj.exceptions.JimIllegalArgumentError(
-                    'rule not supported')
-
-            if ref_band is not None:
-                maskreduced = _pj.geometry.cropBand(jimreduced, ref_band)
-
-            for iplane in range(1, nr_of_planes):
-                jimplane = _pj.geometry.cropPlane(jim, iplane)
-
-                if ref_band is not None:
-                    maskplane = _pj.geometry.cropBand(jimplane, ref_band)
-                    themask = rule(maskreduced, maskplane)
-                    if nodata is not None:
-                        themask |= maskreduced == nodata
-                        themask &= maskplane != nodata
-                    maskreduced[themask] = maskplane
-                else:
-                    themask = rule(jimreduced, jimplane)
-
-                jimreduced[themask] = jimplane
-
-                if nodata is not None:
-                    nodata_mask = (maskreduced == nodata) & \
-                                  (maskplane == nodata)
-                    jimreduced[nodata_mask] = nodata
+        jimreduced = _reducePlaneRule(jim, rule, ref_band, nodata, q)
     else:
         if nodata is not None or ref_band is not None:
             raise _pj.exceptions.JimIllegalArgumentError(
@@ -1263,6 +1463,69 @@ def reducePlane(jim,
     return jimreduced
 
 
+def reduceStream(source,
+                 rule: str = 'mean',
+                 ref_band: int = None,
+                 nodata: float = None,
+                 q: float = None,
+                 bins: int = 64,
+                 value_range: tuple = None,
+                 workers: int = None,
+                 max_memory='8GB',
+                 **kwargs):
+    """Reduce the planes of a sequence of rasters without stacking them.
+
+    The rasters are read one at a time and their planes are folded into
+    running accumulators, so that the memory used is in the order of one
+    raster (see :py:func:`reducePlane` for the rules, also supported here).
+    The rules min and max with a ref_band select the plane of each pixel
+    with a :py:class:`Compositor`.
+
+    Median and percentile are approximated from a histogram per pixel and
+    band with bins bins over value_range, exact up to the width of a bin.
+    The histograms take bins * 2 bytes per pixel and band (bins * 4 beyond
+    65535 planes), e.g., 128 bytes with the default 64 bins: use fewer
+    bins or smaller extents for large rasters. Use bins=256 for exact
+    values of Byte data. A JimIllegalArgumentError is raised before
+    allocating accumulators larger than max_memory.
+
+    :param source: list of paths to rasters, a JimList or a Jim object
+    :param rule: rule to reduce (see :py:func:`reducePlane`)
+    :param ref_band: band on which to apply rule (default is to check all
+        bands)
+    :param nodata: value to ignore when applying rule
+    :param q: percentile (0 to 100) for the percentile rule
+    :param bins: number of bins of the histograms (median, percentile)
+    :param value_range: (min, max) range of the histograms, required for
+        median and percentile of data types other than Byte
+    :param workers: number of threads (default is the number of CPUs)
+    :param max_memory: maximum size of the accumulators, in bytes or as a
+        string (e.g., '512MB' or '8GB')
+    :param kwargs: keys used to open the rasters (see :ref:`Jim
+        constructor <create_Jim_from_file>`)
+    :return: reduced single plane Jim object
+
+    Calculate the mean and standard deviation of a year of scenes::
+
+        mean = pj.geometry.reduceStream(paths, 'mean', nodata=0)
+        stdev = pj.geometry.reduceStream(paths, 'stdev', nodata=0)
+    """
+    if rule in ('min', 'max') and ref_band is not None:
+        reducer = _pj.Compositor(ref_band, rule, nodata, workers)
+    else:
+        reducer = _pj.stream._Accumulator(rule, ref_band, nodata, q, bins,
+                                          value_range, workers, max_memory)
+
+    if isinstance(source, _pj.Jim):
+        source = [source]
+    for item in source:
+        if isinstance(item, _pj.Jim):
+            reducer.add(item)
+        else:
+            reducer.add(_pj.Jim(str(item), **kwargs))
+    return reducer.result()
+
+
 def repeat(jim_object,
            n: int,
            axis: int):
@@ -1441,9 +1704,10 @@ def stackBand(jim_object,
             _check_number_of_bands(band, nr_of_band)
 
             ret_jim = _pj.Jim(
-                jim_object._jipjimlist.stackBand({'band': band}))
+                jim_object._resident()._jipjimlist.stackBand({'band': band}))
         else:
-            ret_jim = _pj.Jim(jim_object._jipjimlist.stackBand())
+            ret_jim = _pj.Jim(
+                jim_object._resident()._jipjimlist.stackBand())
 
         if isinstance(jim_other, _pj.Jim):
             if band:
@@ -1451,11 +1715,12 @@ def stackBand(jim_object,
             else:
                 ret_jim.geometry.stackBand(jim_other)
         elif isinstance(jim_other, _pj.JimList):
+            jiplist_other = jim_other._resident()._jipjimlist
             if band:
                 jim_to_stack = _pj.Jim(
-                    jim_other._jipjimlist.stackBand({'band': band}))
+                    jiplist_other.stackBand({'band': band}))
             else:
-                jim_to_stack = _pj.Jim(jim_other._jipjimlist.stackBand())
+                jim_to_stack = _pj.Jim(jiplist_other.stackBand())
 
             ret_jim = _pj.Jim(ret_jim._jipjim.stackBand(
                 jim_to_stack._jipjim))
@@ -1503,28 +1768,26 @@ def stackPlane(jim_object,
         jimlist = pj.JimList([jim0, jim1])
         jim_stacked = pj.geometry.stackPlane(jimlist)
     """
-    if not isinstance(jim_other, list):
+    if jim_other is None:
+        args_list = []
+    elif not isinstance(jim_other, list):
         args_list = [jim_other]
     else:
-        args_list = jim_other
+        args_list = list(jim_other)
 
     if args:
         args_list.extend(args)
 
     if isinstance(jim_object, _pj.JimList):
-        ret_jim = _pj.Jim(jim_object._jipjimlist.stackPlane())
-
-        if jim_other is not None:
-            for jim in args_list:
-                ret_jim._jipjim.d_stackPlane(jim._jipjim)
+        if args_list:
+            ret_jim = _pj.Cube.from_list(jim_object._members() + args_list)
+        else:
+            ret_jim = _pj.Cube.from_list(jim_object)
     elif isinstance(jim_object, _pj.Jim):
         if jim_other is None:
             return _pj.Jim(jim_object)
 
-        ret_jim = _pj.Jim(jim_object)
-
-        for jim in args_list:
-            ret_jim._jipjim.d_stackPlane(jim._jipjim)
+        ret_jim = _pj.Cube.from_list([jim_object] + args_list)
     else:
         raise _pj.exceptions.JimIllegalArgumentError(
             'Expected a Jim or JimList object as the first argument')
@@ -1573,6 +1836,9 @@ def warp(jim_object,
     +----------+---------------------------------------------------------------------------------------------------+
     | nodata   | Nodata value to put in image if out of bounds                                                     |
     +----------+---------------------------------------------------------------------------------------------------+
+    | workers  | Number of threads warping the planes of a multi-plane Jim object (default is 1, faster only if    |
+    |          | jiplib releases the GIL)                                                                          |
+    +----------+---------------------------------------------------------------------------------------------------+
 
     Example:
 
@@ -1593,6 +1859,7 @@ def warp(jim_object,
         jim_warped = pj.geometry.warp(jim, 'epsg:3035', s_srs='epsg:4326')
 
     """
+    workers = kwargs.pop('workers', None)
     kwargs.update({'t_srs': t_srs})
 
     if bbox is not None:
@@ -1609,20 +1876,42 @@ def warp(jim_object,
     kwargs.update({'dy': dy})
 
     if isinstance(jim_object, _pj.Jim):
-        jim = _pj.Jim(_pj.geometry.cropPlane(jim_object, 0)._jipjim.warp(kwargs))
-        for iplane in range(1, jim_object.properties.nrOfPlane()):
-            jimplane = _pj.Jim(_pj.geometry.cropPlane(jim_object,
-                                                    iplane)._jipjim.warp(kwargs))
-            jim.geometry.stackPlane(jimplane)
-        return jim
+        return _mapPlanes(jim_object, lambda image: image.warp(kwargs),
+                          workers)
     elif isinstance(jim_object, _pj.JimVect):
         raise _pj.exceptions.JimVectNotSupportedError(
             "warp not supported yet for JimVect")
 
 
+def _extractBBox(jim_list, jim_vect, kwargs):
+    """Get the bounding box to read a lazy JimList for an extraction.
+
+    :param jim_list: JimList
+    :param jim_vect: JimVect with the features to extract
+    :param kwargs: keys of the extraction (buffer is taken into account)
+    :return: [ulx, uly, lrx, lry] in the projection of the JimList, None to
+        read the members entirely (or if the JimList is not lazy)
+    """
+    if jim_list._residency is None or not jim_list._members():
+        return None
+    first = jim_list._members()[0]
+    ulx, uly, lrx, lry = jim_vect.properties.getBBox(
+        t_srs=first.properties.getProjection())
+    margin = abs(kwargs.get('buffer', 0) or 0) + \
+        max(first.properties.getDeltaX(), first.properties.getDeltaY())
+    extent = first.properties.getBBox()
+    bbox = [max(ulx - margin, extent[0]), min(uly + margin, extent[1]),
+            min(lrx + margin, extent[2]), max(lry - margin, extent[3])]
+    if bbox[0] >= bbox[2] or bbox[3] >= bbox[1]:
+        return None
+    return bbox
+
+
 class _Geometry(_pj.modules.JimModuleBase):
     """Define all Geometry methods."""
 
+    __slots__ = ()
+
     def band2plane(self):
         """Convert 2-dimensional multi-band object to a 3-dimensional.
 
@@ -1677,6 +1966,40 @@ class _Geometry(_pj.modules.JimModuleBase):
         """
         self._jim_object._jipjim.d_band2plane()
 
+    def composite(self,
+                  score_band: int = 0,
+                  rule: str = 'max',
+                  nodata: float = None,
+                  index: bool = False,
+                  workers: int = None):
+        """Replace the planes by their best-pixel composite.
+
+        Modifies the instance on which the method was called.
+        See :py:func:`geometry.composite`.
+
+        :param score_band: band with the scores (e.g., NDVI)
+        :param rule: 'max' or 'min' to select the plane with the maximum or
+            minimum score
+        :param nodata: score value to ignore, also set in all bands of the
+            pixels without any valid score
+        :param index: set True to return the index of the selected planes
+        :param workers: number of threads (default is the number of CPUs)
+        :return: index of the selected planes (UInt16 Jim object) if index
+            is True, None otherwise
+
+        Keep the pixels with the lowest cloud probability (band 0)::
+
+            jim_stacked.geometry.composite(score_band=0, rule='min')
+        """
+        compositor = _pj.Compositor(score_band, rule, nodata, workers)
+        compositor.add(self._jim_object)
+        result = compositor.result(index)
+        if index:
+            self._jim_object._set(result[0]._jipjim)
+            return result[1]
+        self._jim_object._set(result._jipjim)
+        return None
+
     def covers(self,
                bbox: list = None,
                ulx: float = None,
@@ -1745,6 +2068,9 @@ class _Geometry(_pj.modules.JimModuleBase):
             reference system coordinates
         :param nodata: set no data in case the specified bounding box is not
             within the object boundaries (default is 0)
+        :param workers: number of threads cropping the planes of a
+            multi-plane Jim object (default is 1, faster only if jiplib
+            releases the GIL)
 
         Example:
 
@@ -1773,6 +2099,7 @@ class _Geometry(_pj.modules.JimModuleBase):
                               lry=jim.properties.nrOfRow()+1, nogeo=True)
 
         """
+        workers = kwargs.pop('workers', None)
         if bbox is not None:
             ulx = bbox[0]
             uly = bbox[1]
@@ -1862,12 +2189,8 @@ class _Geometry(_pj.modules.JimModuleBase):
             kwargs.update({'dy': dy})
             kwargs.update({'nogeo': nogeo})
 
-            jim = _pj.Jim(_pj.geometry.cropPlane(self._jim_object,
-                                                 0)._jipjim.crop(kwargs))
-            for iplane in range(1, self._jim_object.properties.nrOfPlane()):
-                jimplane = _pj.Jim(_pj.geometry.cropPlane(
-                    self._jim_object, iplane)._jipjim.crop(kwargs))
-                jim.geometry.stackPlane(jimplane)
+            jim = _mapPlanes(self._jim_object,
+                             lambda image: image.crop(kwargs), workers)
             self._jim_object._set(jim._jipjim)
             # self._jim_object._set(self._jim_object._jipjim.crop(kwargs))
         # else:
@@ -1978,14 +2301,13 @@ class _Geometry(_pj.modules.JimModuleBase):
 
            For instance you can use 'eo':'ATTRIBUTE=fieldname' to burn
            the (numeric) fieldname in the pixel value'
+
+        The planes of a multi-plane Jim object are cropped one by one (OGR
+        layers are not thread safe).
         """
-        jim = _pj.Jim(_pj.geometry.cropPlane(
-            self._jim_object, 0)._jipjim.cropOgr(extent._jipjimvect, kwargs))
-        for iplane in range(1, self._jim_object.properties.nrOfPlane()):
-            jimplane = _pj.Jim(_pj.geometry.cropPlane(
-                self._jim_object, iplane)._jipjim.cropOgr(extent._jipjimvect,
-                                                          kwargs))
-            jim.geometry.stackPlane(jimplane)
+        jim = _mapPlanes(
+            self._jim_object,
+            lambda image: image.cropOgr(extent._jipjimvect, kwargs))
         self._jim_object._set(jim._jipjim)
         # self._jim_object._set(
         #     self._jim_object._jipjim.cropOgr(extent._jipjimvect, kwargs))
@@ -2463,16 +2785,23 @@ class _Geometry(_pj.modules.JimModuleBase):
     def reducePlane(self,
                     rule='overwrite',
                     ref_band: int = None,
-                    nodata: float = None):
+                    nodata: float = None,
+                    q: float = None):
         """Reduce planes of Jim object.
 
-        :param rule: rule to reduce (mean, median, min or max)
-            or callback function
+        See :py:func:`geometry.reducePlane` for the rules. The rules other
+        than min, max and overwrite are calculated by blocks of rows in a
+        pool of threads.
+
+        :param rule: rule to reduce (mean, median, percentile, stdev,
+            count_valid, first_valid, last_valid, argmin, argmax, min, max
+            or overwrite) or callback function
         :param ref_band: band on which to apply rule
             (default is to check all bands,
             not supported when rule is callback function)
         :param nodata: value to ignore when applying rule
             (not supported when rule is callback function)
+        :param q: percentile (0 to 100) for the percentile rule
 
         Stack planes of two single plane jim objects, then reduce by taking
         the means::
@@ -2492,6 +2821,11 @@ class _Geometry(_pj.modules.JimModuleBase):
                 return pj.pixops.supremum(reduced, plane)
             jim_stacked.geometry.reducePlane(getMax)
 
+        Reduce a time series to the 90th percentile of the values different
+        from 0::
+
+            jim_stacked.geometry.reducePlane('percentile', q=90, nodata=0)
+
         """
         nr_of_planes = self._jim_object.properties.nrOfPlane()
         if nr_of_planes < 2:
@@ -2500,135 +2834,9 @@ class _Geometry(_pj.modules.JimModuleBase):
             )
             return None
 
-        jimreduced = _pj.geometry.cropPlane(self._jim_object, 0)
         if isinstance(rule, str):
-            nr_of_row = self._jim_object.properties.nrOfRow()
-            nr_of_col = self._jim_object.properties.nrOfCol()
-
-            if rule in ('mean', 'avg', 'median'):
-                if rule == 'median':
-                    nan_func = _np.nanmedian
-                    func = _np.median
-                else:
-                    nan_func = _np.nanmean
-                    func = _np.mean
-
-                d_type = self._jim_object.properties.getDataType()
-                nr_of_bands = self._jim_object.properties.nrOfBand()
-                if nodata is not None and d_type not in ('GDT_Float32',
-                                                         'GDT_Float64'):
-                    self._jim_object.pixops.convert(otype='GDT_Float32')
-                if ref_band is not None:
-                    # create plane-wise mask for the ref_band
-                    mask = _pj.geometry.cropBand(self._jim_object,
-                                                 band=ref_band)
-
-                    # create one-plane boolean mask containing True where
-                    # nodata value is in all planes
-                    planes = [mask.np()[i] for i in range(nr_of_planes)]
-                    stacked_planes = _np.vstack(planes)
-
-                    diffs = _np.abs(
-                        _np.diff(stacked_planes.reshape(len(planes), -1),
-                                 axis=0)) == 0
-
-                    same_values = diffs[0]
-                    for i in range(1, len(diffs)):
-                        same_values = _np.logical_and(same_values, diffs[i])
-
-                    same_values = _np.reshape(same_values,
-                                              (nr_of_row, nr_of_col))
-
-                    nodata_mask = same_values & (mask.np()[0] == nodata)
-
-                for iband in range(0, nr_of_bands):
-                    if nodata is not None:
-                        if ref_band is None:
-                            # create one-plane boolean mask containing True
-                            # where nodata value is in all planes
-                            planes = [self._jim_object.np(iband)[i] for i
-                                      in range(nr_of_planes)]
-                            stacked_planes = _np.vstack(planes)
-
-                            diffs = _np.abs(
-                                _np.diff(
-                                    stacked_planes.reshape(len(planes), -1),
-                                    axis=0)) == 0
-
-                            same_values = diffs[0]
-                            for i in range(1, len(diffs)):
-                                same_values = _np.logical_and(
-                                    same_values, diffs[i])
-
-                            same_values = _np.reshape(same_values,
-                                                      (nr_of_row, nr_of_col))
-
-                            nodata_mask = same_values & (
-                                self._jim_object.np(iband)[0] == nodata)
-
-                            # compute the reduction function
-                            self._jim_object.np(iband)[self._jim_object.np(
-                                iband) == nodata] = _np.nan
-                            jimreduced.np(iband)[:] = nan_func(
-                                self._jim_object.np(iband), axis=0)
-                            jimreduced.np(iband)[nodata_mask] = nodata
-                        else:
-                            self._jim_object.np(iband)[
-                                mask.np() == nodata] = _np.nan
-                            jimreduced.np(iband)[:] = nan_func(
-                                self._jim_object.np(iband), axis=0)
-                            jimreduced.np(iband)[nodata_mask] = nodata
-                    else:
-                        jimreduced.np(iband)[:] = func(
-                            self._jim_object.np(iband), axis=0)
-                if nodata is not None:
-                    if d_type not in ('GDT_Float32', 'GDT_Float64'):
-                        jimreduced.pixops.convert(otype=d_type)
-                        self._jim_object.pixops.convert(otype=d_type)
-            else:
-                if nodata is not None and ref_band is None:
-                    raise _pj.exceptions.JimIllegalArgumentError(
-                        'use ref_band option for nodata')
-
-                if rule == 'max':
-                    def rule(reduced, plane):
-                        """Rule for max."""
-                        return reduced < plane
-                elif rule == 'min':
-                    def rule(reduced, plane):
-                        """Rule for min."""
-                        return reduced > plane
-                elif rule == 'overwrite':
-                    def rule(reduced, plane):
-                        """Rule for overwrite."""
-                        return _pj.pixops.setData(plane, 1)
-                else:
-                    raise _pj.exceptions.JimIllegalArgumentError(
-                        'rule not supported')
-
-                if ref_band is not None:
-                    maskreduced = _pj.geometry.cropBand(jimreduced, ref_band)
-
-                for iplane in range(1, nr_of_planes):
-                    jimplane = _pj.geometry.cropPlane(self._jim_object, iplane)
-
-                    if ref_band is not None:
-                        maskplane = _pj.geometry.cropBand(jimplane, ref_band)
-                        themask = rule(maskreduced, maskplane)
-                        if nodata is not None:
-                            themask.pixops.convert('GDT_Byte')
-                            themask |= maskreduced == nodata
-                            themask &= maskplane != nodata
-                        maskreduced[themask] = maskplane
-                    else:
-                        themask = rule(jimreduced, jimplane)
-
-                    jimreduced[themask] = jimplane
-
-                    if nodata is not None:
-                        nodata_mask = (maskreduced == nodata) & \
-                                      (maskplane == nodata)
-                        jimreduced[nodata_mask] = nodata
+            jimreduced = _reducePlaneRule(self._jim_object, rule, ref_band,
+                                          nodata, q)
         else:
             if nodata is not None or ref_band is not None:
                 raise _pj.exceptions.JimIllegalArgumentError(
@@ -2817,13 +3025,10 @@ class _Geometry(_pj.modules.JimModuleBase):
         if not isinstance(jim_other, list):
             args_list = [jim_other, *args]
         else:
-            args_list = jim_other
-
-        if args:
-            args_list.extend(args)
+            args_list = list(jim_other) + list(args)
 
-        for jim in args_list:
-            self._jim_object._jipjim.d_stackPlane(jim._jipjim)
+        self._jim_object._set(
+            _pj.Cube.from_list([self._jim_object] + args_list)._jipjim)
 
     def warp(self,
              t_srs,
@@ -2865,6 +3070,9 @@ class _Geometry(_pj.modules.JimModuleBase):
         +----------+---------------------------------------------------------------------------------------------------+
         | nodata   | Nodata value to put in image if out of bounds                                                     |
         +----------+---------------------------------------------------------------------------------------------------+
+        | workers  | Number of threads warping the planes of a multi-plane Jim object (default is 1, faster only if    |
+        |          | jiplib releases the GIL)                                                                          |
+        +----------+---------------------------------------------------------------------------------------------------+
 
         Example:
 
@@ -2885,6 +3093,7 @@ class _Geometry(_pj.modules.JimModuleBase):
             jim.warp('epsg:3035', s_srs='epsg:4326')
 
         """
+        workers = kwargs.pop('workers', None)
         kwargs.update({'t_srs': t_srs})
 
         if bbox is not None:
@@ -2900,12 +3109,8 @@ class _Geometry(_pj.modules.JimModuleBase):
         kwargs.update({'dx': dx})
         kwargs.update({'dy': dy})
 
-        jim = _pj.Jim(_pj.geometry.cropPlane(
-            self._jim_object, 0)._jipjim.warp(kwargs))
-        for iplane in range(1, self._jim_object.properties.nrOfPlane()):
-            jimplane = _pj.Jim(_pj.geometry.cropPlane(
-                self._jim_object, iplane)._jipjim.warp(kwargs))
-            jim.geometry.stackPlane(jimplane)
+        jim = _mapPlanes(self._jim_object, lambda image: image.warp(kwargs),
+                         workers)
         self._jim_object._set(jim._jipjim)
         # self._jim_object._set(self._jim_object._jipjim.warp(kwargs))
 
@@ -2913,6 +3118,33 @@ class _Geometry(_pj.modules.JimModuleBase):
 class _GeometryList(_pj.modules.JimListModuleBase):
     """Define all Geometry methods for JimLists."""
 
+    __slots__ = ()
+
+    def composite(self,
+                  score_band: int = 0,
+                  rule: str = 'max',
+                  nodata: float = None,
+                  index: bool = False,
+                  workers: int = None):
+        """Create a best-pixel composite of the planes of all members.
+
+        Members are added one by one (and read one by one for lazy
+        JimLists), see :py:func:`geometry.composite`.
+
+        :param score_band: band with the scores (e.g., NDVI)
+        :param rule: 'max' or 'min' to select the plane with the maximum or
+            minimum score
+        :param nodata: score value to ignore, also set in all bands of the
+            pixels without any valid score
+        :param index: set True to return the index of the selected planes as
+            well
+        :param workers: number of threads (default is the number of CPUs)
+        :return: single plane Jim object, and the index of the selected
+            planes (UInt16 Jim object) if index is True
+        """
+        return composite(self._jim_list, score_band, rule, nodata, index,
+                         workers)
+
     def stackBand(self,
                   jim_other=None,
                   band: int = None):
@@ -2938,15 +3170,15 @@ class _GeometryList(_pj.modules.JimListModuleBase):
             jimlist = pj.JimList([jim0, jim1, jim2])
             jim_stacked = jimlist.geometry.stackBand([0, 2])
         """
+        jiplist = self._jim_list._resident()._jipjimlist
         if band:
             nr_of_band = self._jim_list[0].properties.nrOfBand()
             if band is not None and band > nr_of_band:
                 raise _pj.exceptions.JimBandsError('Band out of bounds')
 
-            ret_jim = _pj.Jim(
-                self._jim_list._jipjimlist.stackBand({'band': band}))
+            ret_jim = _pj.Jim(jiplist.stackBand({'band': band}))
         else:
-            ret_jim = _pj.Jim(self._jim_list._jipjimlist.stackBand())
+            ret_jim = _pj.Jim(jiplist.stackBand())
 
         if isinstance(jim_other, _pj.Jim):
             if band:
@@ -2954,11 +3186,12 @@ class _GeometryList(_pj.modules.JimListModuleBase):
             else:
                 ret_jim.geometry.stackBand(jim_other)
         elif isinstance(jim_other, _pj.JimList):
+            jiplist_other = jim_other._resident()._jipjimlist
             if band:
                 jim_to_stack = _pj.Jim(
-                    jim_other._jipjimlist.stackBand({'band': band}))
+                    jiplist_other.stackBand({'band': band}))
             else:
-                jim_to_stack = _pj.Jim(jim_other._jipjimlist.stackBand())
+                jim_to_stack = _pj.Jim(jiplist_other.stackBand())
 
             ret_jim = _pj.Jim(ret_jim._jipjim.stackBand(
                 jim_to_stack._jipjim))
@@ -2980,25 +3213,26 @@ class _GeometryList(_pj.modules.JimListModuleBase):
             jim1 = pj.Jim('/path/to/raster1.tif')
             jim_stacked = pj.JimList([jim0, jim1]).geometry.stackPlane()
         """
-        if not isinstance(jim_other, list):
+        if jim_other is None:
+            args_list = []
+        elif not isinstance(jim_other, list):
             args_list = [jim_other]
         else:
-            args_list = jim_other
+            args_list = list(jim_other)
 
         if args:
             args_list.extend(args)
 
-        ret_jim = _pj.Jim(self._jim_list._jipjimlist.stackPlane())
-
-        if jim_other is not None:
-            for jim in args_list:
-                ret_jim._jipjim.d_stackPlane(jim._jipjim)
-        return ret_jim
+        if args_list:
+            return _pj.Cube.from_list(self._jim_list._members() + args_list)
+        return _pj.Cube.from_list(self._jim_list)
 
 
 class _GeometryVect(_pj.modules.JimVectModuleBase):
     """Define all Geometry methods for JimVects."""
 
+    __slots__ = ()
+
     def append(self,
                jvec,
                **kwargs):
@@ -3200,7 +3434,7 @@ class _GeometryVect(_pj.modules.JimVectModuleBase):
             kwargs['class'] = classes
 
         bandname = kwargs.pop('bandname', None)
-        if isinstance(jim, _pj.Jim):
+        if isinstance(jim, (_pj.Jim, _pj.JimView)):
             if bandname is None:
                 bandname = [
                     'b' + str(band)
@@ -3214,6 +3448,7 @@ class _GeometryVect(_pj.modules.JimVectModuleBase):
                     't'+str(ifile) for ifile in range(0, len(jim._jipjimlist))]
             kwargs.update({'bandname': bandname})
 
+            jim = jim._resident(_extractBBox(jim, self._jim_vect, kwargs))
             avect = jim._jipjimlist.extractOgr(self._jim_vect._jipjimvect,
                                                kwargs)
         else:
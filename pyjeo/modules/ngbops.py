@@ -647,6 +647,8 @@ def smoothNoData1d(jim_object,
 class _NgbOps(_pj.modules.JimModuleBase):
     """Define all NgbOps methods."""
 
+    __slots__ = ()
+
     def dwt1d(self,
               wavelet: str = None,
               family: str = None,
@@ -1611,10 +1613,14 @@ class _NgbOps(_pj.modules.JimModuleBase):
 class _NgbOpsList(_pj.modules.JimListModuleBase):
     """Define all NgbOps methods for JimLists."""
 
+    __slots__ = ()
+
     pass
 
 
 class _NgbOpsVect(_pj.modules.JimVectModuleBase):
     """Define all NgbOps methods for JimVects."""
 
+    __slots__ = ()
+
     pass
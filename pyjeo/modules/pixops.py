@@ -19,6 +19,9 @@
 # You should have received a copy of the GNU General Public License
 # along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
 
+import os as _os
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+
 import numpy as _np
 
 import pyjeo as _pj
@@ -95,20 +98,18 @@ def histoCompress(jim_object,
 
 
 def infimum(jim,
-            *args):
+            *args,
+            workers: int = None):
     """Create Jim composed using minimum rule from provided Jim objects.
 
     :param jim: Jim object (to be sure that at least one is provided)
     :param args: Jim objects
+    :param workers: number of threads to reduce a JimList (default is the
+        number of CPUs)
     :return: Jim composed of smalles values from provided Jim objects
     """
     if isinstance(jim, _pj.JimList):
-        inf = None
-        for newJim in jim:
-            if inf is None:
-                inf = _pj.Jim(jim[0])
-            else:
-                inf._jipjim.d_pointOpArith(newJim._jipjim, 4)
+        inf = _reduceList(jim, _np.minimum, workers)
     else:
         inf = _pj.Jim(jim)
     for newJim in args:
@@ -328,20 +329,18 @@ def stretch(jim_object,
 
 
 def supremum(jim,
-             *args):
+             *args,
+             workers: int = None):
     """Create Jim composed using maximum rule from provided Jim objects.
 
     :param jim: Jim object (to be sure that at least one is provided)
     :param args: Jim objects
+    :param workers: number of threads to reduce a JimList (default is the
+        number of CPUs)
     :return: Jim composed of biggest values from provided Jim objects
     """
     if isinstance(jim, _pj.JimList):
-        sup = None
-        for newJim in jim:
-            if sup is None:
-                sup = _pj.Jim(jim[0])
-            else:
-                sup._jipjim.d_pointOpArith(newJim._jipjim, 5)
+        sup = _reduceList(jim, _np.maximum, workers)
     else:
         sup = _pj.Jim(jim)
     for newJim in args:
@@ -350,9 +349,72 @@ def supremum(jim,
     return sup
 
 
+def _merge(target, other, ufunc):
+    """Apply a binary ufunc pixel wise, in place in the target Jim object.
+
+    :param target: Jim object to be modified
+    :param other: Jim object with the same number of bands or a single band
+    :param ufunc: numpy ufunc (e.g., numpy.minimum)
+    :return: the target Jim object
+    """
+    single_band = other.properties.nrOfBand() == 1
+    for band in range(target.properties.nrOfBand()):
+        array = target.np(band)
+        ufunc(array, other.np(0 if single_band else band), out=array,
+              casting='unsafe')
+    return target
+
+
+def _reduceList(jim_list, ufunc, workers: int = None):
+    """Reduce the members of a JimList pixel wise in a pool of threads.
+
+    The members are split in (at most) workers contiguous groups. Each
+    group is folded in its own accumulator (a copy of its first member) by
+    a thread, after which the accumulators are merged pairwise, with a
+    depth of log2(workers). The numpy ufuncs release the GIL, so that the
+    threads run in parallel. Members of lazy JimLists are read in the
+    threads.
+
+    :param jim_list: JimList
+    :param ufunc: commutative and associative numpy ufunc (e.g.,
+        numpy.minimum)
+    :param workers: number of threads (default is the number of CPUs)
+    :return: a new Jim object, None if the JimList is empty
+    """
+    if not jim_list:
+        return None
+    if workers is None:
+        workers = _os.cpu_count() or 1
+    workers = max(1, min(workers, len(jim_list)))
+
+    bounds = [len(jim_list) * group // workers for group in range(workers + 1)]
+    # the accumulators are created in the calling thread (memory scope)
+    accumulators = [_pj.Jim(jim_list[bounds[group]])
+                    for group in range(workers)]
+
+    def fold(group):
+        accumulator = accumulators[group]
+        for index in range(bounds[group] + 1, bounds[group + 1]):
+            _merge(accumulator, jim_list[index], ufunc)
+        return accumulator
+
+    with _ThreadPoolExecutor(max_workers=workers) as executor:
+        accumulators = list(executor.map(fold, range(workers)))
+        while len(accumulators) > 1:
+            merged = list(executor.map(
+                lambda pair: _merge(pair[0], pair[1], ufunc),
+                zip(accumulators[0::2], accumulators[1::2])))
+            if len(accumulators) % 2:
+                merged.append(accumulators[-1])
+            accumulators = merged
+    return accumulators[0]
+
+
 class _PixOps(_pj.modules.JimModuleBase):
     """Define all PixOps methods."""
 
+    __slots__ = ()
+
     def convert(self,
                 otype):
         """Convert Jim image with respect to data type.
@@ -744,34 +806,34 @@ class _PixOps(_pj.modules.JimModuleBase):
 class _PixOpsList(_pj.modules.JimListModuleBase):
     """Define all PixOps methods for JimLists."""
 
-    def infimum(self):
+    __slots__ = ()
+
+    def infimum(self,
+                workers: int = None):
         """Create Jim composed using minimum rule from Jim objects in JimList.
 
+        The members are reduced in parallel, in a pool of threads.
+
+        :param workers: number of threads (default is the number of CPUs)
         :return: Jim composed of smallest values from provided Jim objects
         """
-        inf = None
-        for newJim in self._jim_list:
-            if inf is None:
-                inf = _pj.Jim(self._jim_list[0])
-            else:
-                inf._jipjim.d_pointOpArith(newJim._jipjim, 4)
-        return inf
+        return _reduceList(self._jim_list, _np.minimum, workers)
 
-    def supremum(self):
+    def supremum(self,
+                 workers: int = None):
         """Create Jim composed using maximum rule from Jim objects in JimList.
 
+        The members are reduced in parallel, in a pool of threads.
+
+        :param workers: number of threads (default is the number of CPUs)
         :return: Jim composed of biggest values from provided Jim objects
         """
-        sup = None
-        for newJim in self._jim_list:
-            if sup is None:
-                sup = _pj.Jim(self._jim_list[0])
-            else:
-                sup._jipjim.d_pointOpArith(newJim._jipjim, 5)
-        return sup
+        return _reduceList(self._jim_list, _np.maximum, workers)
 
 
 class _PixOpsVect(_pj.modules.JimVectModuleBase):
     """Define all PixOps methods for JimVects."""
 
+    __slots__ = ()
+
     pass
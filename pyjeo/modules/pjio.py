@@ -25,6 +25,8 @@ import pyjeo as _pj
 class _IO(_pj.modules.JimModuleBase):
     """Define all IO methods."""
 
+    __slots__ = ()
+
     def close(self):
         """Close Jim object."""
         self._jim_object._jipjim.close()
@@ -137,6 +139,8 @@ class _IO(_pj.modules.JimModuleBase):
 class _IOList(_pj.modules.JimListModuleBase):
     """Define all IO methods for JimLists."""
 
+    __slots__ = ()
+
     def close(self):
         """Close all Jim object in the JimList object."""
         self._jim_list._jipjimlist.close()
@@ -145,6 +149,8 @@ class _IOList(_pj.modules.JimListModuleBase):
 class _IOVect(_pj.modules.JimVectModuleBase):
     """Define all IO methods for JimVects."""
 
+    __slots__ = ()
+
     def close(self):
         """Close JimVect object."""
         self._jim_vect._jipjimvect.close()
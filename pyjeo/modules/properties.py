@@ -19,6 +19,9 @@
 # You should have received a copy of the GNU General Public License
 # along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
 
+import hashlib as _hashlib
+
+import jiplib as _jl
 import numpy as _np
 import osgeo
 import pyjeo as _pj
@@ -39,29 +42,7 @@ def isEqual(first_jim,
     :return: True if the values are equal, zero otherwise
     """
     if isinstance(second_jim, _pj.Jim) and isinstance(first_jim, _pj.Jim):
-        if first_jim.properties.nrOfPlane() != \
-                second_jim.properties.nrOfPlane() or \
-                first_jim.properties.nrOfBand() != \
-                second_jim.properties.nrOfBand():
-            return False
-        if first_jim.properties.nrOfPlane() == 1:
-            for iband in range(0, first_jim.properties.nrOfBand()):
-                if not _np.array_equal(first_jim.np(iband),
-                                       second_jim.np(iband)):
-                    return False
-            return True
-        else:
-            for iplane in range(0, first_jim.properties.nrOfPlane()):
-                first_plane = _pj.geometry.cropPlane(first_jim, iplane)
-                second_plane = _pj.geometry.cropPlane(second_jim, iplane)
-                if first_plane.properties.nrOfBand() != \
-                        second_plane.properties.nrOfBand():
-                    return False
-                for iband in range(0, first_plane.properties.nrOfBand()):
-                    if not _np.array_equal(first_plane.np(iband),
-                                           second_plane.np(iband)):
-                        return False
-            return True
+        return _equal(first_jim, second_jim)
     elif isinstance(first_jim, _pj.JimVect):
         if first_jim.properties.isEmpty():
             raise _pj.exceptions.JimVectEmptyError('first_jim is empty')
@@ -98,9 +79,150 @@ def isEqual(first_jim,
         return False
 
 
+def _content_digest(jim):
+    """Calculate the digest of the dimensions, data type and pixel values.
+
+    xxhash is used if installed, blake2b otherwise.
+
+    :param jim: Jim object
+    :return: digest
+    """
+    try:
+        import xxhash as _xxhash
+        hasher = _xxhash.xxh3_128()
+    except ImportError:
+        hasher = _hashlib.blake2b(digest_size=16)
+
+    properties = jim.properties
+    hasher.update(repr((properties.nrOfBand(), properties.nrOfPlane(),
+                        properties.nrOfRow(), properties.nrOfCol(),
+                        properties.getDataType())).encode())
+    for band in range(properties.nrOfBand()):
+        # not through jim.np(), the arrays are not handed out
+        array = _np.ascontiguousarray(_jl.jim2np(jim._jipjim, band, False))
+        hasher.update(array.view(_np.uint8))
+    return hasher.digest()
+
+
+def _digest(jim, compute: bool = True):
+    """Get the cached content digest of a Jim object.
+
+    The digest is kept in the metadata snapshot of the Jim object, so it is
+    discarded when the Jim object is modified in place by jiplib. It is not
+    used while a writable numpy array referring to the memory of the Jim
+    object (see :py:meth:`Jim.np` and :py:meth:`Jim.np_cube`) is alive, nor
+    if such an array was handed out after the digest was calculated.
+
+    :param jim: Jim object
+    :param compute: set False to return None instead of calculating a
+        digest that is not cached
+    :return: digest or None
+    """
+    if not jim:
+        return None
+    jipjim = jim._jipjim
+    if jipjim._lent:
+        # the values can be changed at any time
+        return None
+    metadata = jim._metadata()
+    if metadata.digest is not None and \
+            metadata.digest[1] != jipjim._lent_version:
+        metadata.digest = None
+    if metadata.digest is None and compute:
+        metadata.digest = (_content_digest(jim), jipjim._lent_version)
+    return None if metadata.digest is None else metadata.digest[0]
+
+
+def _equal(first_jim, second_jim, compute: bool = False):
+    """Check if the pixel values of two Jim objects are the same.
+
+    The content digests are compared if they are available for both Jim
+    objects with the same integer data type, otherwise the values are
+    compared band by band (e.g., -0.0 equals 0.0 and NaN values are never
+    equal).
+
+    :param first_jim: a Jim object
+    :param second_jim: a Jim object
+    :param compute: set True to calculate (and cache) the digests if not
+        available, e.g., when searching in lists
+    :return: True if the values are equal, False otherwise
+    """
+    if first_jim.properties.nrOfPlane() != \
+            second_jim.properties.nrOfPlane() or \
+            first_jim.properties.nrOfBand() != \
+            second_jim.properties.nrOfBand():
+        return False
+
+    # values of different data types can be equal, but not their digests
+    otype = first_jim.properties.getDataType()
+    if otype == second_jim.properties.getDataType() and \
+            _pj._dtype_from_otype(otype).kind in 'iu':
+        first = _digest(first_jim, compute)
+        second = _digest(second_jim, compute)
+        if first is not None and second is not None:
+            return first == second
+
+    # the arrays of the bands contain all planes, no need to crop them
+    for iband in range(0, first_jim.properties.nrOfBand()):
+        if not _np.array_equal(first_jim.np(iband),
+                               second_jim.np(iband)):
+            return False
+    return True
+
+
+class _Metadata:
+    """Snapshot of the metadata of a Jim object.
+
+    The values are retrieved from jiplib on first access only. A snapshot
+    is valid as long as its version equals the version of the jiplib object
+    (see :py:meth:`Jim._metadata`). The content digest (see
+    :py:func:`_digest`) is kept in the snapshot as well.
+    """
+
+    __slots__ = ('version', 'ncol', 'nrow', 'nband', 'nplane', 'otype',
+                 'geotransform', 'projection', 'nodata', 'digest')
+
+    _getters = {'ncol': 'nrOfCol', 'nrow': 'nrOfRow', 'nband': 'nrOfBand',
+                'nplane': 'nrOfPlane', 'otype': 'getDataType',
+                'geotransform': 'getGeoTransform',
+                'projection': 'getProjection', 'nodata': 'getNoDataValues'}
+
+    def __init__(self, version: int):
+        """Initialize an empty snapshot.
+
+        :param version: version of the jiplib object
+        """
+        self.version = version
+        for name in self._getters:
+            setattr(self, name, None)
+        self.digest = None
+
+    def get(self, name: str, jipjim):
+        """Get a metadata value, retrieving it from jiplib if not cached.
+
+        :param name: name of the slot (e.g., 'nband')
+        :param jipjim: jiplib object of the Jim object
+        :return: the (immutable) metadata value
+        """
+        value = getattr(self, name)
+        if value is None:
+            value = getattr(jipjim, self._getters[name])()
+            if isinstance(value, list):
+                value = tuple(value)
+            setattr(self, name, value)
+        return value
+
+
 class _Properties(_pj.modules.JimModuleBase):
     """Define all properties methods."""
 
+    __slots__ = ()
+
+    def _get(self, name: str):
+        """Get a value from the metadata snapshot of the Jim object."""
+        return self._jim_object._metadata().get(name,
+                                                 self._jim_object._jipjim)
+
     def clearNoData(self):
         """Clear the list of no data values for this raster dataset."""
         self._jim_object._jipjim.clearNoData()
@@ -223,7 +345,7 @@ class _Properties(_pj.modules.JimModuleBase):
 
         :return: The datatype id of this Jim object
         """
-        otype = self._jim_object._jipjim.getDataType()
+        otype = self._get('otype')
         if otype == 1:
             return 'Byte'
         elif otype == 2:
@@ -263,14 +385,14 @@ class _Properties(_pj.modules.JimModuleBase):
 
         :return: The pixel cell spacing in x.
         """
-        return self._jim_object._jipjim.getDeltaX()
+        return self._get('geotransform')[1]
 
     def getDeltaY(self):
         """Get the piyel cell spacing in y.
 
         :return: The piyel cell spacing in y.
         """
-        return self._jim_object._jipjim.getDeltaY()
+        return -self._get('geotransform')[5]
 
     def getGeoTransform(self):
         """Get the geotransform data for this dataset as a list of floats.
@@ -284,7 +406,7 @@ class _Properties(_pj.modules.JimModuleBase):
         * [4] rotation, 0 if image is "north up"
         * [5] n-s pixel resolution
         """
-        return self._jim_object._jipjim.getGeoTransform()
+        return list(self._get('geotransform'))
 
     def getLrx(self):
         """Get the lower left corner x coordinate of this dataset.
@@ -304,14 +426,14 @@ class _Properties(_pj.modules.JimModuleBase):
 
     def getNoDataVals(self):
         """Get the list of no data values."""
-        return self._jim_object._jipjim.getNoDataValues()
+        return list(self._get('nodata'))
 
     def getProjection(self):
         """Get the projection for this dataset in well known text (wkt) format.
 
         :return: The projection string in well known text format.
         """
-        return self._jim_object._jipjim.getProjection()
+        return self._get('projection')
 
     def getRefPix(self,
                   *args):
@@ -332,7 +454,7 @@ class _Properties(_pj.modules.JimModuleBase):
         :return: The upper left corner x (georeferenced) coordinate of this
             dataset
         """
-        return self._jim_object._jipjim.getUlx()
+        return self._get('geotransform')[0]
 
     def getUly(self):
         """Get the upper left corner y coordinate of this dataset.
@@ -340,7 +462,7 @@ class _Properties(_pj.modules.JimModuleBase):
         :return: The upper left corner y (georeferenced) coordinate of this
             dataset
         """
-        return self._jim_object._jipjim.getUly()
+        return self._get('geotransform')[3]
 
     def imageInfo(self):
         """Return image information (number of lines, columns, etc.)."""
@@ -354,31 +476,7 @@ class _Properties(_pj.modules.JimModuleBase):
         :return: True if the values are equal, zero otherwise
         """
         if isinstance(other, _pj.Jim):
-            if self._jim_object.properties.nrOfPlane() != \
-                    other.properties.nrOfPlane() or \
-                    self._jim_object.properties.nrOfBand() != \
-                    other.properties.nrOfBand():
-                return False
-            if self._jim_object.properties.nrOfPlane() == 1:
-                for iband in range(0, self._jim_object.properties.nrOfBand()):
-                    if not _np.array_equal(self._jim_object.np(iband),
-                                           other.np(iband)):
-                        return False
-                return True
-            else:
-                for iplane in range(0,
-                                    self._jim_object.properties.nrOfPlane()):
-                    first_plane = _pj.geometry.cropPlane(self._jim_object,
-                                                         iplane)
-                    second_plane = _pj.geometry.cropPlane(other, iplane)
-                    if first_plane.properties.nrOfBand() != \
-                            second_plane.properties.nrOfBand():
-                        return False
-                    for iband in range(0, first_plane.properties.nrOfBand()):
-                        if not _np.array_equal(first_plane.np(iband),
-                                               second_plane.np(iband)):
-                            return False
-                return True
+            return _equal(self._jim_object, other)
         else:
             return False
 
@@ -387,28 +485,28 @@ class _Properties(_pj.modules.JimModuleBase):
 
         :return: The number of bands in this raster dataset
         """
-        return self._jim_object._jipjim.nrOfBand()
+        return self._get('nband')
 
     def nrOfCol(self):
         """Get number of columns in this raster dataset.
 
         :return: The number of columns in this raster dataset
         """
-        return self._jim_object._jipjim.nrOfCol()
+        return self._get('ncol')
 
     def nrOfPlane(self):
         """Get number of planes in this raster dataset.
 
         :return: The number of planes in this raster dataset
         """
-        return self._jim_object._jipjim.nrOfPlane()
+        return self._get('nplane')
 
     def nrOfRow(self):
         """Get number of rows in this raster dataset.
 
         :return: The number of rows in this raster dataset
         """
-        return self._jim_object._jipjim.nrOfRow()
+        return self._get('nrow')
 
     def printNoDataVals(self):
         """Print the list of no data values of this raster dataset."""
@@ -461,6 +559,25 @@ class _Properties(_pj.modules.JimModuleBase):
 class _PropertiesList(_pj.modules.JimListModuleBase):
     """Define all properties methods for JimLists."""
 
+    __slots__ = ()
+
+    def _candidates(self, args):
+        """Get the members that might cover a point or region of interest.
+
+        :param args: arguments of :py:meth:`covers`
+        :return: list of positions found in the spatial index, None if the
+            arguments are not supported by the index
+        """
+        if len(args) == 2:
+            x, y = args
+            bbox, contains = [x, y, x, y], False
+        elif len(args) in (4, 5):
+            bbox = list(args[:4])
+            contains = len(args) == 5 and bool(args[4])
+        else:
+            return None
+        return self._jim_list._spatialIndex().query(bbox, contains)
+
     def clearNoData(self):
         """Clear the list of no data values for this JimList object."""
         self._jim_list._jipjimlist.clearNoData()
@@ -498,8 +615,16 @@ class _PropertiesList(_pj.modules.JimListModuleBase):
 
         Returns:
         True if the raster dataset covers the point or region of interest.
+
+        Only the members found in the spatial index of the JimList are
+        checked.
         """
-        return self._jim_list._jipjimlist.covers(*args)
+        candidates = self._candidates(args)
+        if candidates is None:
+            return self._jim_list._jipjimlist.covers(*args)
+        members = self._jim_list._members()
+        return any(members[position].properties.covers(*args)
+                   for position in candidates)
 
     def getBBox(self, t_srs = None):
         """Get the bounding box (georeferenced) coordinates of this dataset.
@@ -508,13 +633,16 @@ class _PropertiesList(_pj.modules.JimListModuleBase):
         :return: A list with upper left x, upper left y, lower right x, and
             lower right y
         """
-        bbox = self._jim_list._jipjimlist.getBoundingBox()
+        bbox = self._jim_list._spatialIndex().bounds()
+        if bbox is None:
+            bbox = self._jim_list._jipjimlist.getBoundingBox()
         if t_srs is not None:
             # create coordinate transformation
             inSpatialRef = osgeo.osr.SpatialReference()
             outSpatialRef = osgeo.osr.SpatialReference()
 
-            inSpatialRef.ImportFromWkt(self._jim_list[0].properties.getProjection())
+            inSpatialRef.ImportFromWkt(
+                self._jim_list._members()[0].properties.getProjection())
             if int(osgeo.__version__[0]) >= 3:
                 #hanges axis order: https://github.com/OSGeo/gdal/issues/1546
                 inSpatialRef.SetAxisMappingStrategy(
@@ -592,15 +720,49 @@ class _PropertiesList(_pj.modules.JimListModuleBase):
         """Push a no data value for this raster JimList object."""
         self._jim_list._jipjimlist.pushNoDataValue(value)
 
+    def query(self,
+              bbox: list,
+              t_srs=None,
+              all: bool = False):
+        """Get the members intersecting a bounding box.
+
+        The members are looked up in a spatial index (R-tree) of their
+        bounding boxes, built on first use and updated when members are
+        appended or removed.
+
+        :param bbox: bounding box [ulx, uly, lrx, lry]
+        :param t_srs: spatial reference system of bbox (e.g., 'epsg:3035',
+            3035 or WKT). Default is the reference system of each member
+        :param all: set to True to get only the members covering the
+            entire bounding box
+        :return: JimList with the selected members (not copied)
+
+        Select the scenes of a catalogue for an area of interest::
+
+            aoi = jiml.properties.query([4000000, 2600000, 4010000, 2590000],
+                                        t_srs=3035)
+        """
+        positions = self._jim_list._spatialIndex(t_srs).query(bbox, all)
+        return self._jim_list._view(positions)
+
     def selectGeo(self, *args):
         """Select geographical properties (ulx, uly, ...)."""
-        self._jim_list._jipjimlist.selectGeo(*args)
-        self._jim_list._set(self._jim_list)
+        candidates = self._candidates(args)
+        if candidates is None:
+            self._jim_list._jipjimlist.selectGeo(*args)
+            self._jim_list._set(self._jim_list)
+            return
+        members = self._jim_list._members()
+        self._jim_list._select(
+            [position for position in candidates
+             if members[position].properties.covers(*args)])
 
 
 class _PropertiesVect(_pj.modules.JimVectModuleBase):
     """Define all properties methods for JimVects."""
 
+    __slots__ = ()
+
     def getBBox(self, t_srs = None):
         """Get the bounding box (georeferenced) coordinates of this dataset.
 
@@ -19,6 +19,9 @@
 # You should have received a copy of the GNU General Public License
 # along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
 
+import os as _os
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+
 import numpy as _np
 
 import pyjeo as _pj
@@ -116,6 +119,8 @@ def stretch(jim_object,
 class _Stats(_pj.modules.JimModuleBase):
     """Define all statistical methods."""
 
+    __slots__ = ()
+
     def getHisto1d(self):
         """Compute the frequency distribution of the grey levels of im.
 
@@ -316,9 +321,42 @@ class _Stats(_pj.modules.JimModuleBase):
         self._jim_object._set(self._jim_object._jipjim.stretch(kwargs))
 
 
+def _minMax(jim_object, function, band=None):
+    """Calculate the minimum and/or maximum of the bands of a Jim object.
+
+    numpy releases the GIL for the reductions, so that members of a
+    JimList can be processed in parallel threads.
+
+    :param jim_object: a Jim object
+    :param function: list with min and/or max
+    :param band: (list of) band(s), default is all bands
+    :return: dictionary as returned by :py:meth:`~._Stats.getStats`
+    """
+    if band is None:
+        bands = range(jim_object.properties.nrOfBand())
+    elif isinstance(band, list):
+        bands = band
+    else:
+        bands = [band]
+
+    statDict = {f: [] for f in function}
+    for iband in bands:
+        array = jim_object.np(iband)
+        if 'min' in function:
+            statDict['min'].append(array.min().item())
+        if 'max' in function:
+            statDict['max'].append(array.max().item())
+    for f in statDict:
+        if len(statDict[f]) == 1:
+            statDict[f] = statDict[f][0]
+    return statDict
+
+
 class _StatsList(_pj.modules.JimListModuleBase):
     """Define all statistical methods for JimLists."""
 
+    __slots__ = ()
+
     def getStatProfile(self,
                        function: str,
                        **kwargs):
@@ -327,10 +365,12 @@ class _StatsList(_pj.modules.JimListModuleBase):
         :param function: string naming a statistical function
         """
         kwargs.update({'function': function})
-        return _pj.Jim(self._jim_list._jipjimlist.statProfile(kwargs))
+        return _pj.Jim(
+            self._jim_list._resident()._jipjimlist.statProfile(kwargs))
 
     def getStats(self,
                  function=['min', 'max', 'mean'],
+                 workers: int = None,
                  **kwargs):
         """Compute basic statistics on a JimList object.
 
@@ -338,8 +378,13 @@ class _StatsList(_pj.modules.JimListModuleBase):
         For functions requiring two datasets (e.g., regression), use
         the objects in the list instead of bands
 
+        The functions min and max (without nodata, src_min or src_max) are
+        calculated for the members in parallel, in a pool of threads.
+
         :param function: (list of) statistical function(s) to calculate
             (default is ['min', 'max', 'mean'])
+        :param workers: number of threads for min and max (default is the
+            number of CPUs)
         :return: a dictionary with requested statistics
 
         .. _statFunctions_list:
@@ -424,21 +469,36 @@ class _StatsList(_pj.modules.JimListModuleBase):
                 forceJiplib = True
                 break
 
-        if function not in [['min', 'max'], ['max', 'min'], 'min', 'max']:
+        if not function or not set(function) <= {'min', 'max'}:
             forceJiplib = True
 
         if not forceJiplib:
-            for item in self._jim_list:
-                new_statDict = item.stats.getStats(function, **kwargs)
-                if 'min' in keys and (statDict['min'] is None or
-                                      new_statDict['min'] < statDict['min']):
-                    statDict['min'] = new_statDict['min']
-                if 'max' in keys and (statDict['max'] is None or
-                                      new_statDict['max'] > statDict['max']):
-                    statDict['max'] = new_statDict['max']
+            jim_list = self._jim_list
+
+            def member_stats(index):
+                # members of lazy JimLists are read in the worker
+                return _minMax(jim_list[index], function,
+                               kwargs.get('band'))
+
+            if workers is None:
+                workers = _os.cpu_count() or 1
+            with _ThreadPoolExecutor(
+                    max_workers=max(1, min(workers, len(jim_list)))) \
+                    as executor:
+                for new_statDict in executor.map(member_stats,
+                                                 range(len(jim_list))):
+                    if 'min' in keys and (
+                            statDict['min'] is None or
+                            new_statDict['min'] < statDict['min']):
+                        statDict['min'] = new_statDict['min']
+                    if 'max' in keys and (
+                            statDict['max'] is None or
+                            new_statDict['max'] > statDict['max']):
+                        statDict['max'] = new_statDict['max']
         else:
             kwargs.update({'function': function})
-            statDict.update(self._jim_list._jipjimlist.getStats(kwargs))
+            statDict.update(
+                self._jim_list._resident()._jipjimlist.getStats(kwargs))
 
         return statDict
 
@@ -446,4 +506,6 @@ class _StatsList(_pj.modules.JimListModuleBase):
 class _StatsVect(_pj.modules.JimVectModuleBase):
     """Define all statistical methods for JimVects."""
 
+    __slots__ = ()
+
     pass
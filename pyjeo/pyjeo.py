@@ -26,6 +26,13 @@ import gc as _gc
 import warnings as _warnings
 import os as _os
 import math
+import functools as _functools
+import itertools as _itertools
+import numbers as _numbers
+import weakref as _weakref
+import collections as _collections
+from concurrent import futures as _futures
+from multiprocessing import shared_memory as _shared_memory
 from pathlib import Path
 from osgeo import ogr as _ogr
 
@@ -34,11 +41,75 @@ import jiplib as _jl
 from .modules import pjio as io, properties, pixops, ngbops, geometry, \
     ccops, classify, demops, stats, all
 from . import exceptions
-from .__init__ import _check_graph
+from . import memory as _memory
+from . import spatial as _spatial
+from . import stream as _stream
+from . import kernels
+from . import tiled
+from .tiled import TileGrid
+from .cube import Cube
+from .composite import Compositor
+from .memory import memory_scope
+from .expr import JimExpr
+from .view import JimView, _ViewIndexer
+from .__init__ import _otype_from_dtype, _dtype_from_otype, _parse_memory
 
 if '__del__ ' in dir(_jl.Jim):
     del _jl.Jim.__del__
 
+# unique versions of the jiplib objects (bumped when changed in place)
+_versions = _itertools.count(1)
+
+# maximum number of random values drawn at once by Jim._feed
+_FEED_BLOCK_SIZE = 2 * 1024 ** 2
+
+
+class _ModuleAccessor:
+    """Descriptor binding a module to the object it is accessed from.
+
+    A single (stateless) descriptor per module is shared by all instances of
+    Jim, JimList or JimVect. A new module object is only created when the
+    module is accessed (e.g., ``jim.properties``).
+    """
+
+    def __init__(self, module):
+        """Initialize the descriptor.
+
+        :param module: module class (e.g., properties._Properties)
+        """
+        self._module = module
+        self.__doc__ = module.__doc__
+
+    def __get__(self, caller, owner=None):
+        """Bind a new module object to the caller.
+
+        :param caller: Jim, JimList or JimVect object (None if accessed from
+            the class)
+        :param owner: class of the caller
+        :return: the bound module object (the module class if accessed from
+            the class)
+        """
+        if caller is None:
+            return self._module
+        return _bind(self._module(), caller)
+
+
+def _bind(module, caller):
+    """Bind a module object to its caller (Jim, JimList or JimVect).
+
+    The caller does not keep a reference to the module object, so no
+    reference cycle is created and the jiplib buffers are freed as soon as
+    the caller is not referenced anymore.
+
+    :param module: module object to be bound
+    :param caller: Jim, JimList or JimVect object
+    :return: the bound module object
+    """
+    module._set_caller(caller)
+    if _memory.collect_on_access:
+        _gc.collect()
+    return module
+
 
 class _ParentJim(_jl.Jim):
 
@@ -62,71 +133,17 @@ class _ParentJim(_jl.Jim):
                         super(_ParentJim, self).__init__(image._jipjim)
                 else:
                     if 'tileindex' in kwargs.keys() and 'tiletotal' in kwargs.keys():
-                        tileindex = kwargs.pop('tileindex')
-                        tiletotal = kwargs.pop('tiletotal')
-                        try:
-                            overlap = kwargs.pop('overlap')
-                        except KeyError:
-                            overlap = 5
-
-                        bbox = None
-                        if 'bbox' in kwargs:
-                            bbox = kwargs.pop('bbox')
-                        elif ('ulx' in kwargs and 'uly' in kwargs and
-                              'lrx' in kwargs and 'lry' in kwargs):
+                        bbox = kwargs.pop('bbox', None)
+                        if bbox is None and ('ulx' in kwargs and
+                                             'uly' in kwargs and
+                                             'lrx' in kwargs and
+                                             'lry' in kwargs):
                             bbox = [kwargs.pop('ulx'), kwargs.pop('uly'),
                                     kwargs.pop('lrx'), kwargs.pop('lry')]
-                        if bbox is not None:
-                            ncol = int(round(math.sqrt(tiletotal)))
-                            nrow = ncol
-                            assert ncol * nrow == tiletotal, \
-                                'Error: tiletotal must be squared integer'
-                            assert tileindex < tiletotal, \
-                                'Error: tileindex must be < ' + str(tiletotal)
-                            assert len(bbox) == 4, \
-                                'Error: bbox must be list of format ulx, uly, lrx, lry'
-                            ncol = math.sqrt(tiletotal)
-                            nrow = ncol
-                            icol = tileindex % nrow
-                            irow = tileindex // nrow
-                            dx = (bbox[2] - bbox[0]) / ncol
-                            dy = (bbox[1] - bbox[3]) / nrow
-                            overlap = dx*overlap/200.0
-                            ulx = bbox[0] + icol * dx - overlap
-                            uly = bbox[1] - irow * dy + overlap
-                            lrx = ulx + dx + overlap
-                            lry = uly - dy - overlap
-                        else:
-                            ajim = Jim(image, noread=True)
-                            bbox = ajim.properties.getBBox()
-                            ncol = int(round(math.sqrt(tiletotal)))
-                            nrow = ncol
-                            assert ncol * nrow == tiletotal, \
-                                'Error: tiletotal must be squared integer'
-                            assert tileindex < tiletotal, \
-                                'Error: tileindex must be < ' + str(tiletotal)
-                            assert len(bbox) == 4, \
-                                'Error: bbox must be list of format ulx, uly, lrx, lry'
-                            ncol = math.sqrt(tiletotal)
-                            nrow = ncol
-                            icol = tileindex % nrow
-                            irow = tileindex // nrow
-                            dx = (bbox[2] - bbox[0]) / ncol
-                            dy = (bbox[1] - bbox[3]) / nrow
-                            # overlap = dx*0.025
-                            overlap = dx*overlap/200.0
-                            ulx = bbox[0] + icol * dx - overlap
-                            ulx = max(ulx, bbox[0])
-                            uly = bbox[1] - irow * dy + overlap
-                            uly = min(uly, bbox[1])
-                            lrx = ulx + dx + overlap
-                            lrx = min(lrx, bbox[2])
-                            lry = uly - dy - overlap
-                            lry = max(lry, bbox[3])
-                        kwargs.update({'ulx':ulx})
-                        kwargs.update({'uly':uly})
-                        kwargs.update({'lrx':lrx})
-                        kwargs.update({'lry':lry})
+                        kwargs.update(tiled._tile_bbox(
+                            image, kwargs.pop('tileindex'),
+                            kwargs.pop('tiletotal'),
+                            kwargs.pop('overlap', 5), bbox))
                     elif 'bbox' in kwargs:
                         bbox = kwargs.pop('bbox')
                         kwargs.update({'ulx':bbox[0]})
@@ -139,32 +156,8 @@ class _ParentJim(_jl.Jim):
                         kwargs.update({'filename': image})
                     super(_ParentJim, self).__init__(kwargs)
             elif 'graph' in kwargs:
-                graph = kwargs.pop('graph')
-                _check_graph(graph, [4, 6, 8, 26])
-
-                if graph == 4:
-                    ngb = Jim(ncol=3, nrow=3, otype='Byte')
-                    ngb[0, 1] = 1
-                    ngb[1, 0] = 1
-                    ngb[1, 2] = 1
-                    ngb[2, 1] = 1
-                elif graph == 8:
-                    ngb = Jim(ncol=3, nrow=3, otype='Byte')
-                    ngb.pixops.setData(1)
-                    ngb[1, 1] = 0
-                if graph == 6:
-                    ngb = Jim(ncol=3, nrow=3, nplane = 3, otype='Byte')
-                    ngb[1, 0, 1] = 1
-                    ngb[1, 2, 1] = 1
-                    ngb[0, 1, 1] = 1
-                    ngb[2, 1, 1] = 1
-                    ngb[1, 1, 0] = 1
-                    ngb[1, 1, 2] = 1
-                elif graph == 26:
-                    ngb = Jim(ncol=3, nrow=3, nplane = 3, otype='Byte')
-                    ngb.pixops.setData(1)
-                    ngb[1, 1, 1] = 0
-
+                # copy the interned structuring element
+                ngb = kernels.get(kwargs.pop('graph'))
                 super(_ParentJim, self).__init__(ngb._jipjim)
             else:
                 if 'bbox' in kwargs:
@@ -193,9 +186,45 @@ class _ParentJim(_jl.Jim):
             super(_ParentJim, self).__init__(image)
 
 
+def _bump_version(method):
+    """Wrap a jiplib method changing the object in place to bump its version.
+
+    :param method: jiplib method of Jim
+    :return: wrapped method
+    """
+    @_functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._readonly:
+            raise exceptions.JimNotSupportedError(
+                'Interned Jim objects (see kernels.get) can not be modified')
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._version = next(_versions)
+    return wrapper
+
+
+# in place jiplib methods can change the shape, data type or georeference
+for _name in dir(_jl.Jim):
+    if _name.startswith(('d_', 'set', 'push', 'clear', 'copy', 'open',
+                         'close', 'read')):
+        setattr(_ParentJim, _name, _bump_version(getattr(_jl.Jim, _name)))
+del _name
+
+# version of objects not changed since their creation
+_ParentJim._version = 0
+# writable numpy arrays handed out (see Jim._lend)
+_ParentJim._lent = None
+# interned objects shared by all callers (see kernels.get)
+_ParentJim._readonly = False
+_ParentJim._lent_version = 0
+
+
 class Jim:
     """Definition of Jim object."""
 
+    __slots__ = ('_jipjim', '_cached_metadata', '_source', '__weakref__')
+
     def __init__(self, image=None, **kwargs):
         """Initialize the Jim object and modules for methods.
 
@@ -209,91 +238,29 @@ class Jim:
         uniform = kwargs.pop('uniform', None)
         seed = kwargs.pop('seed', None)
 
-        self._jipjim = _ParentJim(image, kwargs)
+        # keep the source of a Jim object opened without data to read it
+        # lazily (see Jim.xr)
+        self._source = None
+        if kwargs.get('noread') and isinstance(image, (str, Path)):
+            self._source = (str(image), dict(kwargs))
 
-        self._all = all._All()
-        self._ccops = ccops._CCOps()
-        self._classify = classify._Classify()
-        self._demops = demops._DEMOps()
-        self._geometry = geometry._Geometry()
-        self._io = io._IO()
-        self._ngbops = ngbops._NgbOps()
-        self._pixops = pixops._PixOps()
-        self._properties = properties._Properties()
-        self._stats = stats._Stats()
+        self._jipjim = _ParentJim(image, kwargs)
+        self._cached_metadata = None
+        _memory._register(self)
 
         if any(arg is not None for arg in [stdev, uniform, seed]):
             self._feed(stdev, uniform, seed, kwargs)
 
-    @property
-    def all(self):
-        """Set up a caller and garbage cleaner for the module all."""
-        self._all._set_caller(self)
-        _gc.collect()
-        return self._all
-
-    @property
-    def ccops(self):
-        """Set up a caller and garbage cleaner for the module ccops."""
-        self._ccops._set_caller(self)
-        _gc.collect()
-        return self._ccops
-
-    @property
-    def classify(self):
-        """Set up a caller and garbage cleaner for the module classify."""
-        self._classify._set_caller(self)
-        _gc.collect()
-        return self._classify
-
-    @property
-    def demops(self):
-        """Set up a caller and garbage cleaner for the module demops."""
-        self._demops._set_caller(self)
-        _gc.collect()
-        return self._demops
-
-    @property
-    def geometry(self):
-        """Set up a caller and garbage cleaner for the module geometry."""
-        self._geometry._set_caller(self)
-        _gc.collect()
-        return self._geometry
-
-    @property
-    def io(self):
-        """Set up a caller and garbage cleaner for the module io."""
-        self._io._set_caller(self)
-        _gc.collect()
-        return self._io
-
-    @property
-    def ngbops(self):
-        """Set up a caller and garbage cleaner for the module ngbops."""
-        self._ngbops._set_caller(self)
-        _gc.collect()
-        return self._ngbops
-
-    @property
-    def pixops(self):
-        """Set up a caller and garbage cleaner for the module pixops."""
-        self._pixops._set_caller(self)
-        _gc.collect()
-        return self._pixops
-
-    @property
-    def properties(self):
-        """Set up a caller and garbage cleaner for the module properties."""
-        self._properties._set_caller(self)
-        _gc.collect()
-        return self._properties
-
-    @property
-    def stats(self):
-        """Set up a caller and garbage cleaner for the module stats."""
-        self._stats._set_caller(self)
-        _gc.collect()
-        return self._stats
+    all = _ModuleAccessor(all._All)
+    ccops = _ModuleAccessor(ccops._CCOps)
+    classify = _ModuleAccessor(classify._Classify)
+    demops = _ModuleAccessor(demops._DEMOps)
+    geometry = _ModuleAccessor(geometry._Geometry)
+    io = _ModuleAccessor(io._IO)
+    ngbops = _ModuleAccessor(ngbops._NgbOps)
+    pixops = _ModuleAccessor(pixops._PixOps)
+    properties = _ModuleAccessor(properties._Properties)
+    stats = _ModuleAccessor(stats._Stats)
 
     @staticmethod
     def getMethods(queried_module: str = None):
@@ -359,14 +326,69 @@ class Jim:
             raise exceptions.JimBandsError('Band out of bounds')
         elif band < 0:
             band = self.properties.nrOfBand() + band
-        return _jl.jim2np(self._jipjim, band, False)
+        return self._lend(_jl.jim2np(self._jipjim, band, False))
+
+    def np_cube(self, copy: bool = None):
+        """Return a numpy array with all bands of the Jim object.
+
+        The array is organized as [bands][planes][rows][columns] (also for
+        single plane Jim objects). If the bands are allocated contiguously in
+        memory, the array refers to the memory of the Jim object without a
+        copy. Otherwise the bands are copied in a new (read-only) array,
+        unless copy is False.
+
+        :param copy: None (default) to copy only if needed, True to always
+            copy, False to raise an error if a copy is needed
+        :return: 4D numpy array
 
-    def xr(self):
+        Calculate the maximum over all bands for each pixel::
+
+            jim.np_cube().max(axis=0)
+        """
+        if not self:
+            raise exceptions.JimEmptyError(
+                'Jim has to have a data to use Jim.np_cube()')
+        shape = (self.properties.nrOfPlane(), self.properties.nrOfRow(),
+                 self.properties.nrOfCol())
+        bands = [_jl.jim2np(self._jipjim, band, False).reshape(shape)
+                 for band in range(self.properties.nrOfBand())]
+
+        if not copy:
+            first = bands[0]
+            address = first.__array_interface__['data'][0]
+            if all(band.__array_interface__['data'][0] ==
+                   address + iband * first.nbytes
+                   for iband, band in enumerate(bands)):
+                return self._lend(_np.lib.stride_tricks.as_strided(
+                    first, shape=(len(bands),) + shape,
+                    strides=(first.nbytes,) + first.strides))
+            if copy is False:
+                raise exceptions.JimIllegalArgumentError(
+                    'Bands of the Jim object are not contiguous in memory, '
+                    'use copy=None or copy=True')
+
+        cube = _np.stack(bands)
+        if copy is None:
+            # changes would not be reflected in the Jim object
+            cube.flags.writeable = False
+        return cube
+
+    def xr(self, chunks=None):
         """Return xarray from Jim object.
 
         The (contiguous) data array is organized
         as [planes][rows][columns] for the respective bands
 
+        If the Jim object was opened with noread=True, the data are not
+        read, but the xarray is backed by dask arrays. Each chunk is read
+        from file when it is computed::
+
+            jim = pj.Jim('/path/to/mosaic.vrt', noread=True)
+            mean = jim.xr(chunks=2048)['0'].mean().compute()
+
+        :param chunks: chunk size in pixels as an integer (square chunks) or
+            as a list [ncol, nrow] for a Jim object opened with noread=True
+            (default is 1024)
         :return: xarray representation
         """
         import xarray as _xr
@@ -388,24 +410,100 @@ class Jim:
         #due to rounding y might overflow
         y = y[0:self.properties.nrOfRow()]
 
+        if not self and self._source is not None:
+            arrays = self._dask_arrays(chunks)
+        else:
+            # Build a xarray Dataset reference (without memory copy)
+            # Do not alter shape or destroy x_dataset!
+            arrays = [self.np(b) for b in bands]
 
-        # Build a xarray Dataset reference (without memory copy)
-        # Do not alter shape or destroy x_dataset!
         if self.properties.nrOfPlane() > 1:
-            x_dataset = _xr.Dataset({str(b):_xr.DataArray(self.np(b),
+            x_dataset = _xr.Dataset({str(b):_xr.DataArray(arrays[b],
                                                         dims=['time', 'y', 'x'],
                                                         coords={'time': list(planes),
                                                         'x': x, 'y': y},
                                                         attrs={'_FillValue': 0})
                                     for b in bands})
         else:
-            x_dataset = _xr.Dataset({str(b):_xr.DataArray(self.np(b),
+            x_dataset = _xr.Dataset({str(b):_xr.DataArray(arrays[b],
                                                         dims=['y', 'x'],
                                                         coords={'x': x, 'y': y},
                                                         attrs={'_FillValue': 0})
                                     for b in bands})
         return x_dataset
 
+    def _dask_arrays(self, chunks=None):
+        """Return dask arrays reading the bands of a Jim opened with noread.
+
+        :param chunks: chunk size in pixels as an integer or [ncol, nrow]
+        :return: list of dask arrays (one per band)
+        """
+        import dask.array as _da
+
+        filename, kwargs = self._source
+        kwargs = {key: value for key, value in kwargs.items()
+                  if key not in ('noread', 'ulx', 'uly', 'lrx', 'lry', 'bbox',
+                                 'tileindex', 'tiletotal', 'overlap',
+                                 'band')}
+        file_bands = self._source[1].get('band')
+        if isinstance(file_bands, int):
+            file_bands = [file_bands]
+
+        gt = self.properties.getGeoTransform()
+        # keep the (resampled and reprojected, with t_srs) grid of the Jim
+        # object when reading chunks
+        kwargs.update({'dx': gt[1], 'dy': -gt[5]})
+
+        if chunks is None:
+            chunks = 1024
+        if isinstance(chunks, int):
+            chunks = [chunks, chunks]
+        nplane = self.properties.nrOfPlane()
+        shape = (self.properties.nrOfRow(), self.properties.nrOfCol())
+        block_chunks = _da.core.normalize_chunks((chunks[1], chunks[0]),
+                                                 shape)
+        if nplane > 1:
+            block_chunks = ((nplane,),) + block_chunks
+        dtype = _dtype_from_otype(self.properties.getDataType())
+
+        arrays = []
+        for band in range(self.properties.nrOfBand()):
+            file_band = file_bands[band] if file_bands else band
+            arrays.append(_da.map_blocks(
+                _functools.partial(tiled._read_block, filename, kwargs, gt,
+                                   file_band),
+                chunks=block_chunks, dtype=dtype,
+                meta=_np.empty((0,) * len(block_chunks), dtype=dtype)))
+        return arrays
+
+    @property
+    def view(self):
+        """Create zero-copy windows of this Jim object with jim.view[item].
+
+        The item is a numpy basic index (integers and slices with positive
+        steps) with the same meaning as for jim[item]. Unlike jim[item],
+        no pixel data are copied (see :py:class:`JimView`)::
+
+            tile = jim.view[0:256, 0:256]
+            tile.stats.getStats(['min', 'max'])
+
+        :return: an object to be indexed, returning a JimView
+        """
+        return _ViewIndexer(self)
+
+    def lazy(self):
+        """Return a deferred expression node referring to this Jim object.
+
+        Operators applied to the returned object build an expression graph
+        instead of allocating a new Jim object for every intermediate
+        result. The expression is evaluated in a single blocked and
+        multi-threaded pass with :py:meth:`JimExpr.compute`::
+
+            ndvi = ((nir.lazy() - red) / (nir.lazy() + red)).compute()
+
+        :return: a JimExpr object
+        """
+        return JimExpr(None, self)
 
     @staticmethod
     def _checkInitParamsSense(image, kwargs):
@@ -468,28 +566,75 @@ class Jim:
                     raise exceptions.JimIllegalArgumentError(
                         'The list parsed as the uniform argument must be '
                         'in the form [min, max + 1]')
-                for band in range(0, self.properties.nrOfBand()):
-                    self.np(band)[:] = _np.random.uniform(
-                        uniform[0], uniform[1], self.np(band).shape)
+                low, high = uniform
             else:
-                for band in range(0, self.properties.nrOfBand()):
-                    self.np(band)[:] = _np.random.uniform(
-                        0, uniform, self.np(band).shape)
+                low, high = 0, uniform
         else:
             if stdev is None:
                 stdev = 1
             if mean is None:
                 mean = 0
-            for band in range(0, self.properties.nrOfBand()):
-                self.np(band)[:] = _np.random.normal(
-                    mean, stdev, self.np(band).shape)
+
+        # draw the values by blocks to limit the size of the temporary
+        # arrays (same sequence of random values as when drawing them band
+        # by band in a single call)
+        for band in range(0, self.properties.nrOfBand()):
+            values = self.np(band).reshape(-1)
+            for start in range(0, values.size, _FEED_BLOCK_SIZE):
+                stop = min(start + _FEED_BLOCK_SIZE, values.size)
+                if uniform:
+                    values[start:stop] = _np.random.uniform(
+                        low, high, stop - start)
+                else:
+                    values[start:stop] = _np.random.normal(
+                        mean, stdev, stop - start)
 
     def _set(self, modified_object):
         """Apply changes done in modified_object to the parent Jim instance.
 
         :param modified_object: modified Jim instance
         """
+        if self._jipjim._readonly:
+            raise exceptions.JimNotSupportedError(
+                'Interned Jim objects (see kernels.get) can not be modified')
         self._jipjim.__dict__.update(modified_object.__dict__)
+        self._jipjim._version = next(_versions)
+
+    def _lend(self, array):
+        """Keep track of a writable array sharing the memory of the Jim object.
+
+        The content digest (see :py:func:`properties._digest`) is not used
+        while such an array is alive or if one was handed out after the
+        digest was calculated. Arrays of interned Jim objects are handed out
+        read-only instead.
+
+        :param array: numpy array referring to the memory of the Jim object
+        :return: array
+        """
+        jipjim = self._jipjim
+        if jipjim._readonly:
+            array.flags.writeable = False
+            return array
+        if jipjim._lent is None:
+            jipjim._lent = _weakref.WeakSet()
+        jipjim._lent.add(array)
+        jipjim._lent_version = next(_versions)
+        return array
+
+    def _metadata(self):
+        """Return the metadata snapshot of the Jim object.
+
+        The snapshot is cached and replaced when the version of the jiplib
+        object changes (i.e., when it is modified in place).
+
+        :return: properties._Metadata object
+        """
+        version = self._jipjim._version
+        metadata = self._cached_metadata
+        if metadata is None or metadata.version != version:
+            metadata = properties._Metadata(version)
+            self._cached_metadata = metadata
+        return metadata
 
     # *** unary operators *** #
 
@@ -515,6 +660,13 @@ class Jim:
             mask = item > 0
             return Jim(self * mask)
         else:
+            try:
+                # basic indexing: copy the window once with a single
+                # georeference calculation
+                return JimView(self, item).copy()
+            except exceptions.JimIllegalArgumentError:
+                pass
+
             nband = self.properties.nrOfBand()
             for band in range(nband):
                 npresult = _np.array(self.np(band)[item])
@@ -687,6 +839,10 @@ class Jim:
 
         :return: Jim object with pixels 1 if equal values, 0 otherwise
         """
+        if isinstance(right, JimExpr):
+            # let the JimExpr build a deferred expression (reflected
+            # operator)
+            return NotImplemented
         jim = Jim(_jl.Jim(self.properties.nrOfCol(), self.properties.nrOfRow(),
                           self.properties.nrOfBand(),
                           self.properties.nrOfPlane(), _jl.GDT_Byte))
@@ -710,6 +866,8 @@ class Jim:
 
         :return: False if equal values, True otherwise
         """
+        if isinstance(right, JimExpr):
+            return NotImplemented
         jim = Jim(_jl.Jim(self.properties.nrOfCol(), self.properties.nrOfRow(),
                           self.properties.nrOfBand(),
                           self.properties.nrOfPlane(), _jl.GDT_Byte))
@@ -733,6 +891,8 @@ class Jim:
 
         :return: False if equal values, True otherwise
         """
+        if isinstance(right, JimExpr):
+            return NotImplemented
         jim = Jim(_jl.Jim(self.properties.nrOfCol(), self.properties.nrOfRow(),
                           self.properties.nrOfBand(),
                           self.properties.nrOfPlane(), _jl.GDT_Byte))
@@ -756,6 +916,8 @@ class Jim:
 
         :return: False if equal values, True otherwise
         """
+        if isinstance(right, JimExpr):
+            return NotImplemented
         jim = Jim(_jl.Jim(self.properties.nrOfCol(), self.properties.nrOfRow(),
                           self.properties.nrOfBand(),
                           self.properties.nrOfPlane(), _jl.GDT_Byte))
@@ -779,6 +941,8 @@ class Jim:
 
         :return: False if equal values, True otherwise
         """
+        if isinstance(right, JimExpr):
+            return NotImplemented
         jim = Jim(_jl.Jim(self.properties.nrOfCol(), self.properties.nrOfRow(),
                           self.properties.nrOfBand(),
                           self.properties.nrOfPlane(), _jl.GDT_Byte))
@@ -802,6 +966,8 @@ class Jim:
 
         :return: False if equal values, True otherwise
         """
+        if isinstance(right, JimExpr):
+            return NotImplemented
         jim = Jim(_jl.Jim(self.properties.nrOfCol(), self.properties.nrOfRow(),
                           self.properties.nrOfBand(),
                           self.properties.nrOfPlane(), _jl.GDT_Byte))
@@ -822,6 +988,8 @@ class Jim:
 
     def __add__(self, right):
         """Pixel wise operation +."""
+        if isinstance(right, JimExpr):
+            return NotImplemented
         result = Jim(self)
         if isinstance(right, Jim):
             self._checkNumberOfBands(right)
@@ -862,6 +1030,8 @@ class Jim:
 
     def __sub__(self, right):
         """Pixel wise operation -."""
+        if isinstance(right, JimExpr):
+            return NotImplemented
         result = Jim(self)
         if isinstance(right, Jim):
             self._checkNumberOfBands(right)
@@ -902,6 +1072,8 @@ class Jim:
 
     def __mul__(self, right):
         """Pixel wise operation *."""
+        if isinstance(right, JimExpr):
+            return NotImplemented
         result = Jim(self)
         if isinstance(right, Jim):
             self._checkNumberOfBands(right)
@@ -957,6 +1129,8 @@ class Jim:
 
     def __truediv__(self, right):
         """Pixel wise operation for true division."""
+        if isinstance(right, JimExpr):
+            return NotImplemented
         result = Jim(self)
         if isinstance(right, Jim):
             self._checkNumberOfBands(right)
@@ -988,6 +1162,8 @@ class Jim:
 
     def __div__(self, right):
         """Pixel wise operation /."""
+        if isinstance(right, JimExpr):
+            return NotImplemented
         result = Jim(self)
         if 'int' in str(self.np().dtype):
             raise exceptions.JimIllegalArgumentError('You cannot divide a Jim '
@@ -1022,6 +1198,8 @@ class Jim:
 
     def __mod__(self, right):
         """Pixel wise operation modulo."""
+        if isinstance(right, JimExpr):
+            return NotImplemented
         result = Jim(self)
         if isinstance(right, Jim):
             self._checkNumberOfBands(right)
@@ -1053,6 +1231,8 @@ class Jim:
 
     def __pow__(self, right):
         """Pixel wise operation **."""
+        if isinstance(right, JimExpr):
+            return NotImplemented
         result = Jim(self)
         for iband in range(0, self.properties.nrOfBand()):
             result.np(iband)[:] **= right
@@ -1066,6 +1246,8 @@ class Jim:
 
     def __lshift__(self, right):
         """Pixel wise operation <<."""
+        if isinstance(right, JimExpr):
+            return NotImplemented
         if isinstance(right, int):
             jim = Jim(self)
             for iband in range(0, self.properties.nrOfBand()):
@@ -1089,6 +1271,8 @@ class Jim:
 
     def __rshift__(self, right):
         """Pixel wise operation >>."""
+        if isinstance(right, JimExpr):
+            return NotImplemented
         if isinstance(right, int):
             jim = Jim(self)
             for iband in range(0, self.properties.nrOfBand()):
@@ -1112,6 +1296,8 @@ class Jim:
 
     def __or__(self, right):
         """Pixel wise operation |."""
+        if isinstance(right, JimExpr):
+            return NotImplemented
         if isinstance(right, Jim):
             jim = Jim(self)
             self._checkNumberOfBands(right)
@@ -1165,6 +1351,8 @@ class Jim:
 
     def __xor__(self, right):
         """Pixel wise operation ^."""
+        if isinstance(right, JimExpr):
+            return NotImplemented
         if isinstance(right, Jim):
             jim = Jim(self)
             self._checkNumberOfBands(right)
@@ -1218,6 +1406,8 @@ class Jim:
 
     def __and__(self, right):
         """Pixel wise operation &."""
+        if isinstance(right, JimExpr):
+            return NotImplemented
         if isinstance(right, Jim):
             jim = Jim(self)
             self._checkNumberOfBands(right)
@@ -1269,6 +1459,187 @@ class Jim:
                 'unsupported operand type for & : {}'.format(
                     type(left)))
 
+    # *** numpy protocols *** #
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """Apply a numpy universal function band by band.
+
+        The ufunc runs directly on the arrays returned by :py:meth:`np`.
+        Without the out argument, the result is a new Jim object with the
+        dimensions and georeference of the first Jim operand. With the out
+        argument, the result is written into the provided Jim object(s)
+        without any intermediate copy::
+
+            np.add(jim_a, jim_b, out=jim_c)
+            np.sqrt(jim)
+        """
+        if method != '__call__':
+            return NotImplemented
+        out = kwargs.pop('out', None)
+        if out is not None and \
+                not all(isinstance(jim, Jim) for jim in out):
+            return NotImplemented
+        if not all(isinstance(operand, (Jim, _np.ndarray, _numbers.Number,
+                                        _np.generic)) for operand in inputs):
+            return NotImplemented
+
+        template, nband = _band_template(inputs + (out or ()))
+        where = kwargs.pop('where', True)
+
+        if out is None:
+            # probe the result type on a single pixel, scalars are passed
+            # unchanged to keep the numpy promotion rules for scalars
+            probe = ufunc(*[_band_array(operand, 0)[..., :1, :1]
+                            if isinstance(operand, Jim)
+                            else operand.ravel()[:1]
+                            if isinstance(operand, _np.ndarray)
+                            else operand
+                            for operand in inputs], **kwargs)
+            if ufunc.nout == 1:
+                probe = (probe,)
+            dtypes = [_np.float32 if array.dtype == _np.float16
+                      else array.dtype for array in probe]
+            if ufunc.nout == 1 and 'dtype' not in kwargs and \
+                    dtypes[0] != probe[0].dtype:
+                kwargs['dtype'] = dtypes[0]
+            out = tuple(_new_like(template, nband, dtype)
+                        for dtype in dtypes)
+
+        for band in range(nband):
+            ufunc(*[_band_array(operand, band) for operand in inputs],
+                  out=tuple(jim.np(band) for jim in out),
+                  where=_band_array(where, band), **kwargs)
+
+        return out[0] if len(out) == 1 else out
+
+    def __array_function__(self, func, types, args, kwargs):
+        """Dispatch supported numpy functions to their Jim implementation.
+
+        Supported functions are numpy.where, numpy.clip and numpy.copyto.
+        """
+        if func not in _HANDLED_FUNCTIONS:
+            return NotImplemented
+        return _HANDLED_FUNCTIONS[func](*args, **kwargs)
+
+
+_HANDLED_FUNCTIONS = {}
+
+
+def _implements(np_function):
+    """Register a Jim implementation of a numpy function."""
+    def decorator(func):
+        _HANDLED_FUNCTIONS[np_function] = func
+        return func
+    return decorator
+
+
+def _band_array(operand, band: int):
+    """Return the numpy array of a band if operand is a Jim object.
+
+    Jim objects with a single band are used for all bands.
+
+    :param operand: Jim object or anything else (returned as it is)
+    :param band: band index
+    """
+    if isinstance(operand, Jim):
+        if operand.properties.nrOfBand() == 1:
+            band = 0
+        return operand.np(band)
+    return operand
+
+
+def _whole_array(operand):
+    """Return the numpy array of all bands if operand is a Jim object.
+
+    :param operand: Jim object or anything else (returned as it is)
+    :return: the array of the band of a single band Jim object, the
+        [band][plane][row][col] array of a multi-band Jim object
+    """
+    if isinstance(operand, Jim):
+        if operand.properties.nrOfBand() == 1:
+            return operand.np(0)
+        return operand.np_cube()
+    return operand
+
+
+def _band_template(operands):
+    """Return the first Jim object and the number of bands of the result.
+
+    :param operands: Jim objects and other operands of a numpy function
+    :return: a tuple (template Jim object, number of bands)
+    """
+    jims = [operand for operand in operands if isinstance(operand, Jim)]
+    nband = max(jim.properties.nrOfBand() for jim in jims)
+    for jim in jims:
+        if jim.properties.nrOfBand() not in (1, nband):
+            raise exceptions.JimBandsError(
+                'Jims used in numpy functions must have either the same '
+                'number of bands or number of bands == 1')
+    return jims[0], nband
+
+
+def _new_like(template: Jim, nband: int, dtype):
+    """Create a Jim object with the geometry of template and a numpy dtype.
+
+    :param template: Jim object used for the dimensions and georeference
+    :param nband: number of bands
+    :param dtype: numpy data type of the new Jim object
+    :return: a Jim object (pixel values are not initialized)
+    """
+    jim = Jim(ncol=template.properties.nrOfCol(),
+              nrow=template.properties.nrOfRow(),
+              nplane=template.properties.nrOfPlane(), nband=nband,
+              otype=_otype_from_dtype(dtype))
+    jim.properties.copyGeoReference(template)
+    return jim
+
+
+@_implements(_np.where)
+def _where(condition, x, y):
+    """Return a Jim object with values from x where condition, y otherwise.
+
+    Without copying x, y or condition (only the result is allocated).
+    """
+    template, nband = _band_template((condition, x, y))
+    dtype = _np.result_type(*[_band_array(operand, 0)
+                              for operand in (x, y)])
+    result = _new_like(template, nband, dtype)
+    for band in range(nband):
+        output = result.np(band)
+        _np.copyto(output, _band_array(y, band), casting='unsafe')
+        _np.copyto(output, _band_array(x, band), casting='unsafe',
+                   where=_np.asarray(_band_array(condition, band), bool))
+    return result
+
+
+@_implements(_np.clip)
+def _clip(jim, a_min, a_max, out=None, **kwargs):
+    """Clip the values of a Jim object, in place if out is the Jim object."""
+    if not isinstance(jim, Jim) or \
+            (out is not None and not isinstance(out, Jim)):
+        # a Jim object as a_min or a_max of an array
+        return _np.clip(_whole_array(jim), _whole_array(a_min),
+                        _whole_array(a_max), out=out, **kwargs)
+    if out is None:
+        out = Jim(jim)
+    for band in range(jim.properties.nrOfBand()):
+        _np.clip(_band_array(jim, band), _band_array(a_min, band),
+                 _band_array(a_max, band), out=out.np(band), **kwargs)
+    return out
+
+
+@_implements(_np.copyto)
+def _copyto(dst, src, casting='same_kind', where=True):
+    """Copy values from src (Jim, array or scalar) into a Jim object."""
+    if not isinstance(dst, Jim):
+        # a Jim object as src or where of an array
+        _np.copyto(dst, _whole_array(src), casting=casting,
+                   where=_whole_array(where))
+        return
+    for band in range(dst.properties.nrOfBand()):
+        _np.copyto(dst.np(band), _band_array(src, band), casting=casting,
+                   where=_band_array(where, band))
+
 
 class _ParentList(_jl.JimList):
 
@@ -1284,9 +1655,109 @@ class _ParentList(_jl.JimList):
         super(_ParentList, self).__init__(jiplib_images_list, *args)
 
 
+def _read_source(jim, bbox=None):
+    """Read the pixel data of a Jim object opened with noread=True.
+
+    :param jim: Jim object opened from a file with noread=True
+    :param bbox: bounding box [ulx, uly, lrx, lry] to read (default is the
+        extent the Jim object was opened with)
+    :return: a new Jim object with the pixel data, jim itself if it already
+        contains data
+    """
+    if jim or jim._source is None:
+        return jim
+    filename, kwargs = jim._source
+    kwargs = {key: value for key, value in kwargs.items() if key != 'noread'}
+    if bbox is not None:
+        kwargs.pop('bbox', None)
+        kwargs.update({'ulx': bbox[0], 'uly': bbox[1], 'lrx': bbox[2],
+                       'lry': bbox[3]})
+    return Jim(filename, **kwargs)
+
+
+def _share(jim):
+    """Copy the pixel data and metadata of a Jim object in shared memory.
+
+    :param jim: Jim object
+    :return: tuple with the name of the shared memory block, the shape
+        ([band][plane][row][col]) and data type of the array, the
+        geotransform, projection and no data values
+    """
+    shape = (jim.properties.nrOfBand(), jim.properties.nrOfPlane(),
+             jim.properties.nrOfRow(), jim.properties.nrOfCol())
+    dtype = jim.np(0).dtype
+    block = _shared_memory.SharedMemory(
+        create=True, size=max(1, int(_np.prod(shape)) * dtype.itemsize))
+    array = _np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    for band in range(shape[0]):
+        array[band] = jim.np(band).reshape(shape[1:])
+    del array
+    block.close()
+    return (block.name, shape, dtype.str, jim.properties.getGeoTransform(),
+            jim.properties.getProjection(), jim.properties.getNoDataVals())
+
+
+def _unshare(header, unlink: bool = True):
+    """Create a Jim object from a shared memory block.
+
+    :param header: tuple returned by :py:func:`_share`
+    :param unlink: set True to release the shared memory block
+    :return: Jim object
+    """
+    name, shape, dtype, geotransform, projection, nodata = header
+    block = _shared_memory.SharedMemory(name=name)
+    try:
+        array = _np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        jim = np2jim(list(array), geotransform=geotransform,
+                     projection=projection, nodata=nodata or None)
+        del array
+    finally:
+        block.close()
+        if unlink:
+            block.unlink()
+    return jim
+
+
+def _map_member(func, header, source):
+    """Apply a function on a member of a JimList in a worker process.
+
+    :param func: function with a Jim object as argument
+    :param header: shared memory header of the member (see
+        :py:func:`_share`) or None to read the member from source
+    :param source: tuple with the filename and keys to open a lazy member
+    :return: shared memory header of the result
+    """
+    if header is None:
+        filename, kwargs = source
+        kwargs = {key: value for key, value in kwargs.items()
+                  if key != 'noread'}
+        jim = Jim(filename, **kwargs)
+    else:
+        jim = _unshare(header, unlink=False)
+    return _share(_map_result(func(jim), jim))
+
+
+def _map_result(result, jim):
+    """Check the result of a function applied by JimList.map().
+
+    :param result: returned value of the function
+    :param jim: member the function was applied on
+    :return: the result, jim if the member was modified in place
+    """
+    if result is None:
+        return jim
+    if not isinstance(result, Jim):
+        raise exceptions.JimListIllegalArgumentError(
+            'The function applied by JimList.map() must return a Jim '
+            'object or None')
+    return result
+
+
 class JimList(list):
     """Definition of JimList object."""
 
+    __slots__ = ('_jipjimlist', '_residency', '_spatial_index', '__weakref__')
+
     def __init__(self, images_list=None, *args):
         """Initialize the Jim object and modules for methods.
 
@@ -1298,6 +1769,9 @@ class JimList(list):
 
         if isinstance(images_list, Jim):
             images_list = [images_list]
+        elif isinstance(images_list, JimList):
+            # read the members of a lazy JimList only once
+            images_list = list(images_list)
         elif not isinstance(images_list, list):
             raise exceptions.JimListIllegalArgumentError(
                 'Argument images_list must be either list, JimList or a Jim '
@@ -1305,52 +1779,52 @@ class JimList(list):
 
         super(JimList, self).__init__(images_list)
         self._jipjimlist = _ParentList(images_list, *args)
-
-        self._all = all._AllList()
-        self._ccops = ccops._CCOpsList()
-        self._classify = classify._ClassifyList()
-        self._demops = demops._DEMOpsList()
-        self._geometry = geometry._GeometryList()
-        self._io = io._IOList()
-        self._ngbops = ngbops._NgbOpsList()
-        self._pixops = pixops._PixOpsList()
-        self._properties = properties._PropertiesList()
-        self._stats = stats._StatsList()
-
-    @property
-    def geometry(self):
-        """Set up a caller and garbage cleaner for the module geometry."""
-        self._geometry._set_caller(self)
-        _gc.collect()
-        return self._geometry
-
-    @property
-    def io(self):
-        """Set up a caller and garbage cleaner for the module io."""
-        self._io._set_caller(self)
-        _gc.collect()
-        return self._io
-
-    @property
-    def pixops(self):
-        """Set up a caller and garbage cleaner for the module pixops."""
-        self._pixops._set_caller(self)
-        _gc.collect()
-        return self._pixops
-
-    @property
-    def properties(self):
-        """Set up a caller and garbage cleaner for the module properties."""
-        self._properties._set_caller(self)
-        _gc.collect()
-        return self._properties
-
-    @property
-    def stats(self):
-        """Set up a caller and garbage cleaner for the module stats."""
-        self._stats._set_caller(self)
-        _gc.collect()
-        return self._stats
+        self._residency = None
+        self._spatial_index = None
+
+    @classmethod
+    def from_paths(cls, paths, max_memory='8GB', **kwargs):
+        """Create a JimList reading the pixel data of its members on access.
+
+        Only the metadata of the rasters are read when the JimList is
+        created (as with noread=True). The pixel data of a member are read
+        when it is accessed (e.g., jimlist[i] or when iterating) and kept
+        in memory until the max_memory budget is exceeded, at which point
+        the least recently used members are released.
+
+        Methods iterating over the members, such as stats.getStats() (min,
+        max), geometry.stackPlane() and pixops.infimum(), stream through the
+        members. geometry.extract() reads the members within the bounding
+        box of the vector only. Other methods read all members.
+
+        Members are read-only: in place changes to a member are lost when
+        it is released. Use pj.JimList(jimlist) to read all members in a
+        JimList that is not lazy.
+
+        :param paths: list of paths to rasters
+        :param max_memory: memory budget for the pixel data of the resident
+            members, in bytes or as a string (e.g., '512MB' or '8GB')
+        :param kwargs: keys used to open each raster (see :ref:`Jim
+            constructor <create_Jim_from_file>`)
+        :return: a lazy JimList
+
+        Calculate the minimum and maximum over a time series of 500 scenes
+        with at most 4GB of pixel data in memory::
+
+            jiml = pj.JimList.from_paths(paths, max_memory='4GB')
+            jiml.stats.getStats(['min', 'max'])
+        """
+        members = [Jim(path, noread=True, **kwargs) for path in paths]
+        jimlist = cls(members)
+        jimlist._residency = _memory._Residency(_parse_memory(max_memory),
+                                                _read_source)
+        return jimlist
+
+    geometry = _ModuleAccessor(geometry._GeometryList)
+    io = _ModuleAccessor(io._IOList)
+    pixops = _ModuleAccessor(pixops._PixOpsList)
+    properties = _ModuleAccessor(properties._PropertiesList)
+    stats = _ModuleAccessor(stats._StatsList)
 
     @staticmethod
     def getMethods(queried_module: str = None):
@@ -1386,13 +1860,147 @@ class JimList(list):
         assert isinstance(jim, Jim), \
             'Only Jim instances can be appended'
         super(JimList, self).append(jim)
-        self._set(self, from_list=True)
+        self._jipjimlist.pushImage(jim._jipjim)
+        if self._spatial_index is not None:
+            self._spatial_index.append(
+                self._memberBBox(jim, self._spatial_index.t_srs),
+                jim._jipjim._version)
+
+    def __getitem__(self, index):
+        """Return a member (read on access for lazy JimLists).
+
+        :param index: index or slice
+        """
+        item = super(JimList, self).__getitem__(index)
+        if self._residency is None:
+            return item
+        if isinstance(index, slice):
+            jimlist = JimList(item)
+            jimlist._residency = self._residency
+            return jimlist
+        return self._residency.get(item)
+
+    def __iter__(self):
+        """Iterate over the members (read one by one for lazy JimLists)."""
+        if self._residency is None:
+            return super(JimList, self).__iter__()
+        return (self[i] for i in range(len(self)))
+
+    def __reversed__(self):
+        """Iterate over the members in reverse order."""
+        if self._residency is None:
+            return super(JimList, self).__reversed__()
+        return (self[i] for i in reversed(range(len(self))))
+
+    def map(self, func, workers: int = None, backend: str = 'thread'):
+        """Apply a function on all members concurrently.
+
+        The results are returned in the order of the members. Members of a
+        lazy JimList (see :py:meth:`from_paths`) are read by the workers.
+
+        With the 'thread' backend, func runs in a pool of threads on the
+        members themselves. Most jiplib methods and numpy release the GIL,
+        so this is the default.
+
+        With the 'process' backend, func runs in a pool of processes. Jim
+        objects can not be pickled: the pixel data are passed to and from
+        the workers in shared memory blocks (one copy each way) and lazy
+        members are read by the workers from their files. func must be
+        defined at the top level of a module (functools.partial can be
+        used to set extra arguments).
+
+        :param func: function with a Jim object as argument, returning a Jim
+            object (or None if the member is modified in place)
+        :param workers: number of workers (default is the number of CPUs)
+        :param backend: 'thread' or 'process'
+        :return: JimList with the results
+
+        Smooth all members on all CPUs::
+
+            def smooth(jim):
+                return pj.ngbops.smoothNoData2d(jim, 0)
+
+            smoothed = jiml.map(smooth, backend='process')
+        """
+        if backend not in ('thread', 'process'):
+            raise exceptions.JimListIllegalArgumentError(
+                "backend must be 'thread' or 'process'")
+        if workers is None:
+            workers = _os.cpu_count() or 1
+        workers = max(1, min(workers, len(self) or 1))
+
+        if backend == 'thread':
+            def apply(index):
+                jim = self[index]
+                return _map_result(func(jim), jim)
+
+            with _futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                return JimList(list(executor.map(apply, range(len(self)))))
+
+        results = []
+        # futures in the order of the members, with their shared input
+        pending = _collections.deque()
+
+        def collect():
+            future, header = pending.popleft()
+            try:
+                results.append(_unshare(future.result()))
+            finally:
+                if header is not None:
+                    _shared_memory.SharedMemory(name=header[0]).unlink()
+
+        try:
+            with _futures.ProcessPoolExecutor(max_workers=workers) as \
+                    executor:
+                try:
+                    # limit the number of members waiting in shared memory
+                    for member in self._members():
+                        if not member and member._source is not None:
+                            header = None
+                        else:
+                            header = _share(member)
+                        pending.append((executor.submit(
+                            _map_member, func, header, member._source),
+                            header))
+                        if len(pending) >= 2 * workers:
+                            collect()
+                    while pending:
+                        collect()
+                except BaseException:
+                    for future, _ in pending:
+                        future.cancel()
+                    raise
+        finally:
+            # release the shared memory of the members not collected
+            for future, header in pending:
+                if header is not None:
+                    _shared_memory.SharedMemory(name=header[0]).unlink()
+                if not future.cancelled() and future.exception() is None:
+                    _shared_memory.SharedMemory(
+                        name=future.result()[0]).unlink()
+        return JimList(results)
+
+    def _members(self):
+        """Return the members as a list, without reading lazy members."""
+        return super(JimList, self).__getitem__(slice(None))
+
+    def _resident(self, bbox=None):
+        """Return a JimList with the pixel data of all members.
+
+        :param bbox: bounding box [ulx, uly, lrx, lry] to read the members
+            of a lazy JimList
+        :return: self if not lazy, a new JimList otherwise
+        """
+        if self._residency is None:
+            return self
+        return JimList([_read_source(member, bbox)
+                        for member in self._members()])
 
     def count(self, jim: Jim):
         """Count the occurrences of element in the JimList.."""
         i = 0
         for jim_object in self:
-            if jim.properties.isEqual(jim_object):
+            if properties._equal(jim, jim_object, compute=True):
                 i += 1
 
         return i
@@ -1401,8 +2009,17 @@ class JimList(list):
         """Add elements of a JimList to another JimList."""
         assert isinstance(jim_list, JimList), \
             'Only JimList instances can be used to extend JimList'
-        super(JimList, self).extend(jim_list)
-        self._set(self, from_list=True)
+        if self._residency is None:
+            images = list(jim_list)
+        else:
+            images = jim_list._members()
+        super(JimList, self).extend(images)
+        for image in images:
+            self._jipjimlist.pushImage(image._jipjim)
+            if self._spatial_index is not None:
+                self._spatial_index.append(
+                    self._memberBBox(image, self._spatial_index.t_srs),
+                    image._jipjim._version)
 
     def index(self, jim: Jim, start: int = 0, end: int = None):
         """Return smallest index of element in the JimList."""
@@ -1410,35 +2027,120 @@ class JimList(list):
             end = len(self)
 
         for i in range(start, end):
-            if self[i].properties.isEqual(jim):
+            if properties._equal(self[i], jim, compute=True):
                 return i
 
     def insert(self, index: int, jim: Jim):
         """Insert elements to the JimList."""
         assert isinstance(jim, Jim), \
             'Only Jim instances can be inserted'
+        # position where list.insert() puts the element
+        index = min(max(index + len(self), 0) if index < 0 else index,
+                    len(self))
+        if index < len(self):
+            self._spatial_index = None
+        elif self._spatial_index is not None:
+            self._spatial_index.append(
+                self._memberBBox(jim, self._spatial_index.t_srs),
+                jim._jipjim._version)
         super(JimList, self).insert(index, jim)
-        self._set(self, from_list=True)
+        self._sync(index)
 
     def pop(self,
             index: int = -1):
         """Remove and return element at given index."""
         popped = super(JimList, self).pop(index)
-        self._set(self, from_list=True)
+        index = index + len(self) + 1 if index < 0 else index
+        self._sync(index)
+        if self._spatial_index is not None:
+            self._spatial_index.remove(index)
+        if self._residency is not None:
+            return _read_source(popped)
         return popped
 
     def remove(self, jim: Jim):
         """Remove the first occurrence of an element from the JimList."""
         for i in range(len(self)):
-            if self[i].properties.isEqual(jim):
-                del self[i]
+            if properties._equal(self[i], jim, compute=True):
+                super(JimList, self).__delitem__(i)
+                self._sync(i)
+                if self._spatial_index is not None:
+                    self._spatial_index.remove(i)
                 break
-        self._set(self, from_list=True)
 
     def reverse(self):
         """Reverse the JimList."""
         super(JimList, self).reverse()
-        self._set(self, from_list=True)
+        self._sync()
+        self._spatial_index = None
+
+    @staticmethod
+    def _memberBBox(jim, t_srs=None):
+        """Get the bounding box of a member (in t_srs if not None)."""
+        if t_srs is None:
+            return jim.properties.getBBox()
+        return jim.properties.getBBox(t_srs=t_srs)
+
+    def _spatialIndex(self, t_srs=None):
+        """Return the spatial index of the members, built on first use.
+
+        The index is updated when members are appended or removed. It is
+        built again for another t_srs or when a member was changed in place
+        (e.g., by geometry.crop or properties.setGeoTransform), as detected
+        by the version of its jiplib object.
+
+        :param t_srs: spatial reference system of the index (default is the
+            reference system of each member)
+        :return: spatial._SpatialIndex object
+        """
+        index = self._spatial_index
+        members = self._members()
+        versions = [member._jipjim._version for member in members]
+        if index is None or index.t_srs != t_srs or \
+                index.versions != versions:
+            index = _spatial._SpatialIndex(
+                [self._memberBBox(member, t_srs) for member in members],
+                versions, t_srs)
+            self._spatial_index = index
+        return index
+
+    def _view(self, positions):
+        """Return a JimList with the members at the given positions.
+
+        Members are not copied (nor read for lazy JimLists).
+
+        :param positions: list of positions
+        :return: JimList
+        """
+        members = self._members()
+        jimlist = JimList([members[position] for position in positions])
+        jimlist._residency = self._residency
+        return jimlist
+
+    def _select(self, positions):
+        """Keep only the members at the given positions.
+
+        :param positions: sorted list of positions
+        """
+        members = self._members()
+        super(JimList, self).__setitem__(
+            slice(None), [members[position] for position in positions])
+        self._sync()
+        self._spatial_index = None
+
+    def _sync(self, start: int = 0):
+        """Synchronize the jiplib JimList from a position onwards.
+
+        Only the images from position start are popped from the jiplib
+        JimList and pushed again, so that appending to or removing from the
+        end of the JimList costs a single call to jiplib.
+
+        :param start: first position that differs from the jiplib JimList
+        """
+        for _ in range(self._jipjimlist.getSize() - start):
+            self._jipjimlist.popImage()
+        for image in super(JimList, self).__getitem__(slice(start, None)):
+            self._jipjimlist.pushImage(image._jipjim)
 
     def _set(self, modified_list, from_list: bool = False):
         """Apply changes done in modified_list to the parent JimList instance.
@@ -1447,15 +2149,22 @@ class JimList(list):
         :param from_list: set True if changing function originates in list()
         """
         if not from_list:
-            del self[:]
-            for i in range(modified_list._jipjimlist.getSize()):
-                im = modified_list._jipjimlist.getImage(i)
-                self.append(Jim(im))
-        else:
-            for _ in range(self._jipjimlist.getSize()):
-                self._jipjimlist.popImage()
-            for image in modified_list:
-                self._jipjimlist.pushImage(image._jipjim)
+            images = [modified_list._jipjimlist.getImage(i)
+                      for i in range(modified_list._jipjimlist.getSize())]
+            if self._residency is not None:
+                # keep the (lazy) members still referred to by jiplib
+                members = {int(member._jipjim.this): member
+                           for member in modified_list._members()}
+                images = [members[int(image.this)]
+                          if int(image.this) in members else Jim(image)
+                          for image in images]
+            else:
+                images = [Jim(image) for image in images]
+            super(JimList, self).__setitem__(slice(None), images)
+            self._spatial_index = None
+            if modified_list is self:
+                return
+        self._sync()
 
     def __dir__(self):
         """Change behaviour of the method whisperer to ignore jiplib methods.
@@ -1543,6 +2252,8 @@ class _ParentVect(_jl.VectorOgr):
 class JimVect:
     """Definition of JimVect object."""
 
+    __slots__ = ('_jipjimvect', '__weakref__')
+
     def __init__(self, vector=None, **kwargs):
         """Create an empty VectorOgr object.
 
@@ -1557,44 +2268,10 @@ class JimVect:
         else:
             self._jipjimvect = _ParentVect(vector, kwargs)
 
-        self._all = all._AllVect()
-        self._ccops = ccops._CCOpsVect()
-        self._classify = classify._ClassifyVect()
-        self._demops = demops._DEMOpsVect()
-        self._geometry = geometry._GeometryVect()
-        self._io = io._IOVect()
-        self._ngbops = ngbops._NgbOpsVect()
-        self._pixops = pixops._PixOpsVect()
-        self._properties = properties._PropertiesVect()
-        self._stats = stats._StatsVect()
-
-    @property
-    def classify(self):
-        """Set up a caller and garbage cleaner for the module classify."""
-        self._classify._set_caller(self)
-        _gc.collect()
-        return self._classify
-
-    @property
-    def io(self):
-        """Set up a caller and garbage cleaner for the module io."""
-        self._io._set_caller(self)
-        _gc.collect()
-        return self._io
-
-    @property
-    def properties(self):
-        """Set up a caller and garbage cleaner for the module properties."""
-        self._properties._set_caller(self)
-        _gc.collect()
-        return self._properties
-
-    @property
-    def geometry(self):
-        """Set up a caller and garbage cleaner for the module geometry."""
-        self._geometry._set_caller(self)
-        _gc.collect()
-        return self._geometry
+    classify = _ModuleAccessor(classify._ClassifyVect)
+    io = _ModuleAccessor(io._IOVect)
+    properties = _ModuleAccessor(properties._PropertiesVect)
+    geometry = _ModuleAccessor(geometry._GeometryVect)
 
     @staticmethod
     def getMethods(queried_module: str = None):
@@ -1702,10 +2379,16 @@ def jim2xr(jim_object: Jim,
     The (contiguous) data array is organized
     as [planes][rows][columns] for the respective bands
 
+    A Jim object opened with noread=True is converted lazily (see
+    :py:meth:`Jim.xr`).
+
     :return: xarray representation
     """
     import xarray as _xr
 
+    if not jim_object and jim_object._source is not None:
+        return jim_object.xr()
+
     #jim_object is a multiband datacube (with multiple planes)
     planes = range(jim_object.properties.nrOfPlane())
     bands = range(jim_object.properties.nrOfBand())
@@ -1762,19 +2445,92 @@ def jimvect2np(jim_object: JimVect,
             'input must be of JimVect type')
 
 
-def np2jim(np_object: _np.ndarray) -> Jim:
+def np2jim(np_object: _np.ndarray,
+           geotransform: list = None,
+           projection: str = None,
+           nodata=None) -> Jim:
     """Return a Jim representation of a numpy array.
 
     The (contiguous) data array must be organized
     as [planes][rows][columns] for the respective bands
 
-    :param np_object: a numpy array
+    Multi-band Jim objects are created from a 4D array organized as
+    [bands][planes][rows][columns] or from a list of arrays (one per band,
+    all with the same shape). The Jim object is allocated once and each band
+    is copied once.
+
+    :param np_object: a numpy array, a 4D numpy array or a list of arrays
+    :param geotransform: geotransform of the Jim object
+    :param projection: projection of the Jim object (wkt or epsg:<code>)
+    :param nodata: (list of) no data value(s) of the Jim object
     :return: a Jim representation of a numpy array
+
+    Create a three band Jim object from numpy arrays::
+
+        jim = pj.np2jim([red, green, blue],
+                        geotransform=[ulx, 10, 0, uly, 0, -10],
+                        projection='epsg:32632')
     """
-    return Jim(_jl.np2jim(np_object))
+    if isinstance(np_object, (list, tuple)) or _np.ndim(np_object) == 4:
+        arrays = [_np.asarray(array) for array in np_object]
+        if not arrays:
+            raise exceptions.JimIllegalArgumentError(
+                'np2jim requires at least one array')
+        shape = arrays[0].shape
+        if len(shape) not in (2, 3):
+            raise exceptions.JimIllegalArgumentError(
+                'Arrays of bands must be organized as [planes][rows][columns]'
+                ' or [rows][columns]')
+        if any(array.shape != shape for array in arrays):
+            raise exceptions.JimIllegalArgumentError(
+                'All bands must have the same shape')
+
+        jim = Jim(ncol=shape[-1], nrow=shape[-2],
+                  nplane=shape[0] if len(shape) == 3 else 1,
+                  nband=len(arrays),
+                  otype=_otype_from_dtype(_np.result_type(*arrays)))
+        for band, array in enumerate(arrays):
+            target = jim.np(band)
+            target[:] = array.reshape(target.shape)
+    else:
+        jim = Jim(_jl.np2jim(np_object))
+
+    if geotransform is not None:
+        jim.properties.setGeoTransform(list(geotransform))
+    if projection is not None:
+        jim.properties.setProjection(projection)
+    if nodata is not None:
+        jim.properties.setNoDataVals(
+            list(nodata) if isinstance(nodata, (list, tuple)) else nodata)
+    return jim
+
 
+class _Anchor:
+    """Expose a numpy array while keeping the Jim object owning it alive.
 
-def xr2jim(xr_object) -> Jim:
+    numpy.asarray(_Anchor(array, jim)) returns a view of array with the
+    anchor as its base, so that jim lives as long as the view.
+    """
+
+    __slots__ = ('_array', '_jim')
+
+    def __init__(self, array, jim):
+        """Initialize the anchor.
+
+        :param array: numpy array referring to the memory of jim
+        :param jim: Jim object
+        """
+        self._array = array
+        self._jim = jim
+
+    @property
+    def __array_interface__(self):
+        """Return the array interface of the anchored array."""
+        return self._array.__array_interface__
+
+
+def xr2jim(xr_object,
+           copy: bool = True) -> Jim:
     """Return a Jim representation from an xarray.
 
     The (contiguous) data array must be organized
@@ -1785,57 +2541,61 @@ def xr2jim(xr_object) -> Jim:
     Notice the (contiguous) data array is organized as [planes][rows][columns]
     for the respective bands
 
+    The Jim object is allocated once and each band is copied once. With
+    copy=False, the data of the variables in the xarray are replaced by
+    views on the Jim object, such that the memory of the original arrays is
+    released (if not referenced elsewhere) and the data are not held twice.
+    The views keep the Jim object alive and it is not released by an
+    active :py:func:`memory_scope`.
+
     :param xr_object: an xarray
+    :param copy: set False to let the xarray refer to the memory of the
+        returned Jim object (the xarray is modified in place)
     :return: a Jim representation from  an xarray
     """
-    import xarray as _xr
-
-    jim = None
     projection = None
+    names = []
     for b in xr_object:
         if xr_object[b].attrs.get('crs_wkt') is not None:
             projection = xr_object[b].attrs.get('crs_wkt')
         elif xr_object[b].attrs.get('spatial_ref') is not None:
             #for backward compatibility
             projection = xr_object[b].attrs.get('spatial_ref')
-        elif jim is None:
-            jim = np2jim(xr_object[b].values)
-            #seems redundant...
-            jim.np(0)[:] = xr_object[b].values
-            gt = []
-            try:
-                dx = xr_object[b].coords['x'].values[1]-xr_object[b].coords['x'].values[0]
-                dy = xr_object[b].coords['y'].values[0]-xr_object[b].coords['y'].values[1]
-                ulx = xr_object[b].coords['x'].values[0]-dx/2.0
-                uly = xr_object[b].coords['y'].values[0]+dy/2.0
-            except KeyError:
-                dx = xr_object[b].coords['lon'].values[1]-xr_object[b].coords['lon'].values[0]
-                dy = xr_object[b].coords['lat'].values[0]-xr_object[b].coords['lat'].values[1]
-                ulx = xr_object[b].coords['lon'].values[0]-dx/2.0
-                uly = xr_object[b].coords['lat'].values[0]+dy/2.0
-            gt.append(ulx)
-            gt.append(dx)
-            gt.append(0)
-            gt.append(uly)
-            gt.append(0)
-            gt.append(-dy)
-            jim.properties.setGeoTransform(gt)
         else:
-            if len(xr_object[b].values.shape) > 2:
-                assert xr_object[b].values.shape[0] == jim.properties.nrOfPlane() ,\
-                    str("Error: number of planes is not consistent: {} != {}".format(xr_object[b].values.shape[0], jim.properties.nrOfPlane()))
-                assert xr_object[b].values.shape[1] == jim.properties.nrOfRow() ,\
-                    str("Error: number of rows is not consistent: {} != {}".format(xr_object[b].values.shape[1], jim.properties.nrOfRow()))
-                assert xr_object[b].values.shape[2] == jim.properties.nrOfCol() ,\
-                    str("Error: number of cols is not consistent: {} != {}".format(xr_object[b].values.shape[2], jim.properties.nrOfCol()))
-            else:
-                assert xr_object[b].values.shape[0] == jim.properties.nrOfRow() ,\
-                    str("Error: number of rows is not consistent: {} != {}".format(xr_object[b].values.shape[0], jim.properties.nrOfRow()))
-                assert xr_object[b].values.shape[1] == jim.properties.nrOfCol() ,\
-                    str("Error: number of cols is not consistent: {} != {}".format(xr_object[b].values.shape[1], jim.properties.nrOfCol()))
-            jim.geometry.stackBand(np2jim(xr_object[b].values))
-            #seems redundant...
-            jim.np(-1)[:] = xr_object[b].values
+            names.append(b)
+
+    first = xr_object[names[0]]
+    shape = first.shape
+    for b in names[1:]:
+        band_shape = xr_object[b].shape
+        if len(shape) > 2:
+            assert band_shape[0] == shape[0], \
+                str("Error: number of planes is not consistent: {} != {}".format(band_shape[0], shape[0]))
+        assert band_shape[-2] == shape[-2], \
+            str("Error: number of rows is not consistent: {} != {}".format(band_shape[-2], shape[-2]))
+        assert band_shape[-1] == shape[-1], \
+            str("Error: number of cols is not consistent: {} != {}".format(band_shape[-1], shape[-1]))
+
+    # allocate the Jim object once for all bands
+    jim = np2jim([xr_object[b].data for b in names])
+    if not copy:
+        # the xarray owns the memory of the Jim object from now on
+        _memory._unregister(jim)
+        for band, b in enumerate(names):
+            xr_object.variables[b].data = _np.asarray(_Anchor(
+                jim.np(band).reshape(xr_object[b].shape), jim))
+
+    try:
+        dx = first.coords['x'].values[1]-first.coords['x'].values[0]
+        dy = first.coords['y'].values[0]-first.coords['y'].values[1]
+        ulx = first.coords['x'].values[0]-dx/2.0
+        uly = first.coords['y'].values[0]+dy/2.0
+    except KeyError:
+        dx = first.coords['lon'].values[1]-first.coords['lon'].values[0]
+        dy = first.coords['lat'].values[0]-first.coords['lat'].values[1]
+        ulx = first.coords['lon'].values[0]-dx/2.0
+        uly = first.coords['lat'].values[0]+dy/2.0
+    jim.properties.setGeoTransform([ulx, dx, 0, uly, 0, -dy])
     if projection is not None:
         jim.properties.setProjection(projection)
     return jim
@@ -0,0 +1,244 @@
+"""Spatial index of the bounding boxes of JimList members."""
+# Author(s): Pieter.Kempeneers@ec.europa.eu,
+#            Ondrej Pesek,
+#            Pierre.Soille@ec.europa.eu
+#
+# Copyright (C) 2018-2022 European Union (Joint Research Centre)
+#
+# This file is part of pyjeo.
+#
+# pyjeo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyjeo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
+
+import bisect as _bisect
+import math as _math
+
+import numpy as _np
+
+
+def _box(bbox):
+    """Convert a bounding box [ulx, uly, lrx, lry] to [minx, miny, maxx, maxy].
+
+    :param bbox: list with upper left x, upper left y, lower right x and
+        lower right y
+    :return: list with min x, min y, max x and max y
+    """
+    ulx, uly, lrx, lry = bbox
+    return [min(ulx, lrx), min(uly, lry), max(ulx, lrx), max(uly, lry)]
+
+
+def _intersects(boxes, box):
+    """Return a mask of the boxes intersecting a box.
+
+    :param boxes: numpy array of [minx, miny, maxx, maxy] rows
+    :param box: [minx, miny, maxx, maxy]
+    """
+    return (boxes[:, 0] <= box[2]) & (boxes[:, 2] >= box[0]) & \
+        (boxes[:, 1] <= box[3]) & (boxes[:, 3] >= box[1])
+
+
+def _contains(boxes, box):
+    """Return a mask of the boxes containing a box.
+
+    :param boxes: numpy array of [minx, miny, maxx, maxy] rows
+    :param box: [minx, miny, maxx, maxy]
+    """
+    return (boxes[:, 0] <= box[0]) & (boxes[:, 2] >= box[2]) & \
+        (boxes[:, 1] <= box[1]) & (boxes[:, 3] >= box[3])
+
+
+class _STRTree:
+    """Static R-tree packed with the Sort-Tile-Recursive algorithm.
+
+    The entries are sorted in vertical slices by their x center and within
+    a slice by their y center, then grouped by capacity in leaves. Upper
+    levels group consecutive nodes. Queries descend the levels in a
+    vectorized breadth-first search.
+    """
+
+    __slots__ = ('_capacity', '_levels', '_ids', '_boxes')
+
+    def __init__(self, boxes, capacity: int = 16):
+        """Pack the tree.
+
+        :param boxes: numpy array of [minx, miny, maxx, maxy] rows
+        :param capacity: maximum number of children per node
+        """
+        self._capacity = capacity
+        nentry = len(boxes)
+        if nentry:
+            centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+            nslice = max(1, int(_math.ceil(_math.sqrt(
+                _math.ceil(nentry / capacity)))))
+            slice_size = nslice * capacity
+            order = _np.argsort(centers[:, 0], kind='stable')
+            for start in range(0, nentry, slice_size):
+                part = order[start:start + slice_size]
+                order[start:start + slice_size] = part[_np.argsort(
+                    centers[part, 1], kind='stable')]
+        else:
+            order = _np.arange(0)
+        self._ids = order
+        self._boxes = boxes[order]
+
+        # bounding boxes of the nodes, from the leaves to the root
+        self._levels = []
+        level = self._boxes
+        while len(level) > capacity or not self._levels:
+            starts = _np.arange(0, len(level), capacity)
+            if len(level):
+                level = _np.column_stack([
+                    _np.minimum.reduceat(level[:, 0], starts),
+                    _np.minimum.reduceat(level[:, 1], starts),
+                    _np.maximum.reduceat(level[:, 2], starts),
+                    _np.maximum.reduceat(level[:, 3], starts)])
+            else:
+                level = level.reshape(0, 4)
+            self._levels.append(level)
+
+    def query(self, box, contains: bool = False):
+        """Return the entries intersecting (or containing) a box.
+
+        :param box: [minx, miny, maxx, maxy]
+        :param contains: set True to return the entries containing the box
+        :return: numpy array with the indices of the entries
+        """
+        candidates = _np.arange(len(self._levels[-1]))
+        levels = self._levels[::-1][1:] + [self._boxes]
+        nodes = self._levels[-1]
+        for children in levels:
+            candidates = candidates[_intersects(nodes[candidates], box)]
+            candidates = (candidates[:, None] * self._capacity +
+                          _np.arange(self._capacity)).ravel()
+            candidates = candidates[candidates < len(children)]
+            nodes = children
+        mask = _contains(nodes[candidates], box) if contains else \
+            _intersects(nodes[candidates], box)
+        return self._ids[candidates[mask]]
+
+
+class _SpatialIndex:
+    """Spatial index of the members of a JimList.
+
+    The bounding boxes are packed in an :py:class:`_STRTree`. Appended
+    members are kept in a pending list and removed members are marked as
+    such, until their number requires the tree to be packed again.
+    Positions returned by queries are the current positions of the members
+    in the JimList. The versions of the members (see Jim._metadata) are
+    kept in versions, to detect members changed in place.
+    """
+
+    __slots__ = ('t_srs', 'versions', '_boxes', '_tree', '_removed',
+                 '_pending')
+
+    def __init__(self, bboxes, versions, t_srs=None):
+        """Build the index.
+
+        :param bboxes: list of bounding boxes [ulx, uly, lrx, lry] of the
+            members
+        :param versions: list of the versions of the members
+        :param t_srs: spatial reference system of the bounding boxes (None
+            for the reference systems of the members)
+        """
+        self.t_srs = t_srs
+        self.versions = list(versions)
+        self._pack(_np.array([_box(bbox) for bbox in bboxes],
+                             dtype=float).reshape(-1, 4))
+
+    def _pack(self, boxes):
+        """Pack the tree for the current bounding boxes."""
+        self._boxes = boxes
+        self._tree = _STRTree(boxes)
+        self._removed = []
+        self._pending = []
+
+    def __len__(self):
+        """Return the number of indexed members."""
+        return len(self._boxes) - len(self._removed) + len(self._pending)
+
+    def _repack_if_needed(self):
+        """Pack the tree if too many changes are pending."""
+        if len(self._removed) + len(self._pending) > \
+                max(32, len(self._boxes) // 4):
+            boxes = _np.delete(self._boxes, self._removed, axis=0)
+            if self._pending:
+                boxes = _np.vstack([boxes, self._pending])
+            self._pack(boxes)
+
+    def append(self, bbox, version: int):
+        """Add the bounding box of a member appended to the JimList.
+
+        :param bbox: bounding box [ulx, uly, lrx, lry]
+        :param version: version of the member
+        """
+        self._pending.append(_box(bbox))
+        self.versions.append(version)
+        self._repack_if_needed()
+
+    def remove(self, position: int):
+        """Remove the member at a position of the JimList.
+
+        :param position: position of the member (before it was removed)
+        """
+        del self.versions[position]
+        packed = len(self._boxes) - len(self._removed)
+        if position >= packed:
+            del self._pending[position - packed]
+        else:
+            # smallest packed entry with position members before it
+            lo, hi = position, position + len(self._removed)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if mid - _bisect.bisect_right(self._removed, mid) >= \
+                        position:
+                    hi = mid
+                else:
+                    lo = mid + 1
+            _bisect.insort(self._removed, lo)
+        self._repack_if_needed()
+
+    def bounds(self):
+        """Return the bounding box [ulx, uly, lrx, lry] of all members."""
+        boxes = _np.delete(self._boxes, self._removed, axis=0)
+        if self._pending:
+            boxes = _np.vstack([boxes, self._pending])
+        if not len(boxes):
+            return None
+        return [boxes[:, 0].min(), boxes[:, 3].max(), boxes[:, 2].max(),
+                boxes[:, 1].min()]
+
+    def query(self, bbox, contains: bool = False):
+        """Return the positions of the members intersecting a bounding box.
+
+        :param bbox: bounding box [ulx, uly, lrx, lry] (or a point with
+            ulx == lrx and uly == lry)
+        :param contains: set True to return the members containing the
+            bounding box entirely
+        :return: sorted list of positions in the JimList
+        """
+        box = _box(bbox)
+        ids = self._tree.query(box, contains)
+        if self._removed:
+            removed = _np.array(self._removed)
+            index = _np.searchsorted(removed, ids)
+            kept = (index >= len(removed)) | \
+                (removed[_np.minimum(index, len(removed) - 1)] != ids)
+            ids = ids[kept] - index[kept]
+        positions = ids.tolist()
+        if self._pending:
+            pending = _np.array(self._pending)
+            mask = _contains(pending, box) if contains else \
+                _intersects(pending, box)
+            packed = len(self._boxes) - len(self._removed)
+            positions.extend((packed + _np.flatnonzero(mask)).tolist())
+        return sorted(positions)
@@ -0,0 +1,348 @@
+"""Running accumulators reducing the planes of streamed Jim objects."""
+# Author(s): Pieter.Kempeneers@ec.europa.eu,
+#            Ondrej Pesek,
+#            Pierre.Soille@ec.europa.eu
+#
+# Copyright (C) 2018-2022 European Union (Joint Research Centre)
+#
+# This file is part of pyjeo.
+#
+# pyjeo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyjeo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
+
+import math as _math
+import os as _os
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+
+import numpy as _np
+
+import pyjeo as _pj
+
+# rules supported by the accumulators
+_RULES = ('mean', 'avg', 'median', 'percentile', 'stdev', 'count_valid',
+         'first_valid', 'last_valid', 'argmin', 'argmax', 'min', 'max')
+
+# maximum number of bytes of a block of rows of a plane folded by a thread
+_BLOCK_SIZE = 4 * 1024 ** 2
+
+
+class _Accumulator:
+    """Fold the planes of Jim objects one by one into running statistics.
+
+    Only the statistics needed by the rule are kept, per band and pixel:
+
+    * mean: count and sum
+    * stdev: count, mean and sum of squared deviations (Welford)
+    * min, max, first_valid, last_valid: the running value
+    * argmin, argmax: the running value and its plane index
+    * median, percentile: a histogram of bins values (approximation
+      within the width of a bin), with 16 bit counters up to 65535 planes
+      and 32 bit counters beyond
+
+    The memory used is independent of the number of planes. The
+    accumulators are not allocated if they exceed max_memory.
+    """
+
+    def __init__(self,
+                 rule: str,
+                 ref_band: int = None,
+                 nodata: float = None,
+                 q: float = None,
+                 bins: int = 64,
+                 value_range: tuple = None,
+                 workers: int = None,
+                 max_memory='8GB'):
+        """Initialize empty accumulators.
+
+        :param rule: one of _RULES
+        :param ref_band: band defining the values to ignore in all bands
+            (default is to check each band)
+        :param nodata: value to ignore
+        :param q: percentile (0 to 100) for the percentile rule
+        :param bins: number of bins of the histograms (median, percentile)
+        :param value_range: (min, max) range of the histograms (default is
+            (0, 256) for Byte data)
+        :param workers: number of threads (default is the number of CPUs)
+        :param max_memory: maximum size of the accumulators, in bytes or as
+            a string (e.g., '512MB' or '8GB')
+        """
+        if rule == 'overwrite':
+            rule = 'last_valid'
+        if rule not in _RULES:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'rule not supported')
+        if rule == 'median':
+            rule, q = 'percentile', 50
+        elif rule == 'avg':
+            rule = 'mean'
+        if rule == 'percentile' and q is None:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'q must be set for the percentile rule')
+        self.rule = rule
+        self.ref_band = ref_band
+        self.nodata = nodata
+        self.q = q
+        self.bins = bins
+        self.value_range = value_range
+        self.workers = workers or _os.cpu_count() or 1
+        self.max_memory = _pj._parse_memory(max_memory)
+        self._template = None
+        self._nplane = 0
+        self._count = None
+        self._state = None
+        self._index = None
+
+    def _check(self, shape, nband: int, counter=_np.uint16):
+        """Raise an error if the accumulators would exceed max_memory.
+
+        :param shape: (rows, columns) of the Jim objects
+        :param nband: number of bands of the Jim objects
+        :param counter: data type of the counters of the histograms
+        """
+        # bytes per pixel and band of the count and the running statistics
+        sizes = {'percentile': self.bins * _np.dtype(counter).itemsize,
+                 'stdev': 16, 'argmin': 16, 'argmax': 16, 'count_valid': 0}
+        nbytes = shape[0] * shape[1] * nband * (
+            4 + sizes.get(self.rule, 8))
+        if nbytes > self.max_memory:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'The accumulators of the {} rule need {:.3g} GB, more than '
+                'max_memory ({:.3g} GB): reduce bins or the extent of the '
+                'rasters, or increase max_memory'.format(
+                    self.rule, nbytes / 1e9, self.max_memory / 1e9))
+
+    def _allocate(self, jim):
+        """Allocate the accumulators for the dimensions of a Jim object."""
+        shape = (jim.properties.nrOfRow(), jim.properties.nrOfCol())
+        nband = jim.properties.nrOfBand()
+        otype = jim.properties.getDataType()
+        self._check(shape, nband)
+        if self.rule == 'percentile':
+            if self.value_range is None:
+                if _pj._dtype_from_otype(otype) != _np.uint8:
+                    raise _pj.exceptions.JimIllegalArgumentError(
+                        'value_range must be set for the median and '
+                        'percentile rules of {} data'.format(otype))
+                self.value_range = (0, 256)
+            self._state = [_np.zeros(shape + (self.bins,), dtype=_np.uint16)
+                           for _ in range(nband)]
+        elif self.rule == 'stdev':
+            self._state = [(_np.zeros(shape), _np.zeros(shape))
+                           for _ in range(nband)]
+        elif self.rule in ('min', 'argmin'):
+            self._state = [_np.full(shape, _np.inf) for _ in range(nband)]
+        elif self.rule in ('max', 'argmax'):
+            self._state = [_np.full(shape, -_np.inf) for _ in range(nband)]
+        elif self.rule != 'count_valid':
+            self._state = [_np.zeros(shape) for _ in range(nband)]
+        if self.rule in ('argmin', 'argmax'):
+            self._index = [_np.zeros(shape, dtype=_np.int64)
+                           for _ in range(nband)]
+        self._count = [_np.zeros(shape, dtype=_np.uint32)
+                       for _ in range(nband)]
+        self._template = {
+            'nrow': shape[0], 'ncol': shape[1], 'nband': nband,
+            'otype': otype,
+            'geotransform': jim.properties.getGeoTransform(),
+            'projection': jim.properties.getProjection(),
+            'nodata': jim.properties.getNoDataVals()}
+
+    def add(self, jim):
+        """Fold the planes of a Jim object into the accumulators.
+
+        :param jim: Jim object with the rows, columns and bands of the first
+            Jim object added
+        """
+        if self._template is None:
+            self._allocate(jim)
+        nrow, ncol = self._template['nrow'], self._template['ncol']
+        nband = self._template['nband']
+        if jim.properties.nrOfRow() != nrow or \
+                jim.properties.nrOfCol() != ncol or \
+                jim.properties.nrOfBand() != nband:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'All Jim objects must have the same number of rows, columns '
+                'and bands to be reduced')
+
+        nplane = jim.properties.nrOfPlane()
+        offset = self._nplane
+        if self.rule == 'percentile' and \
+                self._state[0].dtype == _np.uint16 and \
+                offset + nplane > _np.iinfo(_np.uint16).max:
+            # the counters of the histograms could overflow
+            self._check((nrow, ncol), nband, _np.uint32)
+            self._state = [state.astype(_np.uint32) for state in self._state]
+        sources = [jim.np(band).reshape(nplane, nrow, ncol)
+                   for band in range(nband)]
+        rows = max(1, _BLOCK_SIZE // (ncol * 8))
+        rows = min(rows, int(_math.ceil(nrow / self.workers)))
+
+        def fold(start):
+            stop = min(start + rows, nrow)
+            for plane in range(nplane):
+                valid = None
+                if self.nodata is not None and self.ref_band is not None:
+                    valid = sources[self.ref_band][plane, start:stop] != \
+                        self.nodata
+                for band, source in enumerate(sources):
+                    values = source[plane, start:stop]
+                    if self.ref_band is None:
+                        valid = None if self.nodata is None else \
+                            values != self.nodata
+                    self._fold(band, slice(start, stop), values, valid,
+                               offset + plane)
+
+        with _ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(fold, range(0, nrow, rows)))
+        self._nplane += nplane
+
+    def _fold(self, band: int, rows: slice, values, valid, plane: int):
+        """Fold a block of rows of a plane into the accumulators of a band.
+
+        :param band: band index
+        :param rows: slice of the rows of the block
+        :param values: numpy array [row][col] of the block
+        :param valid: boolean array of the values to use or None for all
+        :param plane: index of the plane in the stream
+        """
+        if valid is None:
+            valid = _np.ones(values.shape, dtype=bool)
+        count = self._count[band][rows]
+        count += valid
+        rule = self.rule
+        if rule == 'count_valid':
+            return
+        if rule == 'percentile':
+            histogram = self._state[band][rows].reshape(-1, self.bins)
+            low, high = self.value_range
+            bins = _np.floor((values - low) * (self.bins / (high - low)))
+            bins = _np.clip(bins, 0, self.bins - 1).astype(_np.intp)
+            pixels = _np.flatnonzero(valid)
+            histogram[pixels, bins.ravel()[pixels]] += 1
+            return
+        if rule == 'stdev':
+            mean, squares = (state[rows] for state in self._state[band])
+            delta = _np.where(valid, values - mean, 0)
+            mean += delta / _np.maximum(count, 1)
+            squares += _np.where(valid, delta * (values - mean), 0)
+            return
+
+        state = self._state[band][rows]
+        if rule == 'mean':
+            state += _np.where(valid, values, 0)
+        elif rule == 'min':
+            _np.minimum(state, values, out=state, where=valid)
+        elif rule == 'max':
+            _np.maximum(state, values, out=state, where=valid)
+        elif rule == 'first_valid':
+            first = valid & (count == 1)
+            state[first] = values[first]
+        elif rule == 'last_valid':
+            state[valid] = values[valid]
+        else:
+            # ties are won by the first plane
+            if rule == 'argmin':
+                better = valid & (values < state)
+            else:
+                better = valid & (values > state)
+            state[better] = values[better]
+            self._index[band][rows][better] = plane
+
+    def _percentile(self, band: int):
+        """Return the percentile of a band from its histograms.
+
+        The values of a bin are assumed to be spread evenly over the bin
+        and the percentile is interpolated linearly between the closest
+        ranks (as numpy.percentile).
+        """
+        low, high = self.value_range
+        width = (high - low) / self.bins
+        count = self._count[band]
+        result = _np.zeros(count.shape)
+        histograms = self._state[band]
+        # limit the size of the cumulative histograms
+        step = max(1, _BLOCK_SIZE // (histograms[0].size * 8))
+        for start in range(0, count.shape[0], step):
+            rows = slice(start, start + step)
+            histogram = histograms[rows]
+            cumulative = _np.cumsum(histogram, axis=-1)
+
+            def value(rank):
+                """Return the value with a (0-based) rank."""
+                bins = _np.argmax(cumulative > rank[..., None], axis=-1)
+                inside = _np.take_along_axis(histogram, bins[..., None],
+                                             axis=-1)[..., 0]
+                before = _np.take_along_axis(cumulative, bins[..., None],
+                                             axis=-1)[..., 0] - inside
+                return low + width * (
+                    bins + (rank - before) / _np.maximum(inside, 1))
+
+            rank = self.q / 100 * (_np.maximum(count[rows], 1) - 1)
+            lower = _np.floor(rank)
+            upper = _np.ceil(rank)
+            result[rows] = value(lower) + (rank - lower) * (
+                value(upper) - value(lower))
+        return result
+
+    def result(self):
+        """Return a single plane Jim object with the reduced planes.
+
+        Pixels without valid values are set to nodata, except for
+        count_valid and for argmin and argmax, where they are set to the
+        largest value of the data type (the no data value of the result).
+
+        :return: Jim object
+        """
+        if self._template is None:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'No Jim object was added to the stream')
+        template = self._template
+        otype = template['otype']
+        nodata = template['nodata']
+        fill = self.nodata if self.nodata is not None else 0
+        if self.rule == 'stdev':
+            if _pj._dtype_from_otype(otype) != _np.float64:
+                otype = 'Float32'
+        elif self.rule in ('count_valid', 'argmin', 'argmax'):
+            otype, index_nodata = _pj._index_type(self._nplane)
+            if self.rule != 'count_valid':
+                # plane indices cannot hold nodata, use a dedicated value
+                nodata = fill = index_nodata
+
+        jim = _pj.Jim(ncol=template['ncol'], nrow=template['nrow'],
+                      nband=template['nband'], otype=otype)
+        jim.properties.setGeoTransform(template['geotransform'])
+        jim.properties.setProjection(template['projection'])
+        if nodata:
+            jim.properties.setNoDataVals(nodata)
+
+        for band in range(template['nband']):
+            count = self._count[band]
+            if self.rule == 'count_valid':
+                reduced = count
+            elif self.rule == 'percentile':
+                reduced = self._percentile(band)
+            elif self.rule == 'stdev':
+                reduced = _np.sqrt(self._state[band][1] /
+                                   _np.maximum(count, 1))
+            elif self.rule == 'mean':
+                reduced = self._state[band] / _np.maximum(count, 1)
+            elif self.rule in ('argmin', 'argmax'):
+                reduced = self._index[band].astype(_np.float64)
+            else:
+                reduced = self._state[band].copy()
+            if self.rule != 'count_valid':
+                reduced[count == 0] = fill
+            _np.copyto(jim.np(band).reshape(count.shape), reduced,
+                       casting='unsafe')
+        return jim
@@ -0,0 +1,592 @@
+"""Tiled processing of Jim objects and raster files."""
+# Author(s): Pieter.Kempeneers@ec.europa.eu,
+#            Ondrej Pesek,
+#            Pierre.Soille@ec.europa.eu
+#
+# Copyright (C) 2018-2022 European Union (Joint Research Centre)
+#
+# This file is part of pyjeo.
+#
+# pyjeo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyjeo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
+
+import concurrent.futures as _futures
+import math as _math
+import numbers as _numbers
+import os as _os
+from pathlib import Path as _Path
+
+import numpy as _np
+from osgeo import gdal as _gdal
+
+import pyjeo as _pj
+
+
+# tolerance (in pixels) to avoid an extra row or column due to rounding
+_EPS = 1e-3
+
+
+def _read_bbox(geotransform, window):
+    """Return the bounding box to read a window with jiplib.
+
+    The bounding box is shrunk by a fraction of a pixel, such that the
+    pixels at the edges are not read because of rounding.
+
+    :param geotransform: geotransform of the pixel grid
+    :param window: window (column offset, row offset, number of columns,
+        number of rows)
+    :return: bounding box [ulx, uly, lrx, lry]
+    """
+    col, row, ncol, nrow = window
+    gt = geotransform
+    dx = gt[1] * _EPS
+    dy = -gt[5] * _EPS
+    return [gt[0] + col * gt[1] + dx, gt[3] + row * gt[5] - dy,
+            gt[0] + (col + ncol) * gt[1] - dx,
+            gt[3] + (row + nrow) * gt[5] + dy]
+
+
+def _read_block(filename, kwargs, geotransform, band, block_info=None):
+    """Read a block of a band of a raster file for a dask array.
+
+    :param filename: path of the raster file
+    :param kwargs: keys used to open the raster file (without noread and
+        spatial subset keys)
+    :param geotransform: geotransform of the opened raster
+    :param band: band index in the raster file
+    :param block_info: block information provided by dask.array.map_blocks
+    :return: numpy array of the block
+    """
+    info = block_info[None]
+    (row0, row1), (col0, col1) = info['array-location'][-2:]
+    ulx, uly, lrx, lry = _read_bbox(geotransform,
+                                    (col0, row0, col1 - col0, row1 - row0))
+    jim = _pj.Jim(filename, ulx=ulx, uly=uly, lrx=lrx, lry=lry, band=[band],
+                  **kwargs)
+    return _np.array(jim.np(0)).reshape(info['chunk-shape'])
+
+
+class Tile:
+    """Window of a :py:class:`TileGrid`.
+
+    Windows are expressed in pixels of the grid as (column offset, row
+    offset, number of columns, number of rows).
+
+    :ivar index: index of the tile in the grid (row major order)
+    :ivar row: row of the tile in the grid
+    :ivar col: column of the tile in the grid
+    :ivar window: window of the tile (without halo)
+    :ivar halo_window: window of the tile including the halo
+    """
+
+    __slots__ = ('index', 'row', 'col', 'window', 'halo_window', '_grid')
+
+    def __init__(self, grid, index, row, col, window, halo_window):
+        """Initialize the tile (tiles are created by a TileGrid)."""
+        self._grid = grid
+        self.index = index
+        self.row = row
+        self.col = col
+        self.window = window
+        self.halo_window = halo_window
+
+    def __repr__(self):
+        """Return a readable representation of the tile."""
+        return 'Tile(index={}, row={}, col={}, window={}, ' \
+               'halo_window={})'.format(self.index, self.row, self.col,
+                                        self.window, self.halo_window)
+
+    @property
+    def bbox(self):
+        """Bounding box [ulx, uly, lrx, lry] of the tile (without halo)."""
+        return self._grid._bbox(self.window)
+
+    @property
+    def halo_bbox(self):
+        """Bounding box [ulx, uly, lrx, lry] of the tile including halo."""
+        return self._grid._bbox(self.halo_window)
+
+    def _read_bbox(self):
+        """Return the bounding box including halo to read with jiplib."""
+        return _read_bbox(self._grid.geotransform, self.halo_window)
+
+    def read(self, **kwargs):
+        """Read the tile including its halo from the source of the grid.
+
+        :param kwargs: extra keys passed to the Jim constructor when reading
+            from file (e.g., band, nodata)
+        :return: a Jim object
+        """
+        source = self._grid.source
+        if source is None:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'A TileGrid without a source can not be read')
+        if isinstance(source, _pj.Jim):
+            if not self._grid.snap:
+                raise _pj.exceptions.JimIllegalArgumentError(
+                    'Tiles not snapped to the grid of a Jim object can only '
+                    'be read from file')
+            col, row, ncol, nrow = self.halo_window
+            item = (slice(row, row + nrow), slice(col, col + ncol))
+            if source.properties.nrOfPlane() > 1:
+                item = (slice(None),) + item
+            return source.view[item].copy()
+
+        ulx, uly, lrx, lry = self._read_bbox()
+        return _pj.Jim(source, ulx=ulx, uly=uly, lrx=lrx, lry=lry, **kwargs)
+
+    def cropHalo(self, jim):
+        """Return the part of a Jim object within the tile (without halo).
+
+        The window is found from the georeference of jim, which must cover
+        the tile (e.g., a Jim object obtained with :py:meth:`read` or the
+        result of a neighbourhood operation on it).
+
+        :param jim: Jim object covering the tile
+        :return: a JimView object (use copy() to obtain a Jim object)
+        """
+        ulx, uly, lrx, lry = self.bbox
+        gt = jim.properties.getGeoTransform()
+        col = int(round((ulx - gt[0]) / gt[1]))
+        row = int(round((uly - gt[3]) / gt[5]))
+        item = (slice(row, row + self.window[3]),
+                slice(col, col + self.window[2]))
+        if jim.properties.nrOfPlane() > 1:
+            item = (slice(None),) + item
+        return jim.view[item]
+
+
+class TileGrid:
+    """Plan of pixel aligned tiles covering a raster or a bounding box.
+
+    The grid is defined on the pixels of a source (a Jim object or the path
+    of a raster file, only the metadata is read) or by a bounding box and a
+    pixel size. The tiles are defined either by their number (rows x cols),
+    their size in pixels or the memory available per tile. Tiles are created
+    lazily when iterating over the grid::
+
+        grid = pj.TileGrid('/path/to/dem.vrt', tile_size=4096, halo=16)
+        for tile in grid:
+            jim = tile.read()
+            # do stuff with jim ...
+            tile.cropHalo(jim).io.write(
+                'result_{}.tif'.format(tile.index))
+
+    Select a single tile in a job of a cluster (e.g., the process number)
+    with grid[index] and len(grid) for the number of jobs.
+    """
+
+    def __init__(self,
+                 source=None,
+                 rows: int = None,
+                 cols: int = None,
+                 tile_size=None,
+                 max_memory=None,
+                 halo: int = 0,
+                 bbox: list = None,
+                 dx: float = None,
+                 dy: float = None,
+                 snap: bool = True):
+        """Initialize the grid.
+
+        :param source: Jim object or path of a raster file defining the
+            pixel grid, its extent and the data type and number of bands
+            (for max_memory)
+        :param rows: number of tile rows (default is 1)
+        :param cols: number of tile columns (default is 1)
+        :param tile_size: size of the tiles in pixels as an integer (square
+            tiles) or as a list [ncol, nrow] (the last row and column of
+            tiles can be smaller)
+        :param max_memory: maximum memory per tile including halo in bytes or
+            as a string (e.g., '2GB'), requires a source
+        :param halo: overlap in pixels on each side of the tiles, the halo
+            is limited to the extent of the source
+        :param bbox: bounding box [ulx, uly, lrx, lry] to cover (default is
+            the extent of the source)
+        :param dx: pixel size in x (only without source)
+        :param dy: pixel size in y (only without source)
+        :param snap: snap the bounding box to the pixels of the source (if
+            False, the tiles start at the upper left corner of the bounding
+            box)
+        """
+        if sum(arg is not None for arg in
+               [rows or cols, tile_size, max_memory]) > 1:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'Only one of rows/cols, tile_size and max_memory can be set')
+        if halo < 0:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'halo must be a positive number of pixels')
+
+        if isinstance(source, (str, _Path)):
+            source = str(source)
+            metadata = _pj.Jim(source, noread=True)
+        else:
+            metadata = source
+        self.source = source
+        self.halo = int(halo)
+
+        if metadata is not None:
+            if dx is not None or dy is not None:
+                raise _pj.exceptions.JimIllegalArgumentError(
+                    'dx and dy can only be set for a TileGrid without source')
+            gt = list(metadata.properties.getGeoTransform())
+            limits = [0, 0, metadata.properties.nrOfCol(),
+                      metadata.properties.nrOfRow()]
+        elif bbox is not None and dx is not None and dy is not None:
+            gt = [bbox[0], dx, 0, bbox[1], 0, -abs(dy)]
+            limits = None
+        else:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'A TileGrid requires a source or a bbox with dx and dy')
+
+        if bbox is None:
+            if metadata is None:
+                raise _pj.exceptions.JimIllegalArgumentError(
+                    'A TileGrid without source requires a bbox')
+            area = list(limits)
+        else:
+            area = [(bbox[0] - gt[0]) / gt[1], (bbox[1] - gt[3]) / gt[5],
+                    (bbox[2] - gt[0]) / gt[1], (bbox[3] - gt[3]) / gt[5]]
+            if not snap and limits is not None:
+                # move the origin of the grid to the bounding box
+                limits = [int(_math.ceil(limits[0] - area[0] - _EPS)),
+                          int(_math.ceil(limits[1] - area[1] - _EPS)),
+                          int(_math.floor(limits[2] - area[0] + _EPS)),
+                          int(_math.floor(limits[3] - area[1] + _EPS))]
+                gt[0], gt[3] = bbox[0], bbox[1]
+                area = [0, 0, area[2] - area[0], area[3] - area[1]]
+            area = [int(_math.floor(area[0] + _EPS)),
+                    int(_math.floor(area[1] + _EPS)),
+                    int(_math.ceil(area[2] - _EPS)),
+                    int(_math.ceil(area[3] - _EPS))]
+        if area[2] <= area[0] or area[3] <= area[1]:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'The bounding box of the TileGrid is empty')
+
+        self.geotransform = gt
+        self.snap = snap or bbox is None
+        self._limits = limits
+
+        if max_memory is not None:
+            if metadata is None:
+                raise _pj.exceptions.JimIllegalArgumentError(
+                    'max_memory requires a source')
+            pixel_size = metadata.properties.nrOfBand() * \
+                metadata.properties.nrOfPlane() * \
+                _pj._dtype_from_otype(
+                    metadata.properties.getDataType()).itemsize
+            side = int(_math.sqrt(_pj._parse_memory(max_memory) //
+                                   pixel_size)) - 2 * self.halo
+            if side < 1:
+                raise _pj.exceptions.JimIllegalArgumentError(
+                    'max_memory too small for a tile with a halo of {} '
+                    'pixels'.format(self.halo))
+            tile_size = side
+
+        if tile_size is not None:
+            if isinstance(tile_size, _numbers.Integral):
+                tile_size = [tile_size, tile_size]
+            self._col_edges = list(range(area[0], area[2], tile_size[0])) + \
+                [area[2]]
+            self._row_edges = list(range(area[1], area[3], tile_size[1])) + \
+                [area[3]]
+        else:
+            cols = cols or 1
+            rows = rows or 1
+            width = area[2] - area[0]
+            height = area[3] - area[1]
+            if cols > width or rows > height:
+                raise _pj.exceptions.JimIllegalArgumentError(
+                    'More tiles than pixels requested')
+            self._col_edges = [area[0] + icol * width // cols
+                               for icol in range(cols + 1)]
+            self._row_edges = [area[1] + irow * height // rows
+                               for irow in range(rows + 1)]
+
+    @property
+    def shape(self):
+        """Number of tile rows and columns of the grid."""
+        return len(self._row_edges) - 1, len(self._col_edges) - 1
+
+    def __len__(self):
+        """Return the number of tiles."""
+        rows, cols = self.shape
+        return rows * cols
+
+    def __iter__(self):
+        """Iterate lazily over the tiles (row major order)."""
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index: int):
+        """Return a tile.
+
+        :param index: index of the tile (row major order)
+        :return: a Tile object
+        """
+        if not -len(self) <= index < len(self):
+            raise IndexError('Tile index out of range')
+        index = index % len(self)
+        row, col = divmod(index, self.shape[1])
+        col0, col1 = self._col_edges[col], self._col_edges[col + 1]
+        row0, row1 = self._row_edges[row], self._row_edges[row + 1]
+        window = (col0, row0, col1 - col0, row1 - row0)
+
+        # the halo is limited to the source, but does not cut the tile
+        hcol0, hrow0 = col0 - self.halo, row0 - self.halo
+        hcol1, hrow1 = col1 + self.halo, row1 + self.halo
+        if self._limits is not None:
+            hcol0 = max(hcol0, min(self._limits[0], col0))
+            hrow0 = max(hrow0, min(self._limits[1], row0))
+            hcol1 = min(hcol1, max(self._limits[2], col1))
+            hrow1 = min(hrow1, max(self._limits[3], row1))
+        halo_window = (hcol0, hrow0, hcol1 - hcol0, hrow1 - hrow0)
+
+        return Tile(self, index, row, col, window, halo_window)
+
+    def _bbox(self, window):
+        """Return the bounding box [ulx, uly, lrx, lry] of a window."""
+        gt = self.geotransform
+        col, row, ncol, nrow = window
+        return [gt[0] + col * gt[1], gt[3] + row * gt[5],
+                gt[0] + (col + ncol) * gt[1], gt[3] + (row + nrow) * gt[5]]
+
+
+def _tile_bbox(source, tileindex: int, tiletotal: int, overlap: float = 5,
+               bbox: list = None):
+    """Return the bounding box to read for the tileindex/tiletotal keys.
+
+    :param source: path of the raster file
+    :param tileindex: index of the tile
+    :param tiletotal: number of tiles (a squared integer)
+    :param overlap: overlap on each side, expressed as a percentage of
+        twice the tile size
+    :param bbox: bounding box [ulx, uly, lrx, lry] to tile (default is the
+        extent of the source)
+    :return: dictionary with the keys ulx, uly, lrx and lry
+    """
+    ntile = int(round(_math.sqrt(tiletotal)))
+    if ntile * ntile != tiletotal:
+        raise _pj.exceptions.JimIllegalArgumentError(
+            'tiletotal must be squared integer')
+    if not 0 <= tileindex < tiletotal:
+        raise _pj.exceptions.JimIllegalArgumentError(
+            'tileindex must be < {}'.format(tiletotal))
+    if bbox is not None and len(bbox) != 4:
+        raise _pj.exceptions.JimIllegalArgumentError(
+            'bbox must be list of format ulx, uly, lrx, lry')
+
+    metadata = _pj.Jim(source, noread=True)
+    grid = TileGrid(metadata, rows=ntile, cols=ntile, bbox=bbox)
+    halo = int(_math.ceil(grid[tileindex].window[2] * overlap / 200.0))
+    grid = TileGrid(metadata, rows=ntile, cols=ntile, bbox=bbox, halo=halo)
+    return dict(zip(['ulx', 'uly', 'lrx', 'lry'],
+                    grid[tileindex]._read_bbox()))
+
+
+def _process_tile(func, tile, kwargs):
+    """Read a tile, apply a function and crop the halo of the result.
+
+    :param func: function with a Jim object as argument returning a Jim
+        object (or None if the Jim object is modified in place)
+    :param tile: Tile object
+    :param kwargs: extra keys to read the tile
+    :return: tuple with the tile, the array of the result within the tile
+        ([band][plane][row][col]), the data type and the no data values
+    """
+    jim = tile.read(**kwargs)
+    result = func(jim)
+    if result is None:
+        result = jim
+    core = tile.cropHalo(result)
+    shape = (core.properties.nrOfPlane(), core.properties.nrOfRow(),
+             core.properties.nrOfCol())
+    array = _np.stack([core.np(band).reshape(shape)
+                       for band in range(core.properties.nrOfBand())])
+    return tile, array, result.properties.getDataType(), \
+        result.properties.getNoDataVals()
+
+
+class _Mosaic:
+    """Write the results of the tiles in a GeoTIFF file or a Jim object."""
+
+    def __init__(self, grid, output, co):
+        """Initialize the mosaic (created with the first result).
+
+        :param grid: TileGrid of the tiles
+        :param output: path of the output GeoTIFF or None for a Jim object
+        :param co: creation options of the GeoTIFF
+        """
+        self.output = output
+        self.co = co
+        self.jim = None
+        self.dataset = None
+        self.origin = (grid._col_edges[0], grid._row_edges[0])
+        self.ncol = grid._col_edges[-1] - self.origin[0]
+        self.nrow = grid._row_edges[-1] - self.origin[1]
+        gt = list(grid.geotransform)
+        self.geotransform = [gt[0] + self.origin[0] * gt[1], gt[1], gt[2],
+                             gt[3] + self.origin[1] * gt[5], gt[4], gt[5]]
+        source = grid.source
+        if isinstance(source, str):
+            source = _pj.Jim(source, noread=True)
+        self.projection = source.properties.getProjection() \
+            if source is not None else ''
+
+    def _create(self, array, otype, nodata):
+        """Create the output for results of a shape and data type."""
+        nband, nplane = array.shape[:2]
+        if self.output is None:
+            self.jim = _pj.Jim(ncol=self.ncol, nrow=self.nrow, nband=nband,
+                               nplane=nplane, otype=otype)
+            self.jim.properties.setGeoTransform(self.geotransform)
+            self.jim.properties.setProjection(self.projection)
+            if nodata:
+                self.jim.properties.setNoDataVals(list(nodata))
+        else:
+            driver = _gdal.GetDriverByName('GTiff')
+            self.dataset = driver.Create(
+                str(self.output), self.ncol, self.nrow, nband * nplane,
+                getattr(_gdal, 'GDT_' + otype), options=self.co)
+            self.dataset.SetGeoTransform(self.geotransform)
+            self.dataset.SetProjection(self.projection)
+            if nodata:
+                for iband in range(nband * nplane):
+                    self.dataset.GetRasterBand(iband + 1).SetNoDataValue(
+                        nodata[0])
+
+    def write(self, tile, array, otype, nodata):
+        """Write the result of a tile in its window."""
+        if self.jim is None and self.dataset is None:
+            self._create(array, otype, nodata)
+        col = tile.window[0] - self.origin[0]
+        row = tile.window[1] - self.origin[1]
+        nrow, ncol = array.shape[2:]
+        if self.jim is not None:
+            for band in range(array.shape[0]):
+                window = self.jim.np(band)[..., row:row + nrow,
+                                           col:col + ncol]
+                window[:] = array[band].reshape(window.shape)
+        else:
+            nplane = array.shape[1]
+            for band in range(array.shape[0]):
+                for plane in range(nplane):
+                    self.dataset.GetRasterBand(
+                        band * nplane + plane + 1).WriteArray(
+                            array[band, plane], col, row)
+
+    def close(self):
+        """Close the output and return it.
+
+        :return: path of the output GeoTIFF or the Jim object
+        """
+        if self.dataset is not None:
+            self.dataset.FlushCache()
+            self.dataset = None
+        return self.output if self.output is not None else self.jim
+
+
+def map(func,
+        source,
+        halo: int = 0,
+        workers: int = None,
+        output=None,
+        rows: int = None,
+        cols: int = None,
+        tile_size=None,
+        max_memory=None,
+        bbox: list = None,
+        co: list = None,
+        **kwargs):
+    """Apply a function on the tiles of a raster and mosaic the results.
+
+    Each worker reads its tile including the halo, applies func and crops
+    the halo of the result. The main process writes the result of each
+    tile in its window of the output as soon as it is available, so no
+    process holds the full image (unless the output is a Jim object).
+
+    Tiles are processed in a pool of processes if the source is a raster
+    file. A Jim object as source is processed in a pool of threads.
+
+    :param func: function with a Jim object (the tile) as argument,
+        returning a Jim object (or None if the tile is modified in place).
+        The pixel grid of the tile must be kept (e.g., filters, pixel wise
+        operations), the data type and number of bands can change. To use a
+        pool of processes, func must be defined at the top level of a module
+        (functools.partial can be used to set extra arguments)
+    :param source: path of a raster file, Jim object or a TileGrid
+    :param halo: overlap in pixels on each side of the tiles (ignored if
+        source is a TileGrid)
+    :param workers: number of workers (default is the number of CPUs)
+    :param output: path of the output GeoTIFF file (default is to return a
+        Jim object). Planes of multi-plane results are written as bands
+    :param rows: number of tile rows (see :py:class:`TileGrid`)
+    :param cols: number of tile columns (see :py:class:`TileGrid`)
+    :param tile_size: size of the tiles in pixels (see :py:class:`TileGrid`)
+    :param max_memory: maximum memory per tile (see :py:class:`TileGrid`),
+        default is 256MB if rows, cols and tile_size are not set
+    :param bbox: bounding box [ulx, uly, lrx, lry] to process
+    :param co: creation options for the output GeoTIFF (default is
+        ['COMPRESS=LZW', 'TILED=YES', 'BIGTIFF=IF_SAFER'])
+    :param kwargs: extra keys to read the tiles (e.g., band, nodata)
+    :return: path of the output GeoTIFF or a Jim object
+
+    Calculate a morphological gradient on all CPUs::
+
+        def gradient(jim):
+            return pj.ngbops.morphoGradientByDilationDiamond(jim)
+
+        pj.tiled.map(gradient, '/path/to/dem.tif', halo=1,
+                     output='/path/to/gradient.tif')
+    """
+    if isinstance(source, TileGrid):
+        grid = source
+    else:
+        if isinstance(source, _Path):
+            source = str(source)
+        if rows is None and cols is None and tile_size is None and \
+                max_memory is None:
+            max_memory = '256MB'
+        grid = TileGrid(source, rows=rows, cols=cols, tile_size=tile_size,
+                        max_memory=max_memory, halo=halo, bbox=bbox)
+    if grid.source is None:
+        raise _pj.exceptions.JimIllegalArgumentError(
+            'A TileGrid without a source can not be processed')
+    if co is None:
+        co = ['COMPRESS=LZW', 'TILED=YES', 'BIGTIFF=IF_SAFER']
+    if workers is None:
+        workers = _os.cpu_count() or 1
+
+    if isinstance(grid.source, _pj.Jim):
+        executor = _futures.ThreadPoolExecutor(max_workers=workers)
+    else:
+        executor = _futures.ProcessPoolExecutor(max_workers=workers)
+
+    mosaic = _Mosaic(grid, output, co)
+    tiles = iter(grid)
+    pending = set()
+    with executor:
+        # limit the number of results waiting to be written
+        while True:
+            for tile in tiles:
+                pending.add(executor.submit(_process_tile, func, tile,
+                                            kwargs))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                break
+            done, pending = _futures.wait(
+                pending, return_when=_futures.FIRST_COMPLETED)
+            for future in done:
+                mosaic.write(*future.result())
+    return mosaic.close()
@@ -0,0 +1,356 @@
+"""Zero-copy windowed views on Jim objects."""
+# Author(s): Pieter.Kempeneers@ec.europa.eu,
+#            Ondrej Pesek,
+#            Pierre.Soille@ec.europa.eu
+#
+# Copyright (C) 2018-2022 European Union (Joint Research Centre)
+#
+# This file is part of pyjeo.
+#
+# pyjeo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyjeo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
+
+import numbers as _numbers
+
+import numpy as _np
+
+import pyjeo as _pj
+
+
+def _normalize_index(item, shape):
+    """Convert a basic index to a tuple of slices and integers.
+
+    :param item: index as used for numpy basic slicing
+    :param shape: shape of the numpy array of a band
+    :return: tuple with an index per dimension (integers are only kept for
+        the plane dimension), None if item is not supported for a view
+    """
+    if not isinstance(item, tuple):
+        item = (item,)
+    if len(item) > len(shape):
+        return None
+
+    index = []
+    for dim, (key, size) in enumerate(zip(
+            item + (slice(None),) * (len(shape) - len(item)), shape)):
+        if isinstance(key, _numbers.Integral) and \
+                not isinstance(key, bool):
+            if not -size <= key < size:
+                return None
+            key = key + size if key < 0 else key
+            if dim == 0 and len(shape) == 3:
+                index.append(int(key))
+            else:
+                index.append(slice(int(key), int(key) + 1, 1))
+        elif isinstance(key, slice):
+            start, stop, step = key.indices(size)
+            if step < 1 or stop <= start:
+                return None
+            index.append(slice(start, stop, step))
+        else:
+            return None
+    if len(index) == 3 and isinstance(index[0], slice) and \
+            len(range(*index[0].indices(shape[0]))) == 1:
+        index[0] = index[0].start
+    return tuple(index)
+
+
+class JimView:
+    """Window of a Jim object sharing the memory of its parent.
+
+    A JimView is created with ``jim.view[item]``, where item is a numpy basic
+    index (integers and slices with positive steps) as for
+    :py:meth:`Jim.__getitem__`. Creating a view does not copy any pixel
+    data. The arrays returned by :py:meth:`np` are read-only views on the
+    memory of the parent Jim object and the geotransform is adjusted to the
+    window.
+
+    Methods that only read (properties, stats, io.write, and functions that
+    take a Jim object as an argument, such as
+    :py:meth:`~geometry._GeometryVect.extract`) accept a view. Only those
+    requiring jiplib (e.g., writing) copy the window (once) in a new Jim
+    object. Use :py:meth:`copy` to get a Jim object that can be modified.
+
+    Iterate over tiles of 256 x 256 pixels without copying::
+
+        for row in range(0, jim.properties.nrOfRow(), 256):
+            for col in range(0, jim.properties.nrOfCol(), 256):
+                tile = jim.view[row:row + 256, col:col + 256]
+                print(tile.stats.getStats(['min', 'max']))
+
+    The parent Jim object must not be modified in shape nor closed while a
+    view on it is used.
+    """
+
+    __slots__ = ('_parent', '_index', '_geotransform', '_copy')
+
+    def __init__(self, parent, item):
+        """Initialize the view.
+
+        :param parent: Jim object
+        :param item: numpy basic index (integers and slices with positive
+            steps)
+        """
+        index = _normalize_index(item, parent.np(0).shape)
+        if index is None:
+            raise _pj.exceptions.JimIllegalArgumentError(
+                'Index {} not supported for a view, only integers and '
+                'slices with positive steps are supported'.format(item))
+
+        self._parent = parent
+        self._index = index
+        self._copy = None
+
+        rows, cols = index[-2], index[-1]
+        gt = parent.properties.getGeoTransform()
+        self._geotransform = [gt[0] + cols.start * gt[1] + rows.start * gt[2],
+                              gt[1] * cols.step, gt[2] * rows.step,
+                              gt[3] + cols.start * gt[4] + rows.start * gt[5],
+                              gt[4] * cols.step, gt[5] * rows.step]
+
+    def __bool__(self):
+        """Check if the view contains data."""
+        return bool(self._parent)
+
+    @property
+    def parent(self):
+        """Return the Jim object the view refers to."""
+        return self._parent
+
+    @property
+    def properties(self):
+        """Return the properties of the window."""
+        return _ViewProperties(self)
+
+    @property
+    def stats(self):
+        """Return the statistical methods for the window."""
+        return _ViewStats(self)
+
+    @property
+    def io(self):
+        """Return the io methods for the window."""
+        return _ViewIO(self)
+
+    @property
+    def _jipjim(self):
+        """Return a jiplib copy of the window (created once when needed)."""
+        return self._materialize()._jipjim
+
+    def _materialize(self):
+        """Return a copy of the window, created once when needed."""
+        if self._copy is None:
+            self._copy = self.copy()
+        return self._copy
+
+    def np(self, band: int = 0):
+        """Return a read-only numpy view of the window for a band.
+
+        :param band: band index (starting from 0)
+        :return: numpy array referring to the memory of the parent Jim object
+        """
+        array = self._parent.np(band)[self._index]
+        array.flags.writeable = False
+        return array
+
+    def copy(self):
+        """Copy the window in a new Jim object.
+
+        :return: a Jim object
+        """
+        shape = self.np(0).shape
+        nplane = shape[0] if len(shape) == 3 else 1
+        jim = _pj.Jim(ncol=shape[-1], nrow=shape[-2], nplane=nplane,
+                      nband=self._parent.properties.nrOfBand(),
+                      otype=self._parent.properties.getDataType())
+        jim.properties.setProjection(self._parent.properties.getProjection())
+        jim.properties.setGeoTransform(list(self._geotransform))
+        nodata = self._parent.properties.getNoDataVals()
+        if nodata:
+            jim.properties.setNoDataVals(list(nodata))
+        for band in range(self._parent.properties.nrOfBand()):
+            jim.np(band)[:] = self.np(band)
+        return jim
+
+
+class _ViewProperties:
+    """Define the properties methods for JimViews."""
+
+    __slots__ = ('_view',)
+
+    def __init__(self, view):
+        """Set the view the properties refer to."""
+        self._view = view
+
+    def getBBox(self):
+        """Get the bounding box (georeferenced) coordinates of the window.
+
+        :return: A list with upper left x, upper left y, lower right x, and
+            lower right y
+        """
+        return [self.getUlx(), self.getUly(), self.getLrx(), self.getLry()]
+
+    def getDataType(self):
+        """Get the datatype of the parent Jim object."""
+        return self._view._parent.properties.getDataType()
+
+    def getDeltaX(self):
+        """Get the pixel cell spacing in x."""
+        return self._view._geotransform[1]
+
+    def getDeltaY(self):
+        """Get the pixel cell spacing in y."""
+        return -self._view._geotransform[5]
+
+    def getGeoTransform(self):
+        """Get the geotransform data of the window as a list of floats."""
+        return list(self._view._geotransform)
+
+    def getLrx(self):
+        """Get the lower right corner x coordinate of the window."""
+        return self.getUlx() + self.nrOfCol() * self.getDeltaX()
+
+    def getLry(self):
+        """Get the lower right corner y coordinate of the window."""
+        return self.getUly() - self.nrOfRow() * self.getDeltaY()
+
+    def getNoDataVals(self):
+        """Get the list of no data values of the parent Jim object."""
+        return self._view._parent.properties.getNoDataVals()
+
+    def getProjection(self):
+        """Get the projection of the parent Jim object in wkt format."""
+        return self._view._parent.properties.getProjection()
+
+    def getUlx(self):
+        """Get the upper left corner x coordinate of the window."""
+        return self._view._geotransform[0]
+
+    def getUly(self):
+        """Get the upper left corner y coordinate of the window."""
+        return self._view._geotransform[3]
+
+    def isEqual(self, other):
+        """Check if the values of the window are the same as in another.
+
+        :param other: a Jim or JimView object
+        :return: True if the values are equal, False otherwise
+        """
+        if not isinstance(other, (_pj.Jim, JimView)):
+            return False
+        if other.properties.nrOfBand() != self.nrOfBand():
+            return False
+        return all(_np.array_equal(self._view.np(band), other.np(band))
+                   for band in range(self.nrOfBand()))
+
+    def nrOfBand(self):
+        """Get number of bands of the window."""
+        return self._view._parent.properties.nrOfBand()
+
+    def nrOfCol(self):
+        """Get number of columns of the window."""
+        return self._view.np(0).shape[-1]
+
+    def nrOfPlane(self):
+        """Get number of planes of the window."""
+        shape = self._view.np(0).shape
+        return shape[0] if len(shape) == 3 else 1
+
+    def nrOfRow(self):
+        """Get number of rows of the window."""
+        return self._view.np(0).shape[-2]
+
+
+class _ViewStats:
+    """Define the statistical methods for JimViews."""
+
+    __slots__ = ('_view',)
+
+    def __init__(self, view):
+        """Set the view the statistics refer to."""
+        self._view = view
+
+    def getStats(self,
+                 function=['min', 'max', 'mean'],
+                 **kwargs):
+        """Compute basic statistics on the window.
+
+        Statistics min, max, mean and median are calculated without copying
+        the window (if no nodata, src_min or src_max are set). Other
+        statistics are calculated on a copy of the window
+        (see :py:meth:`~stats._Stats.getStats` for the supported functions).
+
+        :param function: (list of) statistical function(s) to calculate
+            (default is ['min', 'max', 'mean'])
+        :return: a dictionary with requested statistics
+        """
+        if isinstance(function, str):
+            function = function.split(',')
+
+        numpy_functions = {'min': _np.min, 'max': _np.max, 'mean': _np.mean,
+                           'median': _np.median}
+        constraints = ('nodata', 'src_min', 'src_max')
+        if any(key in kwargs for key in constraints) or \
+                any(f not in numpy_functions for f in function):
+            return self._view._materialize().stats.getStats(function,
+                                                            **kwargs)
+
+        bands = kwargs.get('band', range(self._view.properties.nrOfBand()))
+        if isinstance(bands, _numbers.Integral):
+            bands = [bands]
+
+        statDict = dict()
+        for f in function:
+            statDict[f] = [numpy_functions[f](self._view.np(band)).item()
+                           for band in bands]
+            if len(statDict[f]) == 1:
+                statDict[f] = statDict[f][0]
+        return statDict
+
+
+class _ViewIO:
+    """Define the io methods for JimViews."""
+
+    __slots__ = ('_view',)
+
+    def __init__(self, view):
+        """Set the view to be written."""
+        self._view = view
+
+    def write(self,
+              filename: str,
+              **kwargs):
+        """Write the window to file in a GDAL supported format.
+
+        See :py:meth:`~pjio._IO.write` for the supported keys.
+
+        :param filename: output filename to write to
+        """
+        self._view._materialize().io.write(filename, **kwargs)
+
+
+class _ViewIndexer:
+    """Create views on a Jim object with the indexing syntax."""
+
+    __slots__ = ('_jim',)
+
+    def __init__(self, jim):
+        """Set the Jim object to create the views on."""
+        self._jim = jim
+
+    def __getitem__(self, item):
+        """Return a JimView of the Jim object for a basic index.
+
+        :param item: numpy basic index
+        """
+        return JimView(self._jim, item)
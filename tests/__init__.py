@@ -24,7 +24,7 @@ import unittest
 
 from tests import test_ccops, test_classify, test_demops, test_geometry,\
     test_io, test_jim_basics, test_jimlist_basics, test_jimvect_basics,\
-    test_ngbops, test_pixops, test_properties, test_stats
+    test_ngbops, test_pixops, test_properties, test_stats, test_tiled
 
 
 def load_tests(loader=None, tests=None, pattern=None):
@@ -43,7 +43,8 @@ def load_tests(loader=None, tests=None, pattern=None):
                                test_ngbops.load_tests(),
                                test_pixops.load_tests(),
                                test_properties.load_tests(),
-                               test_stats.load_tests()])
+                               test_stats.load_tests(),
+                               test_tiled.load_tests()])
 
 
 if __name__ == "__main__":
@@ -387,6 +387,76 @@ class BadCCOps(unittest.TestCase):
             '(maximum value not smaller than nrOfCol * nrOfRow or ' \
             'equal to 0)'
 
+    @staticmethod
+    def test_structuring_elements():
+        """Test the cache of structuring elements (pj.kernels)."""
+        ngb = pj.Jim(graph=4)
+        assert np.array_equal(ngb.np(), [[0, 1, 0], [1, 0, 1], [0, 1, 0]]), \
+            'Error in pj.Jim(graph=4)'
+
+        ngb = pj.Jim(graph=6)
+        assert ngb.properties.nrOfPlane() == 3 and ngb.np().sum() == 6, \
+            'Error in pj.Jim(graph=6)'
+        assert pj.Jim(graph=8).np().sum() == 8, 'Error in pj.Jim(graph=8)'
+        assert pj.Jim(graph=26).np().sum() == 26, 'Error in pj.Jim(graph=26)'
+
+        assert pj.kernels.get(4) is pj.kernels.get(4), \
+            'Error in pj.kernels.get() (structuring element not interned)'
+        assert pj.kernels.get(4, 'Float32').properties.getDataType() == \
+            'Float32', 'Error in pj.kernels.get() (wrong data type)'
+
+        ngb = pj.Jim(graph=4)
+        ngb.np()[1, 1] = 1
+        assert pj.kernels.get(4).np()[1, 1] == 0, \
+            'Error in pj.Jim(graph=4) (interned structuring element modified)'
+        assert not pj.kernels.get(4).np().flags.writeable, \
+            'Error in pj.kernels.get() (writable array of an interned ' \
+            'structuring element)'
+        assert ngb.np().flags.writeable, \
+            'Error in pj.Jim(graph=4) (copy of a structuring element not ' \
+            'writable)'
+
+        for modify in [lambda jim: jim.pixops.setData(1),
+                       lambda jim: jim.pixops.convert('Int16'),
+                       lambda jim: jim.properties.setNoDataVals(0)]:
+            raised = False
+            try:
+                modify(pj.kernels.get(4))
+            except pj.exceptions.JimNotSupportedError:
+                raised = True
+            assert raised, \
+                'Error in catching a modification of an interned ' \
+                'structuring element'
+        assert pj.kernels.get(4).np()[1, 1] == 0 and \
+            pj.Jim(graph=4).np().sum() == 4, \
+            'Error in pj.kernels.get() (interned structuring element modified)'
+
+        cross = np.zeros((5, 5), dtype=np.uint8)
+        cross[2, :] = 1
+        cross[:, 2] = 1
+        pj.kernels.register('test_cross5', cross)
+        assert np.array_equal(pj.Jim(graph='test_cross5').np(), cross), \
+            'Error in pj.kernels.register()'
+        assert 'test_cross5' in pj.kernels.names(), \
+            'Error in pj.kernels.names()'
+
+        raised = False
+        try:
+            pj.kernels.register('test_cross5', cross)
+        except pj.exceptions.JimIllegalArgumentError:
+            raised = True
+
+        assert raised, \
+            'Error in catching a second registration of a structuring element'
+
+        pj.kernels.register('test_cross5', 1 - cross, overwrite=True)
+        assert np.array_equal(pj.kernels.get('test_cross5').np(), 1 - cross), \
+            'Error in pj.kernels.register(overwrite=True)'
+
+        with pj.memory_scope():
+            ngb = pj.kernels.get(8, 'Int16')
+        assert ngb, 'Error in pj.kernels.get() (released by a memory scope)'
+
 
 def load_tests(loader=None, tests=None, pattern=None):
     """Load tests."""
@@ -2476,6 +2476,287 @@ class BadGeometry(unittest.TestCase):
         assert jim.properties.getBBox() == bbox, \
             'Error: bounding box should be identical after repeat 2 col'
 
+    @staticmethod
+    def test_reducePlane_blocks():
+        """Test the mean and median reductions by blocks of rows."""
+        nodata = 0
+        jim = pj.Jim(nrow=50, ncol=40, nplane=5, nband=2, otype='Int16',
+                     uniform=[0, 4], seed=1)
+        original = pj.Jim(jim)
+
+        # force several blocks of rows
+        block_size = pj.geometry._REDUCE_BLOCK_SIZE
+        pj.geometry._REDUCE_BLOCK_SIZE = 5 * 40 * 8 * 3
+        try:
+            mean = pj.geometry.reducePlane(jim, 'mean', nodata=nodata)
+            median = pj.geometry.reducePlane(jim, 'median', ref_band=0,
+                                             nodata=nodata)
+        finally:
+            pj.geometry._REDUCE_BLOCK_SIZE = block_size
+
+        assert jim.properties.isEqual(original), \
+            'Error in geometry.reducePlane(nodata) (input modified)'
+        assert mean.properties.getDataType() == 'Int16', \
+            'Error in geometry.reducePlane(nodata) (data type changed)'
+
+        for band in range(2):
+            values = np.ma.masked_equal(jim.np(band), nodata)
+            ref = np.trunc(values.mean(axis=0).filled(nodata))
+            assert np.array_equal(mean.np(band), ref), \
+                'Error in geometry.reducePlane(rule="mean", nodata) ' \
+                'by blocks of rows'
+
+            values = np.ma.masked_array(jim.np(band),
+                                        mask=jim.np(0) == nodata)
+            ref = np.trunc(np.ma.median(values, axis=0).filled(nodata))
+            assert np.array_equal(median.np(band), ref), \
+                'Error in geometry.reducePlane(rule="median", ref_band, ' \
+                'nodata) by blocks of rows'
+
+
+    @staticmethod
+    def test_reducePlane_rules():
+        """Test the statistical rules of reducePlane()."""
+        nodata = 0
+        jim = pj.Jim(nrow=20, ncol=20, nplane=6, nband=2, otype='Int16',
+                     uniform=[0, 10], seed=2)
+        jim.np(0)[:, 0, 0] = nodata
+        values = np.ma.masked_equal(jim.np(0), nodata)
+
+        reduced = pj.geometry.reducePlane(jim, 'percentile', nodata=nodata,
+                                          q=90)
+        ref = np.nanpercentile(values.filled(np.nan), 90, axis=0)
+        ref[0, 0] = nodata
+        assert np.array_equal(reduced.np(0), np.trunc(ref)), \
+            'Error in geometry.reducePlane(rule="percentile")'
+
+        reduced = pj.geometry.reducePlane(jim, 'stdev', nodata=nodata)
+        ref = values.std(axis=0).filled(nodata)
+        assert reduced.properties.getDataType() == 'Float32', \
+            'Error in geometry.reducePlane(rule="stdev") (data type)'
+        assert np.allclose(reduced.np(0), ref, atol=1e-5), \
+            'Error in geometry.reducePlane(rule="stdev")'
+
+        reduced = pj.geometry.reducePlane(jim, 'count_valid', nodata=nodata)
+        assert np.array_equal(reduced.np(0), values.count(axis=0)), \
+            'Error in geometry.reducePlane(rule="count_valid")'
+        assert reduced.np(0)[0, 0] == 0, \
+            'Error in geometry.reducePlane(rule="count_valid") ' \
+            '(pixel without valid values)'
+
+        first = pj.geometry.reducePlane(jim, 'first_valid', nodata=nodata)
+        last = pj.geometry.reducePlane(jim, 'last_valid', nodata=nodata)
+        argmin = pj.geometry.reducePlane(jim, 'argmin', nodata=nodata)
+        argmax = pj.geometry.reducePlane(jim, 'argmax', nodata=nodata)
+        for row in range(20):
+            for col in range(20):
+                if row == col == 0:
+                    continue
+                pixel = values[:, row, col]
+                planes = np.flatnonzero(~np.ma.getmaskarray(pixel))
+                assert first.np(0)[row, col] == pixel[planes[0]], \
+                    'Error in geometry.reducePlane(rule="first_valid")'
+                assert last.np(0)[row, col] == pixel[planes[-1]], \
+                    'Error in geometry.reducePlane(rule="last_valid")'
+                assert argmin.np(0)[row, col] == pixel.argmin(), \
+                    'Error in geometry.reducePlane(rule="argmin")'
+                assert argmax.np(0)[row, col] == pixel.argmax(), \
+                    'Error in geometry.reducePlane(rule="argmax")'
+        for reduced in [first, last]:
+            assert reduced.np(0)[0, 0] == nodata, \
+                'Error in geometry.reducePlane() (pixel without valid ' \
+                'values not set to nodata)'
+        for reduced in [argmin, argmax]:
+            assert reduced.np(0)[0, 0] == 65535 and \
+                reduced.properties.getNoDataVals() == [65535], \
+                'Error in geometry.reducePlane() (pixel without valid ' \
+                'values not set to the no data value of the index)'
+            assert (reduced.np(0) != 65535).sum() == 20 * 20 - 1, \
+                'Error in geometry.reducePlane() (plane index taken for no ' \
+                'data)'
+
+        argmin = pj.geometry.reducePlane(jim, 'argmin', nodata=-9999)
+        assert argmin.np(0)[0, 0] == np.argmin(jim.np(0)[:, 0, 0]), \
+            'Error in geometry.reducePlane(rule="argmin") with a negative ' \
+            'nodata value'
+
+        jim.geometry.reducePlane('argmax')
+        assert jim.properties.getDataType() == 'UInt16', \
+            'Error in geometry.reducePlane(rule="argmax") (data type)'
+
+        try:
+            pj.geometry.reducePlane(pj.Jim(nrow=5, ncol=5, nplane=2),
+                                    'percentile')
+            failed = True
+        except pj.exceptions.JimIllegalArgumentError:
+            failed = False
+        assert not failed, \
+            'Error in catching a percentile rule without q'
+
+
+    @staticmethod
+    def test_composite():
+        """Test the best-pixel composites of multi-plane Jim objects."""
+        nodata = 0
+        jim = pj.Jim(nrow=30, ncol=20, nplane=4, nband=3, otype='Int16',
+                     uniform=[0, 50], seed=3)
+        jim.np(1)[:, 0, 0] = nodata
+
+        scores = np.where(jim.np(1) == nodata, -1, jim.np(1))
+        planes = np.argmax(scores, axis=0)
+        best, index = pj.geometry.composite(jim, score_band=1,
+                                            nodata=nodata, index=True)
+        assert best.properties.nrOfPlane() == 1 and \
+            best.properties.nrOfBand() == 3, \
+            'Error in geometry.composite() (wrong dimensions)'
+        assert index.properties.getDataType() == 'UInt16', \
+            'Error in geometry.composite() (data type of the index)'
+        planes[0, 0] = 65535
+        assert np.array_equal(index.np(), planes), \
+            'Error in geometry.composite() (wrong index)'
+        assert index.properties.getNoDataVals() == [65535], \
+            'Error in geometry.composite() (no data value of the index)'
+        for band in range(3):
+            ref = np.take_along_axis(jim.np(band), planes[None], axis=0)[0]
+            ref[0, 0] = nodata
+            assert np.array_equal(best.np(band), ref), \
+                'Error in geometry.composite() (bands not copied from the ' \
+                'selected plane)'
+
+        # streaming the members of a JimList gives the same composite
+        jiml = pj.JimList([pj.geometry.cropPlane(jim, plane)
+                           for plane in range(4)])
+        best_list, index_list = jiml.geometry.composite(
+            score_band=1, nodata=nodata, index=True)
+        assert best_list.properties.isEqual(best) and \
+            index_list.properties.isEqual(index), \
+            'Error in geometry.composite() for a JimList'
+
+        compositor = pj.Compositor(score_band=1, nodata=nodata)
+        compositor.add(jiml[0])
+        partial = compositor.result()
+        ref = pj.Jim(partial)
+        assert compositor.result() is not partial, \
+            'Error in Compositor.result() (internal composite returned)'
+        for member in jiml[1:]:
+            compositor.add(member)
+        assert partial.properties.isEqual(ref), \
+            'Error in Compositor.result() (result changed by add())'
+        assert compositor.result().properties.isEqual(best), \
+            'Error in Compositor.add() after Compositor.result()'
+
+        reduced = pj.geometry.reducePlane(jim, 'min', ref_band=1,
+                                          nodata=nodata)
+        index = jim.geometry.composite(score_band=1, rule='min',
+                                       nodata=nodata, index=True)
+        assert jim.properties.isEqual(reduced), \
+            'Error in geometry.composite() (method differs from ' \
+            'reducePlane(rule="min", ref_band))'
+        assert index.np()[0, 0] == 65535, \
+            'Error in geometry.composite() (pixel without valid score)'
+
+
+    @staticmethod
+    def test_reduceStream():
+        """Test the reduction of planes streamed one raster at a time."""
+        nodata = 0
+        jim = pj.Jim(nrow=30, ncol=20, nplane=5, nband=2, otype='Byte',
+                     uniform=[0, 20], seed=4)
+        jim.np(0)[:, 0, 0] = nodata
+        jiml = pj.JimList([pj.geometry.cropPlane(jim, plane)
+                           for plane in range(5)])
+
+        for rule in ['mean', 'stdev', 'count_valid', 'first_valid',
+                     'last_valid', 'argmin', 'argmax']:
+            streamed = pj.geometry.reduceStream(jiml, rule, nodata=nodata)
+            reduced = pj.geometry.reducePlane(jim, rule, nodata=nodata)
+            assert streamed.properties.getDataType() == \
+                reduced.properties.getDataType(), \
+                'Error in geometry.reduceStream(rule="{}") ' \
+                '(data type)'.format(rule)
+            for band in range(2):
+                assert np.allclose(streamed.np(band), reduced.np(band),
+                                   atol=1e-4), \
+                    'Error in geometry.reduceStream(rule="{}")'.format(rule)
+
+        for rule in ['min', 'max']:
+            streamed = pj.geometry.reduceStream(jiml, rule, ref_band=0,
+                                                nodata=nodata)
+            reduced = pj.geometry.reducePlane(jim, rule, ref_band=0,
+                                              nodata=nodata)
+            assert streamed.properties.isEqual(reduced), \
+                'Error in geometry.reduceStream(rule="{}", ' \
+                'ref_band)'.format(rule)
+
+        # histograms of Byte data with 256 bins have one bin per value
+        streamed = pj.geometry.reduceStream(jiml, 'median', ref_band=0,
+                                            nodata=nodata, bins=256)
+        reduced = pj.geometry.reducePlane(jim, 'median', ref_band=0,
+                                          nodata=nodata)
+        assert np.abs(streamed.np(1).astype(int) -
+                      reduced.np(1).astype(int)).max() <= 1, \
+            'Error in geometry.reduceStream(rule="median")'
+
+        streamed = pj.geometry.reduceStream([rasterfn, rasterfn], 'max',
+                                            band=[0])
+        assert streamed.properties.isEqual(pj.Jim(rasterfn, band=[0])), \
+            'Error in geometry.reduceStream() for a list of paths'
+
+        try:
+            pj.geometry.reduceStream(
+                [pj.Jim(nrow=5, ncol=5, otype='Float32')], 'median')
+            failed = True
+        except pj.exceptions.JimIllegalArgumentError:
+            failed = False
+        assert not failed, \
+            'Error in catching a median without value_range for Float32'
+
+        try:
+            pj.geometry.reduceStream(jiml, 'median', max_memory='100kB')
+            failed = True
+        except pj.exceptions.JimIllegalArgumentError:
+            failed = False
+        assert not failed, \
+            'Error in catching histograms larger than max_memory'
+
+
+    @staticmethod
+    def test_multiplane_crop():
+        """Test crop and warp of multi-plane Jim objects in a single pass."""
+        jim = pj.Jim(rasterfn, band2plane=True)
+        nplane = jim.properties.nrOfPlane()
+        bbox = [jim.properties.getUlx() + 1000,
+                jim.properties.getUly() - 1000,
+                jim.properties.getLrx() - 2000,
+                jim.properties.getLry() + 3000]
+
+        cropped = pj.geometry.crop(jim, bbox=bbox, workers=2)
+        assert cropped.properties.nrOfPlane() == nplane, \
+            'Error in geometry.crop() (number of planes changed)'
+        for plane in [0, nplane - 1]:
+            ref = pj.geometry.crop(pj.geometry.cropPlane(jim, plane),
+                                   bbox=bbox)
+            assert pj.geometry.cropPlane(cropped, plane).properties.isEqual(
+                ref), \
+                'Error in geometry.crop() of a multi-plane Jim object'
+        assert cropped.properties.getBBox() == ref.properties.getBBox(), \
+            'Error in geometry.crop() (wrong bounding box)'
+
+        jim_copy = pj.Jim(jim)
+        jim_copy.geometry.crop(bbox=bbox)
+        assert jim_copy.properties.isEqual(cropped), \
+            'Inconsistency in geometry.crop() ' \
+            '(method returns different result than function)'
+
+        warped = pj.geometry.warp(jim, 'epsg:3035', workers=2)
+        ref = pj.geometry.warp(pj.geometry.cropPlane(jim, nplane - 1),
+                               'epsg:3035')
+        assert warped.properties.nrOfPlane() == nplane and \
+            pj.geometry.cropPlane(warped, nplane - 1).properties.isEqual(
+                ref), \
+            'Error in geometry.warp() of a multi-plane Jim object'
+
+
 class BadGeometryLists(unittest.TestCase):
     """Test functions and methods from geometry module."""
 
@@ -2753,6 +3034,55 @@ class BadGeometryLists(unittest.TestCase):
             'method where the band argument exceeds the number of bands of' \
             ' Jims'
 
+    @staticmethod
+    def test_cube():
+        """Test building preallocated cubes from JimLists."""
+        jims = [pj.Jim(nrow=6, ncol=8, nband=3, nplane=nplane, otype='Int16',
+                       uniform=[-100, 100], seed=nplane)
+                for nplane in [1, 2, 3]]
+        for jim in jims:
+            jim.properties.setGeoTransform([100, 10, 0, 500, 0, -10])
+        jiml = pj.JimList(jims)
+
+        cube = pj.Cube.from_list(jiml, workers=2)
+
+        assert cube.properties.nrOfPlane() == 6 and \
+            cube.properties.nrOfBand() == 3, \
+            'Error in Cube.from_list() (wrong dimensions)'
+        assert cube.properties.getGeoTransform() == \
+            jims[0].properties.getGeoTransform(), \
+            'Error in Cube.from_list() (wrong georeference)'
+        for band in range(3):
+            assert np.array_equal(
+                cube.np(band),
+                np.concatenate([jim.np(band).reshape(-1, 6, 8)
+                                for jim in jims])), \
+                'Error in Cube.from_list() (wrong values)'
+        assert cube.properties.isEqual(jiml.geometry.stackPlane()), \
+            'Error in JimList.geometry.stackPlane() (not equal to the cube)'
+
+        cube = pj.Cube.from_list(jims[1:], bands=[2, 0], planes=[0],
+                                 dtype='Float32')
+
+        assert cube.properties.getDataType() == 'Float32', \
+            'Error in Cube.from_list(dtype=Float32)'
+        assert cube.properties.nrOfPlane() == 2 and \
+            cube.properties.nrOfBand() == 2, \
+            'Error in Cube.from_list(bands, planes) (wrong dimensions)'
+        assert np.array_equal(cube.np(0)[1], jims[2].np(2)[0]) and \
+            np.array_equal(cube.np(1)[0], jims[1].np(0)[0]), \
+            'Error in Cube.from_list(bands, planes) (wrong values)'
+
+        try:
+            pj.Cube.from_list([jims[0], pj.Jim(nrow=5, ncol=8, nband=3)])
+            raised = False
+        except pj.exceptions.JimIllegalArgumentError:
+            raised = True
+
+        assert raised, \
+            'Error in catching members of different sizes in ' \
+            'Cube.from_list()'
+
 
 class BadGeometryVects(unittest.TestCase):
     """Test functions and methods from geometry module."""
@@ -1366,6 +1366,470 @@ class BadBasicMethods(unittest.TestCase):
         assert jim2.properties.isEqual(jim0), \
             'Error in the usage of byte strings inside arguments'
 
+    @staticmethod
+    def test_lazy_expressions():
+        """Test deferred evaluation of operators with Jim.lazy()."""
+        nir = pj.Jim(ncol=20, nrow=30, nband=2, otype='Float32',
+                     uniform=[1, 100], seed=0)
+        red = pj.Jim(ncol=20, nrow=30, nband=2, otype='Float32',
+                     uniform=[1, 100], seed=1)
+
+        eager = (nir - red) / (nir + red)
+        lazy = ((nir.lazy() - red) / (nir.lazy() + red)).compute(
+            block_size=50)
+
+        assert lazy.properties.getDataType() == 'Float32', \
+            'Error in data type of JimExpr.compute()'
+        assert lazy.properties.nrOfBand() == 2, \
+            'Error in number of bands of JimExpr.compute()'
+        assert lazy.properties.getGeoTransform() == \
+            nir.properties.getGeoTransform(), \
+            'Error in georeference of JimExpr.compute()'
+        for band in range(2):
+            assert np.allclose(lazy.np(band), eager.np(band)), \
+                'Error in arithmetic operators of JimExpr'
+
+        mask = ((nir.lazy() - red) / (nir.lazy() + red) > 0.3).compute(
+            nthreads=2, block_size=100)
+
+        assert mask.properties.getDataType() == 'Byte', \
+            'Error in data type of a lazy comparison'
+        assert mask.properties.isEqual(eager > 0.3), \
+            'Error in comparison operators of JimExpr'
+
+        both = ((nir.lazy() > 50) & (red.lazy() < 50)).compute()
+
+        assert both.properties.isEqual((nir > 50) & (red < 50)), \
+            'Error in boolean operators of JimExpr'
+
+        scaled = (2 * abs(-red.lazy()) + 1).compute(otype='Float64')
+
+        assert scaled.properties.getDataType() == 'Float64', \
+            'Error in otype argument of JimExpr.compute()'
+        assert np.allclose(scaled.np(1), 2 * red.np(1) + 1), \
+            'Error in unary and reflected operators of JimExpr'
+
+        right = (red - nir.lazy()).compute()
+        assert isinstance(red - nir.lazy(), pj.JimExpr) and \
+            right.properties.isEqual(red - nir), \
+            'Error in Jim - JimExpr (lazy operand on the right)'
+        right = (red / (nir.lazy() + red)).compute()
+        assert np.allclose(right.np(0), (red / (nir + red)).np(0)), \
+            'Error in Jim / JimExpr (lazy operand on the right)'
+        right = (red > nir.lazy()).compute()
+        assert right.properties.isEqual(red > nir), \
+            'Error in Jim > JimExpr (lazy operand on the right)'
+
+        values = red.np(0)
+        floored = (red.lazy() // 7).compute()
+        assert np.array_equal(floored.np(0), values // 7), \
+            'Error in floor division of JimExpr'
+        reflected = (1000 // red.lazy() + 1000 % red.lazy() +
+                     2 ** (red.lazy() / 100)).compute()
+        assert np.allclose(reflected.np(0), 1000 // values +
+                           1000 % values + 2 ** (values / 100)), \
+            'Error in reflected //, % and ** operators of JimExpr'
+
+        ints = pj.Jim(ncol=20, nrow=30, otype='Int32', uniform=[0, 8],
+                      seed=2)
+        shifted = ((1 << ints.lazy()) + (256 >> ints.lazy())).compute()
+        assert np.array_equal(shifted.np(), (1 << ints.np()) +
+                              (256 >> ints.np())), \
+            'Error in reflected shift operators of JimExpr'
+
+    @staticmethod
+    def test_numpy_protocols():
+        """Test numpy ufuncs and functions applied on Jim objects."""
+        jim1 = pj.Jim(ncol=20, nrow=30, nband=2, otype='Float32',
+                      uniform=[-100, 300], seed=0)
+        jim2 = pj.Jim(ncol=20, nrow=30, nband=2, otype='Float32',
+                      uniform=[-100, 300], seed=1)
+        jim1.properties.setGeoTransform([10, 1, 0, 100, 0, -1])
+
+        added = np.add(jim1, jim2)
+
+        assert isinstance(added, pj.Jim), 'Error in np.add(Jim, Jim)'
+        assert added.properties.isEqual(jim1 + jim2), \
+            'Error in np.add(Jim, Jim)'
+        assert added.properties.getGeoTransform() == \
+            jim1.properties.getGeoTransform(), \
+            'Error in georeference of np.add(Jim, Jim)'
+
+        out = pj.Jim(jim1, copy_data=False)
+        result = np.multiply(jim1, 2, out=out)
+
+        assert result is out, 'Error in np.multiply(Jim, 2, out=Jim)'
+        assert out.properties.isEqual(jim1 * 2), \
+            'Error in np.multiply(Jim, 2, out=Jim)'
+
+        greater = np.greater(jim1, jim2)
+
+        assert greater.properties.getDataType() == 'Byte', \
+            'Error in data type of np.greater(Jim, Jim)'
+        assert greater.properties.isEqual(jim1 > jim2), \
+            'Error in np.greater(Jim, Jim)'
+
+        selected = np.where(jim1 > jim2, jim1, jim2)
+
+        for band in range(2):
+            assert np.array_equal(selected.np(band),
+                                  np.maximum(jim1.np(band),
+                                             jim2.np(band))), \
+                'Error in np.where(Jim, Jim, Jim)'
+
+        clipped = pj.Jim(jim1)
+        np.clip(clipped, 0, 255, out=clipped)
+
+        assert clipped.np(1).min() >= 0 and clipped.np(1).max() <= 255, \
+            'Error in np.clip(Jim, min, max, out=Jim)'
+        assert np.array_equal(clipped.np(0), np.clip(jim1.np(0), 0, 255)), \
+            'Error in np.clip(Jim, min, max, out=Jim)'
+
+        jim_byte = pj.Jim(ncol=5, nrow=5, otype='Byte', uniform=[0, 100],
+                          seed=0)
+        rooted = np.sqrt(jim_byte)
+
+        assert rooted.properties.getDataType() == 'Float32', \
+            'Error in data type of np.sqrt(Jim) for Byte Jim'
+
+        assert np.add(jim_byte, 1).properties.getDataType() == 'Byte', \
+            'Error in data type of np.add(Byte Jim, int) (scalar promotion)'
+        halved = np.multiply(jim1, 0.5)
+        assert halved.properties.getDataType() == 'Float32', \
+            'Error in data type of np.multiply(Float32 Jim, float) ' \
+            '(scalar promotion)'
+        assert np.allclose(halved.np(1), jim1.np(1) * 0.5), \
+            'Error in np.multiply(Float32 Jim, float)'
+
+        array = np.zeros((30, 20), dtype=np.float32)
+        single = pj.geometry.cropBand(jim1, 0)
+        np.copyto(array, single)
+        assert np.array_equal(array, single.np(0)), \
+            'Error in np.copyto(ndarray, Jim)'
+
+        low = pj.Jim(single)
+        low.pixops.setData(0)
+        high = pj.Jim(single)
+        high.pixops.setData(100)
+        array = np.linspace(-200, 400, 600).reshape(30, 20)
+        clipped = np.clip(array, low, high)
+        assert isinstance(clipped, np.ndarray) and \
+            np.array_equal(clipped, np.clip(array, 0, 100)), \
+            'Error in np.clip(ndarray, Jim, Jim)'
+        out = np.empty_like(array)
+        np.clip(array, low, high, out=out)
+        assert np.array_equal(out, np.clip(array, 0, 100)), \
+            'Error in np.clip(ndarray, Jim, Jim, out=ndarray)'
+
+    @staticmethod
+    def test_views():
+        """Test zero-copy windows created with Jim.view[item]."""
+        jim = pj.Jim(ncol=40, nrow=30, nband=2, otype='Float32',
+                     uniform=[0, 100], seed=0)
+        jim.properties.setGeoTransform([100, 2, 0, 500, 0, -2])
+        jim.properties.setProjection('epsg:32632')
+
+        view = jim.view[10:20, 5:25:2]
+
+        assert isinstance(view, pj.JimView), 'Error in Jim.view[item]'
+        assert np.shares_memory(view.np(1), jim.np(1)), \
+            'Error in Jim.view[item] (memory not shared)'
+        assert not view.np().flags.writeable, \
+            'Error in Jim.view[item] (view must be read-only)'
+        assert view.properties.nrOfRow() == 10 and \
+            view.properties.nrOfCol() == 10, \
+            'Error in dimensions of Jim.view[item]'
+        assert view.properties.getGeoTransform() == [110, 4, 0, 480, 0, -2], \
+            'Error in geotransform of Jim.view[item]'
+        assert view.properties.getBBox() == [110, 480, 150, 460], \
+            'Error in bounding box of Jim.view[item]'
+
+        copied = jim[10:20, 5:25:2]
+
+        assert view.properties.isEqual(copied), \
+            'Error in JimView (values differ from jim[item])'
+        assert view.copy().properties.isEqual(copied), \
+            'Error in JimView.copy()'
+        assert copied.properties.getGeoTransform() == \
+            view.properties.getGeoTransform(), \
+            'Error in geotransform of jim[item]'
+
+        stats = view.stats.getStats(['min', 'max', 'mean'], band=1)
+        stats_copy = copied.stats.getStats(['min', 'max', 'mean'], band=1)
+
+        assert stats['min'] == stats_copy['min'] and \
+            stats['max'] == stats_copy['max'], \
+            'Error in JimView.stats.getStats()'
+        assert abs(stats['mean'] - stats_copy['mean']) < 1e-4, \
+            'Error in JimView.stats.getStats()'
+        assert pj.stats.getStats(view, 'stdev', band=0) == \
+            copied.stats.getStats('stdev', band=0), \
+            'Error in pj.stats.getStats(JimView)'
+
+        try:
+            _ = jim.view[[1, 2], 0]
+            raised = False
+        except pj.exceptions.JimIllegalArgumentError:
+            raised = True
+
+        assert raised, \
+            'Error in catching a call of Jim.view[] with advanced indexing'
+
+    @staticmethod
+    def test_memory_scope():
+        """Test releasing temporary Jim objects with pj.memory_scope()."""
+        jim = pj.Jim(ncol=10, nrow=10, otype='Float32', uniform=[0, 2],
+                     seed=0)
+
+        with pj.memory_scope() as scope:
+            temp = jim + 1
+            result = scope.keep(temp * 2)
+
+            assert temp, 'Error in pj.memory_scope() (released too early)'
+
+        assert not temp, \
+            'Error in pj.memory_scope() (temporary Jim not released)'
+        assert result, 'Error in pj.memory_scope() (kept Jim released)'
+        assert jim, \
+            'Error in pj.memory_scope() (Jim created outside released)'
+        assert result.properties.nrOfCol() == 10, \
+            'Error in pj.memory_scope() (kept Jim modified)'
+
+        with pj.memory_scope():
+            with pj.memory_scope() as inner:
+                nested = inner.keep(jim + 1)
+
+            assert nested, \
+                'Error in pj.memory_scope() (kept Jim released by inner scope)'
+
+        assert not nested, \
+            'Error in pj.memory_scope() (kept Jim not handed over to outer ' \
+            'scope)'
+
+        assert pj.memory.collect_on_access is False, \
+            'Error in default value of pj.memory.collect_on_access'
+        pj.memory.set_collect_on_access(True)
+        assert jim.properties.nrOfCol() == 10, \
+            'Error in module access with pj.memory.collect_on_access'
+        pj.memory.set_collect_on_access(False)
+
+    @staticmethod
+    def test_feed_blocks():
+        """Test filling Jim objects with random values by blocks."""
+        block_size = pj.pyjeo._FEED_BLOCK_SIZE
+        pj.pyjeo._FEED_BLOCK_SIZE = 7
+        try:
+            jim_uniform = pj.Jim(ncol=10, nrow=5, nplane=2, nband=2,
+                                 otype='Float64', uniform=[0, 10], seed=1)
+            jim_normal = pj.Jim(ncol=10, nrow=5, nplane=2, nband=2,
+                                otype='Float64', mean=3, stdev=2, seed=1)
+        finally:
+            pj.pyjeo._FEED_BLOCK_SIZE = block_size
+
+        np.random.seed(1)
+        ref = np.random.uniform(0, 10, (2, 2, 5, 10))
+        assert np.array_equal(jim_uniform.np_cube(copy=True), ref), \
+            'Error in Jim(uniform=...) filled by blocks'
+        np.random.seed(1)
+        ref = np.random.normal(3, 2, (2, 2, 5, 10))
+        assert np.array_equal(jim_normal.np_cube(copy=True), ref), \
+            'Error in Jim(mean=..., stdev=...) filled by blocks'
+
+    @staticmethod
+    def test_np_cube():
+        """Test the whole-cube numpy access with Jim.np_cube()."""
+        jim = pj.Jim(ncol=8, nrow=6, nband=3, nplane=2, otype='Float32',
+                     uniform=[0, 10], seed=0)
+
+        cube = jim.np_cube()
+
+        assert cube.shape == (3, 2, 6, 8), \
+            'Error in Jim.np_cube() (wrong shape)'
+        for band in range(3):
+            assert np.array_equal(cube[band], jim.np(band)), \
+                'Error in Jim.np_cube() (wrong values)'
+
+        if cube.flags.writeable:
+            # bands contiguous in memory, the cube refers to the Jim object
+            cube[1, 0, 0, 0] = -1
+            assert jim.np(1)[0, 0, 0] == -1, \
+                'Error in Jim.np_cube() (zero-copy cube not a reference)'
+        else:
+            raised = False
+            try:
+                jim.np_cube(copy=False)
+            except pj.exceptions.JimIllegalArgumentError:
+                raised = True
+
+            assert raised, \
+                'Error in catching Jim.np_cube(copy=False) for non ' \
+                'contiguous bands'
+
+        copied = jim.np_cube(copy=True)
+        copied[0, 0, 0, 0] = 100
+        assert jim.np(0)[0, 0, 0] != 100, \
+            'Error in Jim.np_cube(copy=True) (not a copy)'
+
+        jim = pj.Jim(ncol=8, nrow=6, nband=2, otype='Byte', uniform=[0, 10],
+                     seed=0)
+        assert jim.np_cube().shape == (2, 1, 6, 8), \
+            'Error in Jim.np_cube() (wrong shape for a single plane)'
+
+        raised = False
+        try:
+            pj.Jim().np_cube()
+        except pj.exceptions.JimEmptyError:
+            raised = True
+
+        assert raised, 'Error in catching Jim.np_cube() for an empty Jim'
+
+    @staticmethod
+    def test_lazy_modules():
+        """Test the lazy binding of modules and the slots of Jim objects."""
+        jim = pj.Jim(ncol=3, nrow=3, otype='Byte')
+
+        assert not hasattr(jim, '__dict__'), \
+            'Error in Jim.__slots__ (Jim objects have a __dict__)'
+        assert jim.properties is not jim.properties, \
+            'Error in module accessors (module objects stored in Jim)'
+        assert jim.properties._jim_object is jim, \
+            'Error in module accessors (module bound to a wrong object)'
+        assert pj.Jim.properties is pj.properties._Properties, \
+            'Error in module accessors (class access)'
+
+        jiml = pj.JimList([jim])
+        assert jiml.properties._jim_list is jiml, \
+            'Error in module accessors of JimList'
+
+        raised = False
+        try:
+            jim.unknown_attribute = 1
+        except AttributeError:
+            raised = True
+
+        assert raised, 'Error in Jim.__slots__ (new attributes allowed)'
+
+    @staticmethod
+    def test_xarray_conversions():
+        """Test conversions to xarray and back with xr2jim()."""
+        jim = pj.Jim(ncol=20, nrow=10, nband=5, nplane=3, otype='Float32',
+                     uniform=[0, 100], seed=0)
+        jim.properties.setGeoTransform([100, 10, 0, 500, 0, -10])
+
+        new_jim = pj.xr2jim(jim.xr())
+
+        assert new_jim.properties.isEqual(jim), \
+            'Error in xr2jim() (wrong values)'
+        assert new_jim.properties.getGeoTransform() == \
+            jim.properties.getGeoTransform(), \
+            'Error in xr2jim() (wrong geotransform)'
+        assert new_jim.properties.getDataType() == 'Float32', \
+            'Error in xr2jim() (wrong data type)'
+
+        dataset = pj.jim2xr(jim)
+        new_jim = pj.xr2jim(dataset, copy=False)
+
+        assert new_jim.properties.isEqual(jim), \
+            'Error in xr2jim(copy=False) (wrong values)'
+
+        new_jim.np(1)[0, 0, 0] = -1
+        assert dataset['1'].values[0, 0, 0] == -1, \
+            'Error in xr2jim(copy=False) (xarray does not refer to the Jim)'
+
+        del new_jim
+        pj.memory.collect()
+        assert dataset['1'].values[0, 0, 0] == -1 and \
+            dataset['2'].values[0, 0, 0] == jim.np(2)[0, 0, 0], \
+            'Error in xr2jim(copy=False) (Jim released while referenced ' \
+            'by the xarray)'
+
+        with pj.memory_scope():
+            dataset = pj.jim2xr(jim)
+            pj.xr2jim(dataset, copy=False)
+        assert np.array_equal(dataset['3'].values, jim.np(3)), \
+            'Error in xr2jim(copy=False) (Jim released by memory_scope ' \
+            'while referenced by the xarray)'
+
+    @staticmethod
+    def test_lazy_xarray():
+        """Test the dask backed xarray of a Jim opened with noread=True."""
+        jim = pj.Jim(testFile)
+        expected = jim.xr()
+
+        lazy = pj.Jim(testFile, noread=True).xr(chunks=[100, 150])
+
+        assert lazy['0'].chunks is not None, \
+            'Error in Jim.xr() for noread=True (not backed by dask)'
+        assert np.array_equal(lazy['0'].values, expected['0'].values), \
+            'Error in Jim.xr() for noread=True (wrong values)'
+        assert np.array_equal(lazy['0'].coords['x'].values,
+                              expected['0'].coords['x'].values), \
+            'Error in Jim.xr() for noread=True (wrong coordinates)'
+
+        lazy = pj.Jim(testFile, noread=True, band=[1, 2]).xr()
+        assert np.array_equal(lazy['1'].values, expected['2'].values), \
+            'Error in Jim.xr() for noread=True with a band subset'
+
+        expected = pj.Jim(clcfn, t_srs='epsg:3035').xr()
+        lazy = pj.Jim(clcfn, t_srs='epsg:3035', noread=True).xr(
+            chunks=[50, 40])
+        assert np.array_equal(lazy['0'].values, expected['0'].values), \
+            'Error in Jim.xr() for noread=True with t_srs (wrong values)'
+        assert np.array_equal(lazy['0'].coords['y'].values,
+                              expected['0'].coords['y'].values), \
+            'Error in Jim.xr() for noread=True with t_srs (wrong coordinates)'
+
+    @staticmethod
+    def test_np2jim_bands():
+        """Test the creation of multi-band Jim objects with np2jim()."""
+        cube = np.arange(3 * 2 * 10 * 20, dtype=np.int16).reshape(
+            (3, 2, 10, 20))
+        gt = [100, 10, 0, 500, 0, -10]
+
+        jim = pj.np2jim(cube, geotransform=gt, projection='epsg:32632',
+                        nodata=-1)
+
+        assert jim.properties.nrOfBand() == 3 and \
+            jim.properties.nrOfPlane() == 2, \
+            'Error in np2jim() for a 4D array (wrong dimensions)'
+        assert jim.properties.getDataType() == 'Int16', \
+            'Error in np2jim() for a 4D array (wrong data type)'
+        assert np.array_equal(jim.np_cube(), cube), \
+            'Error in np2jim() for a 4D array (wrong values)'
+        assert jim.properties.getGeoTransform() == gt, \
+            'Error in np2jim(geotransform=...)'
+        assert jim.properties.getNoDataVals() == [-1], \
+            'Error in np2jim(nodata=...)'
+        assert 'UTM' in jim.properties.getProjection(), \
+            'Error in np2jim(projection=...)'
+
+        bands = [np.full((10, 20), band, dtype=np.float32)
+                 for band in range(4)]
+        jim = pj.np2jim(bands)
+
+        assert jim.properties.nrOfBand() == 4 and \
+            jim.properties.nrOfPlane() == 1, \
+            'Error in np2jim() for a list of arrays (wrong dimensions)'
+        assert np.array_equal(jim.np(3), bands[3]), \
+            'Error in np2jim() for a list of arrays (wrong values)'
+
+        raised = False
+        bands = [np.full((10, 20), -5, dtype=np.int8),
+                 np.full((10, 20), 7, dtype=np.int8)]
+        jim = pj.np2jim(bands)
+        assert jim.properties.getDataType() == 'Int16', \
+            'Error in np2jim() for int8 arrays (wrong data type)'
+        assert (jim.np(0) == -5).all() and (jim.np(1) == 7).all(), \
+            'Error in np2jim() for int8 arrays (negative values wrapped)'
+
+        try:
+            pj.np2jim([np.zeros((10, 20)), np.zeros((10, 21))])
+        except pj.exceptions.JimIllegalArgumentError:
+            raised = True
+
+        assert raised, \
+            'Error in catching arrays with different shapes in np2jim()'
+
 
 def load_tests(loader=None, tests=None, pattern=None):
     """Load tests."""
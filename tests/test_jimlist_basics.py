@@ -27,6 +27,11 @@ testFile = 'tests/data/modis_ndvi_2010.tif'
 tiles = ['tests/data/red1.tif', 'tests/data/red2.tif']
 
 
+def _double(jim):
+    """Return a Jim object with doubled values (used in worker processes)."""
+    return pj.pixops.convert(jim, 'Float32') * 2
+
+
 class BadBasicMethodLists(unittest.TestCase):
     """Test functions and methods on the root level for JimLists."""
 
@@ -153,6 +158,144 @@ class BadBasicMethodLists(unittest.TestCase):
         assert jiml1[1].properties.isEqual(image1),\
             'Error in JimList.reverse()'
 
+    @staticmethod
+    def test_incremental_sync():
+        """Test the synchronization of JimLists with their jiplib lists."""
+        jims = [pj.Jim(ncol=5, nrow=5, otype='Byte') for _ in range(6)]
+        for value, jim in enumerate(jims):
+            jim.np()[:] = value
+
+        def in_sync(jiml):
+            return len(jiml) == jiml._jipjimlist.getSize() and all(
+                jiml[i].properties.isEqual(
+                    pj.Jim(jiml._jipjimlist.getImage(i)))
+                for i in range(len(jiml)))
+
+        jiml = pj.JimList([])
+        for jim in jims[:4]:
+            jiml.append(jim)
+
+        assert in_sync(jiml), 'Error in JimList.append() (out of sync)'
+
+        jiml.insert(-1, jims[4])
+        jiml.insert(100, jims[5])
+
+        assert in_sync(jiml), 'Error in JimList.insert() (out of sync)'
+        assert jiml[3].properties.isEqual(jims[4]) and \
+            jiml[-1].properties.isEqual(jims[5]), \
+            'Error in JimList.insert() (wrong positions)'
+
+        popped = jiml.pop()
+
+        assert popped.properties.isEqual(jims[5]) and in_sync(jiml), \
+            'Error in JimList.pop() (last element)'
+
+        popped = jiml.pop(-4)
+
+        assert popped.properties.isEqual(jims[1]) and in_sync(jiml), \
+            'Error in JimList.pop() (negative index)'
+
+        jiml.remove(jims[0])
+
+        assert len(jiml) == 3 and in_sync(jiml), \
+            'Error in JimList.remove() (out of sync)'
+
+        jiml.extend(pj.JimList([jims[0], jims[1]]))
+        jiml.reverse()
+
+        assert len(jiml) == 5 and in_sync(jiml), \
+            'Error in JimList.extend() or reverse() (out of sync)'
+        assert jiml[0].properties.isEqual(jims[1]), \
+            'Error in JimList.reverse()'
+
+    @staticmethod
+    def test_from_paths():
+        """Test lazy JimLists reading their members on access."""
+        jim = pj.Jim(testFile, band=[0])
+        nbytes = jim.np(0).nbytes
+
+        jiml = pj.JimList.from_paths([testFile] * 3, max_memory=nbytes * 1.5,
+                                     band=[0])
+
+        assert len(jiml) == 3 and jiml._residency.used == 0, \
+            'Error in JimList.from_paths() (pixel data read on creation)'
+        assert jiml.properties.getBBox() == jim.properties.getBBox(), \
+            'Error in JimList.from_paths() (wrong metadata)'
+        assert jiml[1].properties.isEqual(jim), \
+            'Error in JimList.from_paths() (wrong member read on access)'
+        assert jiml[1] is jiml[1] and jiml._residency.used == nbytes, \
+            'Error in JimList.from_paths() (member not cached)'
+
+        for member in jiml:
+            assert member.properties.nrOfBand() == 1, \
+                'Error in iterating over a lazy JimList'
+            assert jiml._residency.used <= nbytes * 1.5, \
+                'Error in JimList.from_paths() (memory budget exceeded)'
+
+        stats = jiml.stats.getStats(['min', 'max'])
+        ref_stats = jim.stats.getStats(['min', 'max'])
+        assert stats['min'] == ref_stats['min'] and \
+            stats['max'] == ref_stats['max'], \
+            'Error in stats.getStats() for a lazy JimList'
+
+        stacked = jiml.geometry.stackPlane()
+        assert stacked.properties.nrOfPlane() == 3, \
+            'Error in geometry.stackPlane() for a lazy JimList ' \
+            '(wrong number of planes)'
+        assert stacked.properties.isEqual(
+            pj.JimList([jim, jim, jim]).geometry.stackPlane()), \
+            'Error in geometry.stackPlane() for a lazy JimList'
+        assert jiml._residency.used <= nbytes * 1.5, \
+            'Error in geometry.stackPlane() (memory budget exceeded)'
+
+        stacked = jiml.geometry.stackBand()
+        assert stacked.properties.isEqual(
+            pj.JimList([jim, jim, jim]).geometry.stackBand()), \
+            'Error in geometry.stackBand() for a lazy JimList'
+        stacked = pj.geometry.stackBand(jiml, jiml)
+        assert stacked.properties.nrOfBand() == 6 and \
+            stacked.np(5).max() == jim.np(0).max(), \
+            'Error in geometry.stackBand() for lazy JimLists'
+
+        resident = pj.JimList(jiml)
+        assert len(resident) == 3 and all(resident), \
+            'Error in creating a JimList from a lazy JimList'
+
+    @staticmethod
+    def test_map():
+        """Test applying a function on the members concurrently."""
+        jim1 = pj.Jim(tiles[0])
+        jim2 = pj.Jim(tiles[1])
+        jiml = pj.JimList([jim1, jim2])
+
+        for backend in ['thread', 'process']:
+            doubled = jiml.map(_double, workers=2, backend=backend)
+            assert len(doubled) == 2, \
+                'Error in JimList.map() (wrong number of results)'
+            for result, jim in zip(doubled, [jim1, jim2]):
+                assert result.properties.isEqual(_double(jim)), \
+                    'Error in JimList.map() (results out of order)'
+                assert result.properties.getBBox() == \
+                    jim.properties.getBBox(), \
+                    'Error in JimList.map() (georeference lost)'
+
+        lazy = pj.JimList.from_paths(tiles, max_memory='1GB')
+        doubled = lazy.map(_double, backend='process')
+        assert doubled[1].properties.isEqual(_double(jim2)), \
+            'Error in JimList.map() for a lazy JimList'
+
+        ones = jiml.map(lambda jim: jim.pixops.setData(1))
+        assert ones[0] is jim1 and jim1.stats.getStats(['max'])['max'] == 1, \
+            'Error in JimList.map() (member modified in place)'
+
+        try:
+            jiml.map(_double, backend='dask')
+            failed = True
+        except pj.exceptions.JimListIllegalArgumentError:
+            failed = False
+        assert not failed, \
+            'Error in catching a wrong backend in JimList.map()'
+
 
 def load_tests(loader=None, tests=None, pattern=None):
     """Load tests."""
@@ -21,6 +21,7 @@
 
 import pyjeo as pj
 import unittest
+import numpy as np
 
 
 testFile = 'tests/data/modis_ndvi_2010.tif'
@@ -115,6 +116,37 @@ class BadPixOps(unittest.TestCase):
                 min_ndvi = pj.Jim(max_ndvi)
                 min_ndvi2 = pj.Jim(min_ndvi)
 
+    @staticmethod
+    def test_parallel_reductions():
+        """Test the parallel reductions of JimLists."""
+        jims = [pj.Jim(ncol=20, nrow=15, nband=2, otype='Float32',
+                       uniform=[-10, 10], seed=seed) for seed in range(7)]
+        copies = [pj.Jim(jim) for jim in jims]
+        jiml = pj.JimList(jims)
+
+        for band in range(2):
+            arrays = [jim.np(band) for jim in jims]
+            minimum = np.minimum.reduce(arrays)
+            maximum = np.maximum.reduce(arrays)
+            for workers in [1, 3, 7, 16, None]:
+                inf = jiml.pixops.infimum(workers=workers)
+                sup = pj.pixops.supremum(jiml, workers=workers)
+                assert np.array_equal(inf.np(band), minimum), \
+                    'Error in JimList.pixops.infimum(workers={})'.format(
+                        workers)
+                assert np.array_equal(sup.np(band), maximum), \
+                    'Error in pixops.supremum(JimList, workers={})'.format(
+                        workers)
+
+        assert all(jim.properties.isEqual(copy)
+                   for jim, copy in zip(jims, copies)), \
+            'Error in parallel reductions (members of the JimList modified)'
+
+        stats = jiml.stats.getStats(['min', 'max'], workers=3, band=0)
+        assert stats['min'] == min(jim.np(0).min() for jim in jims) and \
+            stats['max'] == max(jim.np(0).max() for jim in jims), \
+            'Error in JimList.stats.getStats(workers=3)'
+
     @staticmethod
     def test_stretch():
         """Test stretch function."""
@@ -261,6 +261,132 @@ class BadProps(unittest.TestCase):
                jim1.properties.getGeoTransform(),\
             'Error in properties.copyGeoReference getGeoTransform()'
 
+    @staticmethod
+    def test_metadata_snapshot():
+        """Test the invalidation of the cached metadata snapshot."""
+        jim = pj.Jim(ncol=10, nrow=8, nband=2, otype='Byte')
+        jim.properties.setGeoTransform([0, 1, 0, 8, 0, -1])
+
+        assert jim.properties.nrOfCol() == 10, \
+            'Error in properties.nrOfCol() (snapshot)'
+        assert jim._metadata() is jim._metadata(), \
+            'Error in Jim._metadata() (snapshot not cached)'
+
+        gt = jim.properties.getGeoTransform()
+        gt[0] = 100
+        assert jim.properties.getUlx() == 0, \
+            'Error in properties.getGeoTransform() (cached value modified)'
+
+        jim.properties.setGeoTransform([10, 2, 0, 16, 0, -2])
+        assert jim.properties.getUlx() == 10, \
+            'Error in properties.getUlx() (snapshot not invalidated)'
+        assert jim.properties.getDeltaY() == 2, \
+            'Error in properties.getDeltaY() (snapshot not invalidated)'
+
+        jim.pixops.convert('Float32')
+        assert jim.properties.getDataType() == 'Float32', \
+            'Error in properties.getDataType() (snapshot not invalidated)'
+
+        jim.geometry.cropBand(0)
+        assert jim.properties.nrOfBand() == 1, \
+            'Error in properties.nrOfBand() (snapshot not invalidated)'
+
+        jim.geometry.imageFrameAdd(l=1, r=1)
+        assert jim.properties.nrOfCol() == 12, \
+            'Error in properties.nrOfCol() (snapshot not invalidated after ' \
+            'an in place jiplib method)'
+
+        jim.properties.setNoDataVals(5)
+        assert jim.properties.getNoDataVals() == [5], \
+            'Error in properties.getNoDataVals() (snapshot not invalidated)'
+
+        jim_ref = pj.Jim(testFile, band=[0])
+        assert jim.properties.getGeoTransform() == [10, 2, 0, 16, 0, -2], \
+            'Error in properties.getGeoTransform() (snapshot)'
+        jim.properties.copyGeoTransform(jim_ref)
+        assert jim.properties.getGeoTransform() == \
+            jim_ref.properties.getGeoTransform(), \
+            'Error in properties.getGeoTransform() (snapshot not ' \
+            'invalidated after copyGeoTransform())'
+
+        jim.properties.setGeoTransform([10, 2, 0, 16, 0, -2])
+        jim.properties.getProjection()
+        jim.properties.copyGeoReference(jim_ref)
+        assert jim.properties.getGeoTransform() == \
+            jim_ref.properties.getGeoTransform() and \
+            jim.properties.getProjection() == \
+            jim_ref.properties.getProjection(), \
+            'Error in properties.getGeoTransform() or getProjection() ' \
+            '(snapshot not invalidated after copyGeoReference())'
+
+    @staticmethod
+    def test_content_digest():
+        """Test the comparison of Jim objects with cached content digests."""
+        jim1 = pj.Jim(ncol=10, nrow=8, nplane=2, nband=2, otype='Int16',
+                      uniform=[0, 100], seed=0)
+        jim2 = pj.Jim(jim1)
+
+        assert pj.properties._equal(jim1, jim2, compute=True), \
+            'Error in comparing Jim objects with content digests'
+        assert jim1._metadata().digest is not None, \
+            'Error in caching the content digest'
+        assert jim1.properties.isEqual(jim2), \
+            'Error in properties.isEqual() (cached digests)'
+
+        jim2.np(1)[1, 2, 3] += 1
+        assert not jim1.properties.isEqual(jim2), \
+            'Error in properties.isEqual() (digest not discarded after ' \
+            'writing to a numpy array)'
+        assert not pj.properties._equal(jim1, jim2, compute=True), \
+            'Error in comparing modified Jim objects with content digests'
+
+        jim2 = pj.Jim(jim1)
+        pj.properties._equal(jim1, jim2, compute=True)
+        jim2.pixops.setData(5)
+        assert not jim1.properties.isEqual(jim2), \
+            'Error in properties.isEqual() (digest not discarded after ' \
+            'an in place jiplib method)'
+
+        jim3 = pj.Jim(jim1)
+        jim3.pixops.convert('Float32')
+        assert pj.properties._equal(jim1, jim3, compute=True), \
+            'Error in comparing Jim objects with different data types'
+
+        jim3.np(0)[0, 0, 0] = float('nan')
+        assert not pj.properties._equal(jim3, pj.Jim(jim3), compute=True), \
+            'Error in comparing Jim objects containing NaN values'
+
+        jim4 = pj.Jim(jim3)
+        jim4.np(0)[0, 0, 0] = -0.0
+        jim5 = pj.Jim(jim4)
+        jim5.np(0)[0, 0, 0] = 0.0
+        assert pj.properties._equal(jim4, jim5, compute=True), \
+            'Error in comparing Jim objects with -0.0 and 0.0 values'
+
+        jim2 = pj.Jim(jim1)
+        pj.properties._equal(jim1, jim2, compute=True)
+        cube = jim2.np_cube()
+        if cube.flags.writeable:
+            # bands contiguous in memory, the cube refers to the Jim object
+            cube[1, 0, 2, 3] += 1
+            del cube
+            assert not jim1.properties.isEqual(jim2), \
+                'Error in properties.isEqual() (digest not discarded after ' \
+                'writing to Jim.np_cube())'
+
+        jim2 = pj.Jim(jim1)
+        array = jim2.np(1)
+        pj.properties._equal(jim1, jim2, compute=True)
+        array[1, 2, 3] += 1
+        assert not jim1.properties.isEqual(jim2), \
+            'Error in properties.isEqual() (digest used while a numpy array ' \
+            'obtained before its calculation is alive)'
+        del array
+
+        jiml = pj.JimList([jim2, jim1, jim2, pj.Jim(jim1)])
+        assert jiml.count(jim1) == 2 and jiml.index(jim1) == 1, \
+            'Error in JimList.count() or JimList.index() (content digests)'
+
 
 class BadPropsLists(unittest.TestCase):
     """Test JimList funcs and methods for getting and setting properties."""
@@ -339,6 +465,78 @@ class BadPropsLists(unittest.TestCase):
         self.jiml.properties.selectGeo(0, 0)
         assert len(self.jiml) == 0, 'Error in properties.selectGeo()'
 
+    @staticmethod
+    def test_query():
+        """Test JimList properties.query() and the spatial index."""
+        def scene(ulx, uly):
+            jim = pj.Jim(ncol=10, nrow=10, otype='Byte')
+            jim.properties.setGeoTransform([ulx, 10, 0, uly, 0, -10])
+            jim.properties.setProjection('epsg:32632')
+            return jim
+
+        jiml = pj.JimList([scene(100 * col, 100 * row)
+                           for row in range(1, 21) for col in range(20)])
+
+        def brute_force(jimlist, bbox, contains=False):
+            found = []
+            for position, jim in enumerate(jimlist):
+                ulx, uly, lrx, lry = jim.properties.getBBox()
+                if contains:
+                    ok = ulx <= bbox[0] and lrx >= bbox[2] and \
+                        uly >= bbox[1] and lry <= bbox[3]
+                else:
+                    ok = ulx <= bbox[2] and lrx >= bbox[0] and \
+                        uly >= bbox[3] and lry <= bbox[1]
+                if ok:
+                    found.append(position)
+            return found
+
+        bboxes = [[150, 950, 420, 720], [1010, 1510, 1090, 1420],
+                  [-500, -100, -200, -300], [0, 2000, 2000, 0]]
+        for bbox in bboxes:
+            for contains in [False, True]:
+                selected = jiml.properties.query(bbox, all=contains)
+                expected = brute_force(jiml, bbox, contains)
+                assert len(selected) == len(expected) and all(
+                    jim is jiml[position]
+                    for jim, position in zip(selected, expected)), \
+                    'Error in properties.query({}, all={})'.format(bbox,
+                                                                  contains)
+
+        jiml.pop(3)
+        jiml.remove(jiml[50])
+        jiml.append(scene(5000, 5000))
+        jiml.pop()
+        jiml.append(scene(150, 950))
+        for bbox in bboxes:
+            positions = jiml._spatialIndex().query(bbox)
+            assert positions == brute_force(jiml, bbox), \
+                'Error in updating the spatial index of a JimList'
+
+        assert jiml.properties.covers(155, 945) and \
+            not jiml.properties.covers(-10, -10), \
+            'Error in properties.covers() with a spatial index'
+        assert jiml.properties.getBBox() == [0, 2000, 2000, 0], \
+            'Error in properties.getBBox() with a spatial index'
+
+        # members changed in place must not be found at their old extent
+        jiml[0].geometry.crop(ulx=0, uly=100, lrx=50, lry=50)
+        jiml[1].properties.setGeoTransform([-1000, 10, 0, -1000, 0, -10])
+        for bbox in [[60, 90, 90, 60], [150, 90, 180, 60],
+                     [-950, -1050, -920, -1080]]:
+            assert jiml._spatialIndex().query(bbox) == \
+                brute_force(jiml, bbox), \
+                'Error in updating the spatial index of a JimList after ' \
+                'changing a member in place'
+        assert len(jiml.properties.query([60, 90, 90, 60])) == 0, \
+            'Error in properties.query() after cropping a member'
+        assert jiml.properties.covers(-950, -1050), \
+            'Error in properties.covers() after moving a member'
+
+        jiml.properties.selectGeo(155, 945)
+        assert len(jiml) == 2 and len(jiml) == jiml._jipjimlist.getSize(), \
+            'Error in properties.selectGeo() with a spatial index'
+
 
 class BadPropsVects(unittest.TestCase):
     """Test JimVect funcs and methods for getting and setting properties."""
@@ -0,0 +1,188 @@
+"""Test suite for module pyjeo.tiled."""
+# Author(s): Pieter.Kempeneers@ec.europa.eu,
+#            Ondrej Pesek,
+#            Pierre.Soille@ec.europa.eu
+# Copyright (C) 2018-2020 European Union (Joint Research Centre)
+#
+# This file is part of pyjeo.
+#
+# pyjeo is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# pyjeo is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with pyjeo.  If not, see <https://www.gnu.org/licenses/>.
+
+import pyjeo as pj
+import numpy as np
+import os
+import unittest
+
+
+tiles = ['tests/data/red1.tif', 'tests/data/red2.tif']
+outputfn = pj._get_random_path() + '.tif'
+
+
+def _erode(jim):
+    """Erode a tile (defined at the top level for a pool of processes)."""
+    return pj.ngbops.morphoErodeDiamond(jim)
+
+
+class BadTiled(unittest.TestCase):
+    """Test the tiled processing of Jim objects and raster files."""
+
+    @staticmethod
+    def test_tile_grid():
+        """Test the planning of tiles with pj.TileGrid."""
+        jim = pj.Jim(tiles[0])
+        ncol = jim.properties.nrOfCol()
+        nrow = jim.properties.nrOfRow()
+
+        grid = pj.TileGrid(jim, rows=3, cols=2, halo=4)
+
+        assert grid.shape == (3, 2) and len(grid) == 6, \
+            'Error in TileGrid (wrong number of tiles)'
+        assert sum(tile.window[2] * tile.window[3] for tile in grid) == \
+            ncol * nrow, 'Error in TileGrid (tiles do not cover the image)'
+
+        tile = grid[0]
+        assert tile.window[:2] == (0, 0), \
+            'Error in TileGrid (first tile not in the upper left corner)'
+        assert tile.halo_window[:2] == (0, 0), \
+            'Error in TileGrid (halo not limited to the source)'
+        assert tile.halo_window[2] == tile.window[2] + 4, \
+            'Error in TileGrid (wrong halo)'
+        assert grid[-1].index == 5, 'Error in TileGrid (negative index)'
+
+        tile = grid[3]
+        assert (tile.row, tile.col) == (1, 1), \
+            'Error in TileGrid (tiles not in row major order)'
+        assert tile.halo_window[1] == tile.window[1] - 4 and \
+            tile.halo_window[3] == tile.window[3] + 8, \
+            'Error in TileGrid (wrong halo for a tile within the image)'
+
+        read = tile.read()
+        assert read.properties.nrOfCol() == tile.halo_window[2] and \
+            read.properties.nrOfRow() == tile.halo_window[3], \
+            'Error in Tile.read() (wrong size)'
+        assert read.properties.getBBox() == tile.halo_bbox, \
+            'Error in Tile.read() (wrong bounding box)'
+
+        core = tile.cropHalo(read)
+        col, row, ncol_tile, nrow_tile = tile.window
+        assert np.array_equal(core.np(), jim.np()[row:row + nrow_tile,
+                                                  col:col + ncol_tile]), \
+            'Error in Tile.cropHalo()'
+        assert core.properties.getBBox() == tile.bbox, \
+            'Error in Tile.cropHalo() (wrong bounding box)'
+
+        from_file = pj.TileGrid(tiles[0], rows=3, cols=2, halo=4)[3].read()
+        assert from_file.properties.isEqual(read), \
+            'Error in Tile.read() from file'
+
+        grid = pj.TileGrid(jim, tile_size=[100, 200])
+        assert grid.shape == (int(np.ceil(nrow / 200)),
+                              int(np.ceil(ncol / 100))), \
+            'Error in TileGrid(tile_size=[100, 200])'
+        assert grid[-1].window[2] == ncol - 100 * (grid.shape[1] - 1), \
+            'Error in TileGrid (wrong size of the last tile)'
+
+        grid = pj.TileGrid(jim, max_memory=4 * 128 * 128, halo=0)
+        assert max(tile.halo_window[2] * tile.halo_window[3]
+                   for tile in grid) <= 128 * 128, \
+            'Error in TileGrid(max_memory)'
+
+        bbox = jim.properties.getBBox()
+        dx = jim.properties.getDeltaX()
+        grid = pj.TileGrid(jim, bbox=[bbox[0] + 10.3 * dx, bbox[1],
+                                      bbox[2], bbox[3]])
+        assert grid[0].window[0] == 10, \
+            'Error in TileGrid (bounding box not snapped to the source)'
+
+        grid = pj.TileGrid(bbox=[0, 100, 100, 0], dx=10, dy=10, rows=2,
+                           cols=2, halo=1)
+        assert grid[0].halo_window == (-1, -1, 7, 7), \
+            'Error in TileGrid without source'
+        assert grid[3].bbox == [50, 50, 100, 0], \
+            'Error in Tile.bbox'
+
+        raised = False
+        try:
+            pj.TileGrid(jim, rows=2, tile_size=100)
+        except pj.exceptions.JimIllegalArgumentError:
+            raised = True
+
+        assert raised, \
+            'Error in catching a TileGrid with both rows and tile_size'
+
+    @staticmethod
+    def test_tileindex():
+        """Test reading tiles with the tileindex and tiletotal keys."""
+        jim = pj.Jim(tiles[0])
+        ncol = jim.properties.nrOfCol()
+
+        tile = pj.Jim(tiles[0], tileindex=0, tiletotal=4, overlap=0)
+        assert tile.properties.nrOfCol() == ncol // 2, \
+            'Error in reading a tile with tileindex and tiletotal'
+
+        tile = pj.Jim(tiles[0], tileindex=3, tiletotal=4, overlap=10)
+        assert tile.properties.getLrx() == jim.properties.getLrx(), \
+            'Error in reading a tile with tileindex and tiletotal ' \
+            '(overlap not limited to the image)'
+        assert tile.properties.nrOfCol() > ncol // 2, \
+            'Error in reading a tile with tileindex and tiletotal (overlap)'
+
+        raised = False
+        try:
+            pj.Jim(tiles[0], tileindex=0, tiletotal=3)
+        except pj.exceptions.JimIllegalArgumentError:
+            raised = True
+
+        assert raised, 'Error in catching a tiletotal not squared'
+
+
+    @staticmethod
+    def test_map():
+        """Test the parallel processing of tiles with pj.tiled.map()."""
+        jim = pj.Jim(tiles[0])
+        expected = pj.ngbops.morphoErodeDiamond(jim)
+
+        result = pj.tiled.map(_erode, tiles[0], halo=1, workers=2,
+                              rows=3, cols=3)
+        assert result.properties.isEqual(expected), \
+            'Error in pj.tiled.map() (result with halo different from ' \
+            'processing the full image)'
+        assert result.properties.getGeoTransform() == \
+            jim.properties.getGeoTransform(), \
+            'Error in pj.tiled.map() (wrong geotransform)'
+
+        result = pj.tiled.map(_erode, tiles[0], halo=0, workers=2,
+                              rows=3, cols=3)
+        assert not result.properties.isEqual(expected), \
+            'Error in pj.tiled.map() (no effect of the halo)'
+
+        output = pj.tiled.map(_erode, tiles[0], halo=1, workers=2,
+                              tile_size=100, output=outputfn)
+        assert output == outputfn, 'Error in pj.tiled.map(output=...)'
+        assert pj.Jim(outputfn).properties.isEqual(expected), \
+            'Error in pj.tiled.map() (result written to GeoTIFF)'
+        os.remove(outputfn)
+
+        result = pj.tiled.map(lambda tile: tile * 2, jim, workers=2,
+                              rows=2, cols=2)
+        assert result.properties.isEqual(jim * 2), \
+            'Error in pj.tiled.map() with a Jim object as source'
+
+
+def load_tests(loader=None, tests=None, pattern=None):
+    """Load tests."""
+    if not loader:
+        loader = unittest.TestLoader()
+    suite_list = [loader.loadTestsFromTestCase(BadTiled)]
+    return unittest.TestSuite(suite_list)